@@ -0,0 +1,58 @@
+"""
+    Sign & verify throughput for each supported algorithm, using the parsed key
+    objects that :mod:`flask_jwt_router._keys` loads once at ``init_app``.
+    The last column shows verify throughput when the PEM is parsed for every token.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_algorithms
+"""
+from datetime import datetime, timedelta
+import time
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+
+SECRET_KEY = "__BENCHMARK_SECRET_KEY_32_BYTES__"
+NUMBER = 500
+
+
+def _private_keys():
+    return {
+        "HS256": SECRET_KEY,
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "PS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+
+
+def _per_second(func):
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        func()
+    return NUMBER / (time.perf_counter() - start)
+
+
+def main():
+    payload = {"table_name": "users", "id": 1, "exp": datetime.utcnow() + timedelta(days=1)}
+    print(f"{'algorithm':>10} {'sign/s':>10} {'verify/s':>10} {'verify PEM/s':>14}")
+    for algorithm, private_key in _private_keys().items():
+        if algorithm == "HS256":
+            public_key = public_pem = private_key
+        else:
+            public_key = private_key.public_key()
+            public_pem = public_key.public_bytes(
+                serialization.Encoding.PEM,
+                serialization.PublicFormat.SubjectPublicKeyInfo,
+            )
+        token = jwt.encode(payload, private_key, algorithm=algorithm)
+        sign = _per_second(lambda: jwt.encode(payload, private_key, algorithm=algorithm))
+        verify = _per_second(lambda: jwt.decode(token, public_key, algorithms=[algorithm]))
+        verify_pem = _per_second(lambda: jwt.decode(token, public_pem, algorithms=[algorithm]))
+        print(f"{algorithm:>10} {sign:>10.0f} {verify:>10.0f} {verify_pem:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+    Concurrent OAuth authorizations on one event loop, against the mock server in
+    ``tests/mock_server`` with a simulated userinfo latency. Compares the sync ``authorize``
+    (which blocks the loop, so the calls are serial), ``authorize`` in the default executor
+    (the ``BaseOAuth.authorize_async`` fallback) & Google's ``authorize_async``.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_async_oauth
+"""
+import asyncio
+import time
+
+from flask_jwt_router.oauth2._base import BaseOAuth
+from flask_jwt_router.oauth2.google import Google
+from flask_jwt_router.oauth2.http_requests import HttpRequests
+from tests.mock_server import mock_server
+
+CONCURRENCY = 100
+LATENCY = 0.02
+OPTIONS = {
+    "client_id": "<CLIENT_ID>",
+    "client_secret": "<CLIENT_SECRET>",
+    "redirect_uri": "http://localhost:3000",
+    "tablename": "users",
+    "email_field": "email",
+    "expires_in": 3600,
+    "circuit_failures": 0,
+}
+
+
+async def _sync(google, token):
+    return google.authorize(token)
+
+
+async def _executor(google, token):
+    return await BaseOAuth.authorize_async(google, token)
+
+
+async def _async(google, token):
+    return await google.authorize_async(token)
+
+
+def _elapsed(server, authorize, tokens):
+    google = Google(HttpRequests({"user_info.email": f"{server.base_url}/mock_google_user_info"},
+                                 pool_size=CONCURRENCY))
+    google.init(**OPTIONS)
+
+    async def main():
+        try:
+            # Warm up the connection pools
+            await asyncio.gather(*(authorize(google, t) for t in tokens))
+            start = time.perf_counter()
+            results = await asyncio.gather(*(authorize(google, t) for t in tokens))
+            elapsed = time.perf_counter() - start
+        finally:
+            await google.http.async_requests.pool.aclose()
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        return elapsed * 1000
+
+    return asyncio.run(main())
+
+
+def main():
+    # Distinct tokens, so calls are not coalesced
+    tokens = [f"<access_token_{n}>" for n in range(CONCURRENCY)]
+    mock_server.VALID_ACCESS_TOKENS = set(tokens)
+    mock_server.USER_INFO_LATENCY = LATENCY
+    server = mock_server.ServerThread(host="127.0.0.1")
+    server.start()
+    try:
+        sync = _elapsed(server, _sync, tokens)
+        executor = _elapsed(server, _executor, tokens)
+        native = _elapsed(server, _async, tokens)
+    finally:
+        server.shutdown()
+    print(f"{CONCURRENCY} concurrent userinfo calls on one event loop, {LATENCY * 1000:.0f} ms provider latency")
+    print(f"  sync authorize:            {sync:9.1f} ms")
+    print(f"  authorize in executor:     {executor:9.1f} ms ({sync / executor:.1f}x)")
+    print(f"  authorize_async:           {native:9.1f} ms ({sync / native:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
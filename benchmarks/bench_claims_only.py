@@ -0,0 +1,83 @@
+"""
+    Requests per second for a protected route with the entity loaded from the
+    database (SQLAlchemy & an in memory SQLite database) & with
+    ``JWT_ROUTER_CLAIMS_ONLY``, which attaches the token's claims to ``g.claims``
+    without a database round trip.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_claims_only
+"""
+import time
+
+from flask import Flask, g
+from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from flask_jwt_router import JwtRoutes
+
+SECRET_KEY = "__BENCHMARK_SECRET_KEY_32_BYTES__"
+NUMBER = 5000
+USERS = 100
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = scoped_session(sessionmaker(bind=engine))
+Base = declarative_base()
+
+
+class UserModel(Base):
+    __tablename__ = "users"
+    query = session.query_property()
+    id = Column(Integer, primary_key=True)
+    name = Column(String(32))
+
+
+def _app(claims_only):
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = SECRET_KEY
+    app.config["JWT_ROUTER_CLAIMS_ONLY"] = claims_only
+    jwt_routes = JwtRoutes(app, entity_models=[UserModel])
+
+    @app.route("/me")
+    def me():
+        if claims_only:
+            return str(g.claims.entity_id)
+        return str(g.users.id)
+
+    @app.teardown_request
+    def remove_session(_):
+        session.remove()
+
+    with app.test_request_context():
+        tokens = [jwt_routes.create_token(entity_id=n, table_name="users") for n in range(1, USERS + 1)]
+    return app, tokens
+
+
+def _requests_per_second(claims_only):
+    app, tokens = _app(claims_only)
+    headers = [{"Authorization": f"Bearer {token}"} for token in tokens]
+    client = app.test_client()
+    start = time.perf_counter()
+    for n in range(NUMBER):
+        rv = client.get("/me", headers=headers[n % USERS])
+        assert rv.status_code == 200
+    return NUMBER / (time.perf_counter() - start)
+
+
+def main():
+    Base.metadata.create_all(engine)
+    session.add_all([UserModel(id=n, name=f"user {n}") for n in range(1, USERS + 1)])
+    session.commit()
+    session.remove()
+
+    orm = _requests_per_second(False)
+    claims_only = _requests_per_second(True)
+    print(f"{'ORM entity (requests/s)':>28} {orm:>10.0f}")
+    print(f"{'claims only (requests/s)':>28} {claims_only:>10.0f}")
+    print(f"{'speed up':>28} {claims_only / orm:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
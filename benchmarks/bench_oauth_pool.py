@@ -0,0 +1,54 @@
+"""
+    Latency of OAuth provider calls with a new connection per call (``urllib.request.urlopen``)
+    & with pooled keep alive connections (``HttpRequests``), against the mock server
+    in ``tests/mock_server``.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_oauth_pool
+"""
+import json
+import time
+import urllib.request
+
+from flask_jwt_router.oauth2.http_requests import HttpRequests
+from tests.mock_server import mock_server
+
+NUMBER = 500
+TOKEN = "<access_token>"
+
+
+def _urlopen(url):
+    req = urllib.request.Request(url=url, method="GET", headers={"Authorization": f"Bearer {TOKEN}"})
+    with urllib.request.urlopen(req) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _latency(call, url):
+    call(url)
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        call(url)
+    return (time.perf_counter() - start) / NUMBER * 1000
+
+
+def main():
+    # Measure the connection cost rather than the mock server's simulated latency
+    mock_server.USER_INFO_LATENCY = 0
+    server = mock_server.ServerThread(host="127.0.0.1")
+    server.start()
+    try:
+        url = f"{server.base_url}/mock_google_user_info"
+        http = HttpRequests({"user_info.email": url})
+        new_connection = _latency(_urlopen, url)
+        pooled = _latency(lambda u: http.get_by_scope(u, TOKEN), url)
+    finally:
+        server.shutdown()
+    print(f"{NUMBER} userinfo calls")
+    print(f"  new connection per call: {new_connection:8.3f} ms / call")
+    print(f"  pooled keep alive:       {pooled:8.3f} ms / call ({new_connection / pooled:.1f}x)")
+    print(f"  connections opened:      {http.pool.created}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+    Measures the memory allocated by route classification on each request with
+    :mod:`tracemalloc`. The legacy classifier rebuilt the api name prefixed
+    whitelist on every request, the current classifier reads the route table
+    compiled by :class:`~flask_jwt_router._config.Config.compile_routes`.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_route_alloc
+"""
+import tracemalloc
+
+from flask import Flask
+
+from flask_jwt_router._config import Config
+from flask_jwt_router._routing import Routing
+
+ROUTES = 400
+REQUESTS = 1000
+
+
+def _legacy_classify(config, method, path):
+    # ``Routing._prefix_api_name`` & the linear scan from previous releases
+    white_routes = [(verb, f"{config.api_name}{route}") for verb, route in config.whitelist_routes]
+    for verb, route in white_routes:
+        if method == verb and path == route:
+            return False
+    return True
+
+
+def _current_classify(routing, method, path):
+    route_table = routing.config.route_table
+    return not route_table.whitelist.match(method, path)
+
+
+def _peak(func, *args):
+    """
+    :return: The highest number of bytes allocated by a single call to `func`
+    """
+    highest = 0
+    for _ in range(REQUESTS):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        highest = max(highest, peak - current)
+    return highest
+
+
+def main():
+    app = Flask(__name__)
+    config = Config()
+    config.init_config({
+        "SECRET_KEY": "__BENCHMARK_SECRET__",
+        "JWT_ROUTER_API_NAME": "/api/v1",
+        "WHITE_LIST_ROUTES": [("GET", f"/resource_{i}") for i in range(ROUTES)],
+    })
+    routing = Routing()
+    routing.init(app, config, None, {})
+    path = "/api/v1/protected"
+
+    tracemalloc.start()
+    legacy = _peak(_legacy_classify, config, "GET", path)
+    current = _peak(_current_classify, routing, "GET", path)
+    tracemalloc.stop()
+
+    print(f"{ROUTES} white listed routes, peak bytes allocated per request:")
+    print(f"  legacy:  {legacy}")
+    print(f"  current: {current}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+    Compares the linear whitelist scan previously used by ``Routing`` with the compiled
+    :class:`~flask_jwt_router._route_index.RouteIndex`.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_route_index
+"""
+import timeit
+
+from flask_jwt_router._route_index import RouteIndex
+
+SIZES = (10, 100, 1000, 10000)
+NUMBER = 2000
+
+
+def _linear_match(white_routes, method, path):
+    # The matcher from ``Routing._allow_public_routes`` & ``Routing._handle_query_params``
+    for verb, route in white_routes:
+        if method == verb and path == route:
+            return True
+        if method == verb and "<" in route:
+            matched = True
+            for r, p in zip(route.split("/"), path.split("/")):
+                if len(r) > 0 and r[0] != "<" and r != p:
+                    matched = False
+                    break
+            if matched:
+                return True
+    return False
+
+
+def _routes(size):
+    routes = []
+    for i in range(size):
+        if i % 2:
+            routes.append(("GET", f"/api/v1/resource_{i}/<int:resource_id>"))
+        else:
+            routes.append(("POST", f"/api/v1/resource_{i}"))
+    return routes
+
+
+def main():
+    print(f"{'routes':>8} {'linear (us)':>14} {'index (us)':>12}")
+    for size in SIZES:
+        routes = _routes(size)
+        index = RouteIndex(routes)
+        # Worst case for the linear scan: a protected route that matches nothing
+        path = "/api/v1/protected/1"
+        linear = timeit.timeit(lambda: _linear_match(routes, "GET", path), number=NUMBER)
+        indexed = timeit.timeit(lambda: index.match("GET", path), number=NUMBER)
+        print(f"{size:>8} {linear / NUMBER * 1e6:>14.2f} {indexed / NUMBER * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+    Token verification throughput with & without the verified token cache
+    (``JWT_ROUTER_TOKEN_CACHE``), on a single thread & across threads.
+
+    Run from the project root::
+
+        python -m benchmarks.bench_token_cache
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import time
+
+import jwt
+from flask import Flask
+
+from flask_jwt_router._config import Config
+from flask_jwt_router._routing import Routing
+
+SECRET_KEY = "__BENCHMARK_SECRET_KEY_32_BYTES__"
+NUMBER = 20000
+THREADS = 8
+
+
+def _routing(token_cache):
+    config = Config()
+    config.init_config({
+        "SECRET_KEY": SECRET_KEY,
+        "JWT_ROUTER_TOKEN_CACHE": token_cache,
+        "JWT_ROUTER_TOKEN_CACHE_SIZE": NUMBER,
+    })
+    routing = Routing()
+    routing.init(Flask(__name__), config, None, {})
+    return routing
+
+
+def _tokens(count):
+    exp = datetime.utcnow() + timedelta(days=1)
+    return [
+        jwt.encode({"table_name": "users", "id": n, "exp": exp}, SECRET_KEY, algorithm="HS256")
+        for n in range(count)
+    ]
+
+
+def _throughput(routing, tokens, threads=1):
+    def run(chunk):
+        for token in chunk:
+            routing._decode_token(token)
+
+    chunks = [tokens[i::threads] for i in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(run, chunks))
+    return len(tokens) / (time.perf_counter() - start)
+
+
+def main():
+    # A SPA client sending the same bearer token on every request
+    repeated = _tokens(1) * NUMBER
+    # Every request carries a token the cache has not seen
+    unique = _tokens(NUMBER)
+
+    print(f"{'':>24} {'1 thread':>12} {f'{THREADS} threads':>12}")
+    for name, token_cache, tokens in (
+            ("no cache", False, repeated),
+            ("cache miss", True, unique),
+            ("cache hit", True, repeated),
+    ):
+        results = []
+        for threads in (1, THREADS):
+            routing = _routing(token_cache)
+            if name == "cache hit":
+                routing._decode_token(tokens[0])
+            results.append(_throughput(routing, tokens, threads))
+        print(f"{name + ' (tokens/s)':>24} {results[0]:>12.0f} {results[1]:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
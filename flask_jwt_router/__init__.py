@@ -3,6 +3,7 @@
 """
 from ._jwt_routes import JwtRoutes, BaseJwtRoutes
 from .oauth2.google import Google
+from .oauth2.oidc import OIDC
 from .oauth2.google_test_util import GoogleTestUtil
 from ._routing import TestRoutingMixin
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Dict
 from datetime import datetime
 # pylint:disable=wildcard-import,unused-wildcard-import
 from dateutil.relativedelta import *
@@ -8,6 +8,10 @@ from flask import g
 
 from ._config import Config
 
+#: The registered JWT claims (RFC 7519 section 4.1) set or checked by the middleware,
+#: plus table_name
+RESERVED_CLAIMS = frozenset({"table_name", "exp", "aud", "nbf", "iat", "iss", "jti"})
+
 
 class BaseAuthentication(ABC):
     # pylint:disable=missing-class-docstring
@@ -22,48 +26,50 @@ class BaseAuthentication(ABC):
         pass
 
     @abstractmethod
-    def encode_token(self, config: Config, entity_id: Any, exp: int, table_name: str):
+    def encode_token(self, config: Config, entity_id: Any, exp: int, table_name: str,
+                     entity_key: str = None, claims: Dict[str, Any] = None):
         # pylint:disable=missing-function-docstring
         pass
 
 
 class Authentication(BaseAuthentication):
     """
-        Uses SHA-256 hash algorithm
+        Signs tokens with the algorithm set by JWT_ROUTER_ALGORITHM (Default is HS256).
+        Holds no state, so a single instance is shared by every request.
     """
-    #: The reference to the entity key. Defaulted to `id`.
-    # See :class:`~flask_jwt_router._config` for more information.
-    entity_key: str = "id"
-
-    #: The reference to the entity key.
-    #: See :class:`~flask_jwt_router._config` for more information.
-    secret_key: str = None
-
-    #: The reference to the entity ID.
-    entity_id: str = None
 
     def __init__(self):
         # pylint:disable=useless-super-delegation
         super(Authentication, self).__init__()
 
-    def encode_token(self, config: Config, entity_id: Any, exp: int, table_name) -> str:
+    # pylint:disable=no-self-use
+    def encode_token(self, config: Config, entity_id: Any, exp: int, table_name,
+                     entity_key: str = None, claims: Dict[str, Any] = None) -> str:
         """
         :param config: See :class:`~flask_jwt_router._config`
         :param entity_id: Normally the primary key `id` or `user_id`
         :param exp: The expiry duration set when encoding a new token
         :param table_name: The Model Entity `__tablename__`
+        :param entity_key: The entity's primary key name. Defaults to the ENTITY_KEY config
+        :param claims: Optional. Extra claims e.g. `{"role": "admin"}`
         :return: str
         """
-        self.entity_key = config.entity_key
-        self.secret_key = config.secret_key
+        entity_key = entity_key or config.entity_key
+        if claims:
+            reserved = RESERVED_CLAIMS.union((entity_key,)).intersection(claims)
+            if reserved:
+                names = ", ".join(sorted(reserved))
+                raise ValueError(f"Custom claims can not override the reserved claims: {names}")
+        kid, signing_key = config.keyring.signing_key()
         # pylint: disable=line-too-long
 
         encoded = jwt.encode({
+            **(claims or {}),
             "table_name": table_name,
-            self.entity_key: entity_id,
+            entity_key: entity_id,
             # pylint: disable=no-member
             "exp": datetime.utcnow() + relativedelta(days=+exp)
-        }, self.secret_key, algorithm="HS256")
+        }, signing_key, algorithm=config.keyring.algorithm, headers={"kid": kid} if kid is not None else None)
         try:
             # Handle < pyJWT==2.0
             encoded = encoded.decode("utf-8")
@@ -76,14 +82,18 @@ class Authentication(BaseAuthentication):
         kwargs:
             - entity_id: Represents the entity's primary key
             - table_name: The table name of the entity
+            - entity_key: The entity's primary key name
+            - claims: Extra claims e.g. `{"role": "admin"}`
         :param config: See :class:`~flask_jwt_router._config`
         :param exp: The expiry duration set when encoding a new token
         :param kwargs:
         :return: Union[str, None]
         """
-        self.entity_id = kwargs.get("entity_id", None)
+        entity_id = kwargs.get("entity_id", None)
         table_name = kwargs.get("table_name", None)
-        return self.encode_token(config, self.entity_id, exp, table_name)
+        return self.encode_token(
+            config, entity_id, exp, table_name, kwargs.get("entity_key"), kwargs.get("claims")
+        )
 
     def update_token(self,
                      config: Config,
@@ -94,13 +104,17 @@ class Authentication(BaseAuthentication):
         """
         kwargs:
             - entity_id: Represents the entity's primary key
+            - entity_key: The entity's primary key name
+            - claims: Extra claims e.g. `{"role": "admin"}`
         :param config:
         :param exp:
         :param table_name:
         :return: Union[str, None]
         """
-        self.entity_id = kwargs.get("entity_id", None)
-        return self.encode_token(config, self.entity_id, exp, table_name)
+        entity_id = kwargs.get("entity_id", None)
+        return self.encode_token(
+            config, entity_id, exp, table_name, kwargs.get("entity_key"), kwargs.get("claims")
+        )
 
     def get_oauth_token(self) -> str:
         """
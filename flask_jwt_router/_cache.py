@@ -0,0 +1,172 @@
+"""
+    Small in process caches used on the request path
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable
+
+
+class BaseCache(ABC):
+    """
+    Abstract Base Class for cache backends. Subclass this to store
+    cached entities outside of the process, for example in Redis.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        # pylint:disable=missing-function-docstring
+        pass
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None:
+        # pylint:disable=missing-function-docstring
+        pass
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        # pylint:disable=missing-function-docstring
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        # pylint:disable=missing-function-docstring
+        pass
+
+
+class LRUCache(BaseCache):
+    """
+    A bounded, thread safe least recently used cache.
+    :param maxsize: The maximum number of entries held before the least recently used
+        entry is evicted
+    """
+    #: The maximum number of entries
+    maxsize: int
+
+    #: Number of successful lookups
+    hits: int = 0
+
+    #: Number of failed lookups
+    misses: int = 0
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        :param key: The cache key
+        :param default: Returned if the key is not in the cache
+        :return: Any
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        :param key: The cache key
+        :param value: The value to cache
+        :return: None
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        :param key: The cache key
+        :return: None
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all entries & resets the hit / miss counters
+        :return: None
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class TTLCache(LRUCache):
+    """
+    A bounded, thread safe cache where each entry expires after a time to live.
+    :param maxsize: The maximum number of entries held before an entry is evicted
+    :param ttl: The default time to live of an entry in seconds
+    :param policy: The eviction policy when the cache is full. Either *lru* (least recently used)
+        or *fifo* (first in, first out). Default is *lru*
+    :param timer: Returns the current time in seconds. Default is `time.monotonic`
+    """
+    #: The default time to live of an entry in seconds
+    ttl: float
+
+    #: Either *lru* or *fifo*
+    policy: str
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300, policy: str = "lru",
+                 timer: Callable[[], float] = None):
+        if policy not in ("lru", "fifo"):
+            raise ValueError(f"Unknown cache eviction policy: {policy}. Use 'lru' or 'fifo'")
+        super(TTLCache, self).__init__(maxsize)
+        self.ttl = ttl
+        self.policy = policy
+        self.timer = timer or monotonic
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        :param key: The cache key
+        :param default: Returned if the key is not in the cache or has expired
+        :return: Any
+        """
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at <= self.timer():
+                del self._data[key]
+                self.misses += 1
+                return default
+            if self.policy == "lru":
+                self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float = None) -> None:
+        """
+        :param key: The cache key
+        :param value: The value to cache
+        :param ttl: Optional. Overrides the default time to live in seconds
+        :return: None
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (self.timer() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
@@ -0,0 +1,93 @@
+"""
+    The verified claims of a request's token. Views can read custom claims
+    without loading the entity & ``JWT_ROUTER_CLAIMS_ONLY`` skips loading it.
+"""
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping as MappingType, Optional, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class Claims(Mapping):
+    """
+    An immutable view of a verified token's claims, attached to Flask's global context
+    as `g.claims`. Custom claims are read like a dict::
+
+        g.claims.entity_id  # 1
+        g.claims.table_name  # "users"
+        g.claims["role"]  # "admin"
+
+    :param claims: The decoded token
+    :param entity_key: The name of the claim holding the entity's primary key
+    """
+    __slots__ = ("_claims", "_entity_key")
+
+    def __init__(self, claims: MappingType[str, Any], entity_key: str):
+        if not isinstance(claims, MappingProxyType):
+            claims = MappingProxyType(dict(claims))
+        object.__setattr__(self, "_claims", claims)
+        object.__setattr__(self, "_entity_key", entity_key)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Claims can not be modified")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Claims can not be modified")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._claims[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._claims)
+
+    def __len__(self) -> int:
+        return len(self._claims)
+
+    def __repr__(self) -> str:
+        return f"Claims({dict(self._claims)!r})"
+
+    def get_claim(self, key: str, claim_type: Type[T], default: Optional[T] = None) -> Optional[T]:
+        """
+        :param key: The claim name
+        :param claim_type: The expected type of the claim e.g. `str`
+        :param default: Returned if the token doesn't have the claim
+        :return: The claim
+        """
+        try:
+            value = self._claims[key]
+        except KeyError:
+            return default
+        if not isinstance(value, claim_type):
+            raise TypeError(
+                f"The claim {key} is {type(value).__name__}, expected {claim_type.__name__}"
+            )
+        return value
+
+    @property
+    def entity_key(self) -> str:
+        """
+        :return: The name of the claim holding the entity's primary key e.g. *id*
+        """
+        return self._entity_key
+
+    @property
+    def entity_id(self) -> Any:
+        """
+        :return: The entity's primary key
+        """
+        return self._claims.get(self._entity_key)
+
+    @property
+    def table_name(self) -> Optional[str]:
+        """
+        :return: The entity model's `__tablename__`
+        """
+        return self._claims.get("table_name")
+
+    @property
+    def exp(self) -> Optional[int]:
+        """
+        :return: The token's expiry as a unix timestamp
+        """
+        return self._claims.get("exp")
@@ -2,9 +2,11 @@
      The main configuration class for Flask-JWT-Router
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
-from ._entity import _ORMType
+from ._entity import _ORMType, index_entity_models
+from ._route_index import RouteIndex, RouteTable, ClassificationCache
+from ._keys import load_keyring, Keyring, HMAC_ALGORITHMS
 
 
 class SecretKeyError(Exception):
@@ -35,8 +37,43 @@ class Config(BaseConfig):
     :param api_name: the api name prefix e.g `/api/v1`
     :param ignored_routes: Opt our routes from api name prefixing
     :param entity_models: Multiple entities to be authenticated
+    :param entity_index: The entity models & their primary key names keyed by `__tablename__`
     :param expire_days: Expire time for the token in days
     :param oauth_entity: If google_oauth options are declared then this will indicate the entity key in flight
+    :param reuse_url_rule: Reuse Flask's url matching result when checking that a route exists.
+        Default is *True*
+    :param route_cache_size: Max entries held for routes that Flask resolves to a redirect.
+        Default is *1024*
+    :param classification_cache: Cache the classification of each url rule & method.
+        Default is *True*
+    :param token_cache: Cache verified token claims to skip decoding repeated tokens.
+        Default is *False*
+    :param token_cache_size: Max number of cached tokens. Default is *1024*
+    :param token_cache_ttl: Max seconds a token is cached for, capped by the token's `exp`.
+        Default is *300*
+    :param token_cache_policy: The token cache eviction policy, *lru* or *fifo*. Default is *lru*
+    :param algorithm: The algorithm used to sign & verify tokens. Default is *HS256*
+    :param keyring: The keys used to sign & verify tokens. See
+        :class:`~flask_jwt_router._keys.Keyring`
+    :param entity_cache: Cache entities between requests. Default is *False*
+    :param entity_cache_size: Max number of cached entities. Default is *1024*
+    :param entity_cache_ttl: Seconds an entity is cached for. Default is *60*
+    :param lazy_entity: Attach a proxy to `g` that queries the entity when it is first read.
+        Default is *False*
+    :param claims_only: Attach the token's claims to `g.claims` without loading the entity.
+        Default is *False*
+    :param policies: List of (method, url rule, {"roles": [...], "scopes": [...]}) checked against
+        the token's claims
+    :param roles_claim: The name of the claim listing the entity's roles. Default is *roles*
+    :param scopes_claim: The name of the claim listing the token's scopes. Default is *scope*
+    :param oauth_pool_size: Max idle keep alive connections kept for each OAuth provider host.
+        Default is *10*
+    :param oauth_connect_timeout: Seconds to wait for a connection to an OAuth provider.
+        Default is *5*
+    :param oauth_read_timeout: Seconds to wait for an OAuth provider to respond. Default is *10*
+    :param async_middleware: Register the asyncio middleware. Default is *False*
+    :param route_table: The compiled whitelist & ignored routes. See
+        :class:`~flask_jwt_router._config.Config.compile_routes`
     :kwargs:
         :param entity_models: Multiple entities to be authenticated
         :param google_oauth: Options if the type or auth is Google's OAuth 2.0
@@ -46,10 +83,33 @@ class Config(BaseConfig):
     whitelist_routes: List[Tuple[str]]
     api_name: str
     ignored_routes: List[Tuple[str]]
-    entity_models: List[_ORMType]
+    _entity_models: List[_ORMType] = []
+    entity_index: Dict[str, Tuple[_ORMType, Optional[str]]] = {}
     expire_days: int
     google_oauth: Dict
     oauth_entity: str = None
+    reuse_url_rule: bool = True
+    route_cache_size: int = 1024
+    classification_cache: bool = True
+    token_cache: bool = False
+    token_cache_size: int = 1024
+    token_cache_ttl: int = 300
+    token_cache_policy: str = "lru"
+    algorithm: str = "HS256"
+    keyring: Keyring
+    entity_cache: bool = False
+    entity_cache_size: int = 1024
+    entity_cache_ttl: int = 60
+    lazy_entity: bool = False
+    claims_only: bool = False
+    policies: List[Tuple[str, str, Dict[str, Any]]]
+    roles_claim: str = "roles"
+    scopes_claim: str = "scope"
+    oauth_pool_size: int = 10
+    oauth_connect_timeout: float = 5
+    oauth_read_timeout: float = 10
+    async_middleware: bool = False
+    route_table: RouteTable
 
     def init_config(self, app_config: Dict[str, Any], **kwargs) -> None:
         """
@@ -64,9 +124,89 @@ class Config(BaseConfig):
         self.entity_models = app_config.get("ENTITY_MODELS") or kwargs.get("entity_models") or []
         self.expire_days = app_config.get("JWT_EXPIRE_DAYS")
         self.google_oauth = kwargs.get("google_oauth")
+        self.reuse_url_rule = app_config.get("JWT_ROUTER_REUSE_URL_RULE", True)
+        self.route_cache_size = app_config.get("JWT_ROUTER_ROUTE_CACHE_SIZE", 1024)
+        self.classification_cache = app_config.get("JWT_ROUTER_CLASSIFICATION_CACHE", True)
+        self.token_cache = app_config.get("JWT_ROUTER_TOKEN_CACHE", False)
+        self.token_cache_size = app_config.get("JWT_ROUTER_TOKEN_CACHE_SIZE", 1024)
+        self.token_cache_ttl = app_config.get("JWT_ROUTER_TOKEN_CACHE_TTL", 300)
+        self.token_cache_policy = app_config.get("JWT_ROUTER_TOKEN_CACHE_POLICY", "lru")
+        self.algorithm = app_config.get("JWT_ROUTER_ALGORITHM") or "HS256"
+        self.entity_cache = app_config.get("JWT_ROUTER_ENTITY_CACHE", False)
+        self.entity_cache_size = app_config.get("JWT_ROUTER_ENTITY_CACHE_SIZE", 1024)
+        self.entity_cache_ttl = app_config.get("JWT_ROUTER_ENTITY_CACHE_TTL", 60)
+        self.lazy_entity = app_config.get("JWT_ROUTER_LAZY_ENTITY", False)
+        self.claims_only = app_config.get("JWT_ROUTER_CLAIMS_ONLY", False)
+        self.policies = app_config.get("JWT_ROUTER_POLICIES") or []
+        self.roles_claim = app_config.get("JWT_ROUTER_ROLES_CLAIM") or "roles"
+        self.scopes_claim = app_config.get("JWT_ROUTER_SCOPES_CLAIM") or "scope"
+        self.oauth_pool_size = app_config.get("JWT_ROUTER_OAUTH_POOL_SIZE", 10)
+        self.oauth_connect_timeout = app_config.get("JWT_ROUTER_OAUTH_CONNECT_TIMEOUT", 5)
+        self.oauth_read_timeout = app_config.get("JWT_ROUTER_OAUTH_READ_TIMEOUT", 10)
+        self.async_middleware = app_config.get("JWT_ROUTER_ASYNC", False)
 
-        if not self.secret_key:
+        if (not self.secret_key and self.algorithm in HMAC_ALGORITHMS
+                and not app_config.get("JWT_ROUTER_KEYS")):
             raise SecretKeyError
 
+        self.keyring = load_keyring(self.algorithm, self.secret_key, app_config)
+
+        self.compile_routes()
+
         if self.google_oauth:
             self.oauth_entity = self.google_oauth["email_field"]
+
+    @property
+    def entity_models(self) -> List[_ORMType]:
+        """
+        :return: The entity models
+        """
+        return self._entity_models
+
+    @entity_models.setter
+    def entity_models(self, entity_models: List[_ORMType]) -> None:
+        """
+        Indexes the entity models by `__tablename__`. Raises
+        :class:`~flask_jwt_router._entity.EntityModelError` if a model has no `__tablename__`
+        :param entity_models: The entity models
+        :return: None
+        """
+        self.entity_index = index_entity_models(entity_models)
+        self._entity_models = entity_models
+
+    def prefix_api_name(self, w_routes: List[Tuple[str]] = None) -> List[Tuple[str]]:
+        """
+        If the config has JWT_ROUTER_API_NAME defined then
+        update each white listed route with an api name
+        :example: "/user" -> "/api/v1/user"
+        :param w_routes:
+        :return List[Tuple[str]]:
+        """
+        api_name = self.api_name
+        if not api_name:
+            return w_routes
+        # Prepend the api name to the white listed route
+        named_white_routes = []
+        for route_name in w_routes:
+            verb, path = route_name
+            named_white_routes.append((verb, f"{api_name}{path}"))
+        return named_white_routes
+
+    def compile_routes(self) -> None:
+        """
+        Compiles the white listed routes (prefixed with the api name) & ignored routes
+        into an immutable :class:`~flask_jwt_router._route_index.RouteTable`.
+        This is called from :class:`~flask_jwt_router._config.Config.init_config`.
+        If you update `whitelist_routes`, `ignored_routes` or `api_name` after
+        your app has been initialised then rebuild the route table::
+
+            jwt_routes.config.whitelist_routes.append(("GET", "/health"))
+            jwt_routes.config.compile_routes()
+
+        :return: None
+        """
+        self.route_table = RouteTable(
+            ignored=RouteIndex(self.ignored_routes),
+            whitelist=RouteIndex(self.prefix_api_name(self.whitelist_routes)),
+            classifications=ClassificationCache(),
+        )
@@ -4,11 +4,122 @@
 """
 import inspect
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from functools import partial
 from flask import g
-from typing import Any, ClassVar, List, Tuple, Dict, Union, Optional
+from typing import Any, Awaitable, Callable, ClassVar, List, Tuple, Dict, Union, Optional, Set
+from werkzeug.local import LocalProxy
+
+from ._cache import BaseCache
 
 _ORMType = type(List[Tuple[int, str]])
 
+#: Called with the entity key & value, returns the entity. Coroutine functions are awaited
+#: by :class:`~flask_jwt_router._routing.Routing.before_middleware_async`
+EntityLoader = Callable[[str, Any], Union[_ORMType, Awaitable[_ORMType]]]
+
+
+class EntityModelError(Exception):
+    message = (
+        "[FLASK-JWT-ROUTER ERROR]: Your Entity model must have a `__tablename__` that"
+        " is equal to the table_name specified in create_token(). For details visit:\n"
+        "https://flask-jwt-router.readthedocs.io/en/latest/jwt_routes.html#authorization-tokens"
+    )
+
+    def __init__(self, model):
+        super(EntityModelError, self).__init__(f"{model}\n{self.message}")
+
+
+class AsyncEntityLoaderError(Exception):
+    message = (
+        "[FLASK-JWT-ROUTER ERROR]: The entity loader is a coroutine function, which can only"
+        " be awaited by the asyncio middleware. Set JWT_ROUTER_ASYNC to True or register a"
+        " synchronous loader."
+    )
+
+    def __init__(self, model):
+        super(AsyncEntityLoaderError, self).__init__(f"{model}\n{self.message}")
+
+
+def index_entity_models(entity_models: List[_ORMType]) -> Dict[str, Tuple[_ORMType, Optional[str]]]:
+    """
+    Indexes each entity model by its `__tablename__`. If SQLAlchemy is the ORM then
+    the name of the model's first primary key is stored with the model, otherwise None.
+    :param entity_models: The entity models
+    :return: {__tablename__: (entity model, primary key name)}
+    """
+    entity_index = {}
+    for model in entity_models or ():
+        tablename = getattr(model, "__tablename__", None)
+        if not tablename:
+            raise EntityModelError(model)
+        pk_name = None
+        if hasattr(model, "__mapper__"):
+            # SqlAlchemy is the ORM being used
+            pk_name = model.__mapper__.primary_key[0].name
+        entity_index[tablename] = (model, pk_name)
+    return entity_index
+
+
+def query_entity(auth_model: _ORMType, entity_key: str, entity_value: Any) -> _ORMType:
+    """
+    The default entity loader
+    :param auth_model: The SqlAlchemy model
+    :param entity_key: The SqlAlchemy field name to query against
+    :param entity_value: The field row value to filter with
+    :return: {_ORMType}
+    """
+    return auth_model.query.filter_by(**{entity_key: entity_value}).one()
+
+
+class _EntitySnapshot:
+    """
+    The column values of a SQLAlchemy entity, cached instead of the instance, which belongs
+    to the session of the request that loaded it
+    """
+    __slots__ = ("auth_model", "values")
+
+    def __init__(self, auth_model: _ORMType, values: Dict[str, Any]):
+        self.auth_model = auth_model
+        self.values = values
+
+
+def snapshot_entity(auth_model: _ORMType, entity: _ORMType) -> Any:
+    """
+    :param auth_model: The entity model
+    :param entity: The loaded entity
+    :return: A snapshot of a SQLAlchemy entity's columns, otherwise the entity
+    """
+    if not hasattr(auth_model, "__mapper__") or not isinstance(entity, auth_model):
+        # e.g. a custom loader's result
+        return entity
+    values = {attr.key: getattr(entity, attr.key) for attr in auth_model.__mapper__.column_attrs}
+    return _EntitySnapshot(auth_model, values)
+
+
+def restore_entity(cached: Any) -> _ORMType:
+    """
+    Rebuilds a SQLAlchemy entity from its snapshot & adds it to the session of the entity
+    model's `query` without querying the database, so each request gets its own instance
+    :param cached: The value read from the entity cache
+    :return: The entity
+    """
+    if not isinstance(cached, _EntitySnapshot):
+        return cached
+    # pylint:disable=import-outside-toplevel
+    from sqlalchemy.orm import make_transient_to_detached
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    auth_model = cached.auth_model
+    entity = auth_model.__mapper__.class_manager.new_instance()
+    for key, value in cached.values.items():
+        set_committed_value(entity, key, value)
+    make_transient_to_detached(entity)
+    session = getattr(getattr(auth_model, "query", None), "session", None)
+    if session is None:
+        return entity
+    return session.merge(entity, load=False)
+
 
 class NoTokenInHeadersError(Exception):
     message = "No token in headers error!\n" \
@@ -38,51 +149,173 @@ class BaseEntity(ABC):
         # pylint:disable=missing-function-docstring
         pass
 
+    @abstractmethod
+    def get_lazy_entity(self, decoded_token: Dict[str, Any]) -> Optional[LocalProxy]:
+        # pylint:disable=missing-function-docstring
+        pass
+
     @abstractmethod
     def get_entity_from_ext(self, table_name: str = None) -> _ORMType:
         # pylint:disable=missing-function-docstring
         pass
 
+    @abstractmethod
+    def reset(self) -> None:
+        # pylint:disable=missing-function-docstring
+        pass
+
     @abstractmethod
     def clean_up(self) -> None:
         # pylint:disable=missing-function-docstring
         pass
 
 
+class _EntityState:
+    """
+    The state of the request being handled. See :class:`~flask_jwt_router._entity.Entity`
+    """
+    __slots__ = ("decoded_token", "auth_model", "tablename", "oauth_entity_key")
+
+    def __init__(self):
+        self.decoded_token: Optional[Dict[str, Any]] = None
+        self.auth_model: Optional[_ORMType] = None
+        self.tablename: Optional[str] = None
+        self.oauth_entity_key: Optional[str] = None
+
+
 
 class Entity(BaseEntity):
     """
+    The request state (`decoded_token`, `auth_model`, `tablename` & `oauth_entity_key`)
+    is held in a context variable, so each thread, greenlet or asyncio task handling
+    a request only sees its own state.
     :param config:
-    :param auth_model:
+    :param cache: Optional. See :class:`~flask_jwt_router._cache.BaseCache`
+    :param loaders: Optional. Custom entity loaders keyed by entity model
     """
 
-    #: The result from the decoded token.
-    #: This gets assigned in :class:`~get_entity_from_token`
-    decoded_token: Dict[str, Any] = None
-
-    #: The assigned entity model in the current request
-    #: This gets assigned in :class:`~flask_jwt_router._entity.get_entity_from_token`
-    auth_model: _ORMType = None
+    entity_key: str = None
 
-    #: The table name value from :class: `~flask_jwt_router.oauth2.google`. This
-    #: indicates we are now using oauth 2.0.
-    tablename: Optional[str] = None
+    #: Optional. Entities keyed by (tablename, attribute name, attribute value).
+    #: See :class:`~flask_jwt_router._cache.BaseCache`
+    cache: Optional[BaseCache] = None
 
-    #: This will override the config.entity_key for oauth 2.0 in flight tokens
-    _oauth_entity_key: str = None
+    #: The callable that loads each entity model's entities.
+    #: See :class:`~flask_jwt_router._entity.Entity.register_loader`
+    loaders: Dict[_ORMType, EntityLoader]
 
-    entity_key: str = None
+    #: The attribute names entities are looked up by, keyed by tablename. The cache keys
+    #: removed by :class:`~flask_jwt_router._entity.Entity.invalidate` are built from these.
+    #: See :class:`~flask_jwt_router._entity.Entity.register_lookup_attr`
+    lookup_attrs: Dict[str, Set[str]]
 
-    def __init__(self, config: ClassVar):
+    def __init__(self, config: ClassVar, cache: BaseCache = None,
+                 loaders: Dict[_ORMType, EntityLoader] = None):
         self.config = config
+        self.cache = cache
+        # Every process derives the same keys from the config, so a cache shared between
+        # processes is invalidated for entities that were only cached by another process
+        self.lookup_attrs = {
+            tablename: {pk_name or self.config.entity_key}
+            for tablename, (_, pk_name) in self.config.entity_index.items()
+        }
+        self.loaders = {model: partial(query_entity, model) for model in self.config.entity_models}
+        self.loaders.update(loaders or {})
+        self._state: ContextVar = ContextVar(f"flask_jwt_router_entity_{id(self)}")
+
+    @property
+    def state(self) -> _EntityState:
+        """
+        :return: The state of the request being handled
+        """
+        try:
+            return self._state.get()
+        except LookupError:
+            state = _EntityState()
+            self._state.set(state)
+            return state
+
+    def reset(self) -> None:
+        """
+        Starts a new request state. Threads are reused between requests by most
+        WSGI servers, so this is called at the start of every request.
+        :return: None
+        """
+        self._state.set(_EntityState())
+
+    @property
+    def decoded_token(self) -> Optional[Dict[str, Any]]:
+        """
+        The result from the decoded token.
+        This gets assigned in
+        :class:`~flask_jwt_router._entity.Entity.get_entity_from_token_or_tablename`
+        """
+        return self.state.decoded_token
+
+    @decoded_token.setter
+    def decoded_token(self, val: Optional[Dict[str, Any]]):
+        self.state.decoded_token = val
+
+    @property
+    def auth_model(self) -> Optional[_ORMType]:
+        """
+        The assigned entity model in the current request
+        This gets assigned in
+        :class:`~flask_jwt_router._entity.Entity.get_entity_from_token_or_tablename`
+        """
+        return self.state.auth_model
+
+    @auth_model.setter
+    def auth_model(self, val: Optional[_ORMType]):
+        self.state.auth_model = val
+
+    @property
+    def tablename(self) -> Optional[str]:
+        """
+        The table name value from :class: `~flask_jwt_router.oauth2.google`. This
+        indicates we are now using oauth 2.0.
+        """
+        return self.state.tablename
+
+    @tablename.setter
+    def tablename(self, val: Optional[str]):
+        self.state.tablename = val
+
+    def register_loader(self, auth_model: _ORMType, loader: EntityLoader) -> None:
+        """
+        Loads the entity model's entities with a custom callable, e.g.::
+
+            def load_user(entity_key, entity_value):
+                return UserModel.query.options(joinedload(UserModel.roles)).get(entity_value)
+
+        :param auth_model: The entity model
+        :param loader: Called with the entity key & value, returns the entity
+        :return: None
+        """
+        # Replace rather than mutate the registry, it is read by other threads
+        self.loaders = {**self.loaders, auth_model: loader}
+
+    def register_lookup_attr(self, tablename: str, attr: str) -> None:
+        """
+        Adds an attribute entities are looked up by, e.g. an OAuth strategy's `email_field`,
+        so that :class:`~flask_jwt_router._entity.Entity.invalidate` removes the entities
+        cached by that attribute.
+        :param tablename: The entity model's `__tablename__`
+        :param attr: The attribute name
+        :return: None
+        """
+        self.lookup_attrs.setdefault(tablename, set()).add(attr)
 
     @property
     def oauth_entity_key(self):
-        return self._oauth_entity_key
+        """
+        This will override the config.entity_key for oauth 2.0 in flight tokens
+        """
+        return self.state.oauth_entity_key
 
     @oauth_entity_key.setter
     def oauth_entity_key(self, val: str):
-        self._oauth_entity_key = val
+        self.state.oauth_entity_key = val
 
     def get_attr_name(self, table_name: str = None) -> str:
         """
@@ -92,24 +325,57 @@ class Entity(BaseEntity):
         primary key attribute name. This method maintains the
         existing option of specifying a primary key name directly
         for scenarios when not using SqlAlchemy etc.
-        :param table_name:
+        :param table_name: Optional. Overrides the entity model of the current request
         :return:
         """
+        if table_name:
+            # e.g. create_token(table_name=...), the request may already have an entity model
+            return self._index_entry(table_name)[1] or self.entity_key
         if not self.auth_model:
-            self.auth_model = self.get_entity_from_ext(table_name)
-        if hasattr(self.auth_model, "__mapper__"):
-            # SqlAlchemy is the ORM being used
-            return self.auth_model.__mapper__.primary_key[0].name
-        return self.entity_key
+            self.auth_model = self.get_entity_from_ext()
+        entry = self.config.entity_index.get(getattr(self.auth_model, "__tablename__", None))
+        if entry is not None and entry[0] is self.auth_model:
+            pk_name = entry[1]
+        elif hasattr(self.auth_model, "__mapper__"):
+            pk_name = self.auth_model.__mapper__.primary_key[0].name
+        else:
+            pk_name = None
+        return pk_name or self.entity_key
 
-    def _get_from_model(self, entity_key: str, entity_value: Any) -> _ORMType:
+    def _get_from_model(self, entity_key: str, entity_value: Any,
+                        auth_model: _ORMType = None) -> _ORMType:
         """
+        Loads the entity with the entity model's registered loader
         :param entity_key: The SqlAlchemy field name to query against
         :param entity_value: The field row value to filter with
+        :param auth_model: Optional. Defaults to the entity model of the current request
         :return: {_ORMType}
         """
-        # entity_key: str = self.get_attr_name()
-        result = self.auth_model.query.filter_by(**{entity_key: entity_value}).one()
+        auth_model = auth_model or self.auth_model
+        loader = self.loaders.get(auth_model)
+        if loader is None:
+            return query_entity(auth_model, entity_key, entity_value)
+        result = loader(entity_key, entity_value)
+        if inspect.isawaitable(result):
+            if inspect.iscoroutine(result):
+                result.close()
+            raise AsyncEntityLoaderError(auth_model)
+        return result
+
+    async def _get_from_model_async(self, entity_key: str, entity_value: Any,
+                                    auth_model: _ORMType = None) -> _ORMType:
+        """
+        Loads the entity with the entity model's registered loader, awaiting coroutine loaders.
+        Synchronous loaders are called on the event loop's thread, so they share the request's
+        database session.
+        """
+        auth_model = auth_model or self.auth_model
+        loader = self.loaders.get(auth_model)
+        if loader is None:
+            return query_entity(auth_model, entity_key, entity_value)
+        result = loader(entity_key, entity_value)
+        if inspect.isawaitable(result):
+            result = await result
         return result
 
     def get_entity_from_ext(self, tablename: str = None) -> _ORMType:
@@ -127,22 +393,16 @@ class Entity(BaseEntity):
                 self.tablename = self.decoded_token.get("table_name")
             except AttributeError as err:
                 raise NoTokenInHeadersError(err)
-        auth_model = None
+        return self._index_entry(self.tablename)[0]
 
-        for model in self.config.entity_models:
-            if hasattr(model, "__tablename__"):
-                if self.tablename == model.__tablename__:
-                    auth_model = model
-            else:
-                raise Exception(
-                    "[FLASK-JWT-ROUTER ERROR]: Your Entity model must have a `__tablename__` that"
-                    " is equal to the table_name specified in create_token()."
-                    "For details visit:\n"
-                    # pylint:disable=line-too-long
-                    "https://flask-jwt-router.readthedocs.io/en/latest/jwt_routes.html#authorization-tokens"
-                )
-        if auth_model:
-            return auth_model
+    def _index_entry(self, tablename: str) -> Tuple[_ORMType, Optional[str]]:
+        """
+        :param tablename: The entity model's `__tablename__`
+        :return: The entity model & its primary key name
+        """
+        entry = self.config.entity_index.get(tablename)
+        if entry:
+            return entry
         raise Exception(
             "[FLASK-JWT-ROUTER ERROR]: Your Entity model must have a `__tablename__` attribute!"
             " If you are running flask-jwt-router against tests, make sure"
@@ -158,57 +418,187 @@ class Entity(BaseEntity):
     ) -> Union[str, None]:
         """
         Entity class main public method.
-        Attaches a __get_entity__ method to the AuthModel class &
-        calling the attached method returns the entity data
+        Loads the entity with the AuthModel's registered loader
+        :param decoded_token: {Dict[str, Any]}
+        :kwargs:
+            :param tablename: This is passed in directly from any oauth 2.0 sessions
+        :return: {str}
+        """
+        entity_key = self._resolve_auth_model(decoded_token, tablename)
+        try:
+            # If self.oauth_entity_key exists then we have a google oauth 2.0 access token
+            if self.oauth_entity_key:
+                result = self._get_entity(self.oauth_entity_key, email_value)
+            else:
+                result = self._get_entity(entity_key, decoded_token[entity_key])
+            return result
+        except KeyError as _:
+            return None
+
+    async def get_entity_from_token_or_tablename_async(
+            self,
+            decoded_token: Dict[str, any] = None,
+            *,
+            tablename=None,
+            email_value=None,
+    ) -> Union[str, None]:
+        """
+        The asyncio variant of
+        :class:`~flask_jwt_router._entity.Entity.get_entity_from_token_or_tablename`,
+        which awaits loaders that are coroutine functions
         :param decoded_token: {Dict[str, Any]}
         :kwargs:
             :param tablename: This is passed in directly from any oauth 2.0 sessions
         :return: {str}
         """
+        entity_key = self._resolve_auth_model(decoded_token, tablename)
+        try:
+            if self.oauth_entity_key:
+                return await self._get_entity_async(self.oauth_entity_key, email_value)
+            return await self._get_entity_async(entity_key, decoded_token[entity_key])
+        except KeyError as _:
+            return None
+
+    def _resolve_auth_model(self, decoded_token: Optional[Dict[str, Any]],
+                            tablename: Optional[str]) -> str:
+        """
+        Sets the entity model of the current request
+        :param decoded_token: The verified token's claims
+        :param tablename: This is passed in directly from any oauth 2.0 sessions
+        :return: The entity key
+        """
         if decoded_token:
             self.decoded_token = decoded_token
         if tablename:
             # This means that the user has logged in via a oauth 2.0 strategy
             self.tablename = tablename
         self.auth_model = self.get_entity_from_ext()
-        entity_key: str = self.get_attr_name()
-        self._attach_method()
+        return self.get_attr_name()
+
+    def get_lazy_entity(self, decoded_token: Dict[str, Any]) -> Optional[LocalProxy]:
+        """
+        Resolves the entity model from the token's claims without querying the database.
+        The entity is queried the first time the returned proxy is read & then reused
+        for the rest of the request.
+        :param decoded_token: The verified token's claims
+        :return: A proxy to the entity or None if the token has no entity attribute
+        """
+        self.decoded_token = decoded_token
+        self.auth_model = self.get_entity_from_ext()
+        auth_model = self.auth_model
+        entity_key = self.get_attr_name()
         try:
-            # If self.oauth_entity_key exists then we have a google oauth 2.0 access token
-            if self.oauth_entity_key:
-                result = self.auth_model.__get_entity__(self.oauth_entity_key, email_value)
-            else:
-                result = self.auth_model.__get_entity__(entity_key, decoded_token[self.get_attr_name()])
-            return result
+            entity_value = decoded_token[entity_key]
         except KeyError as _:
             return None
+        loaded: List[_ORMType] = []
 
-    def _attach_method(self) -> None:
+        def load() -> _ORMType:
+            if not loaded:
+                loaded.append(self._get_entity(entity_key, entity_value, auth_model))
+            return loaded[0]
+        return LocalProxy(load)
+
+    def _get_entity(self, entity_key: str, entity_value: Any,
+                    auth_model: _ORMType = None) -> _ORMType:
+        """
+        Returns the entity from the cache if there is one, otherwise queries the auth model
+        :param entity_key: The field name to query against
+        :param entity_value: The field row value to filter with
+        :param auth_model: Optional. Defaults to the entity model of the current request
+        :return: {_ORMType}
+        """
+        auth_model = auth_model or self.auth_model
+        cache = self.cache
+        if cache is None:
+            return self._get_from_model(entity_key, entity_value, auth_model)
+        tablename = auth_model.__tablename__
+        cache_key = (tablename, entity_key, entity_value)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return restore_entity(cached)
+        result = self._get_from_model(entity_key, entity_value, auth_model)
+        self.register_lookup_attr(tablename, entity_key)
+        cache.set(cache_key, snapshot_entity(auth_model, result))
+        return result
+
+    async def _get_entity_async(self, entity_key: str, entity_value: Any,
+                                auth_model: _ORMType = None) -> _ORMType:
+        auth_model = auth_model or self.auth_model
+        cache = self.cache
+        if cache is None:
+            return await self._get_from_model_async(entity_key, entity_value, auth_model)
+        tablename = auth_model.__tablename__
+        cache_key = (tablename, entity_key, entity_value)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return restore_entity(cached)
+        result = await self._get_from_model_async(entity_key, entity_value, auth_model)
+        self.register_lookup_attr(tablename, entity_key)
+        cache.set(cache_key, snapshot_entity(auth_model, result))
+        return result
+
+    def invalidate(self, entity: _ORMType) -> None:
         """
-        Check if __get__entity__ doesn't already exist & attach
-        __get_entity__ onto the entity model class
+        Removes an entity from the cache by each of its table's
+        :class:`~flask_jwt_router._entity.Entity.lookup_attrs`. This is called from SQLAlchemy's
+        `after_update` & `after_delete` events for each of the entity models, call it directly
+        if your entities are updated outside of the SQLAlchemy session.
+        :param entity: The entity model instance
         :return: None
         """
-        methods = inspect.getmembers(self.auth_model, predicate=inspect.ismethod)
-        for method in methods:
-            if method == "__get_entity__":
-                raise ValueError("__get_entity__ method already exists")
-        setattr(
-            self.auth_model,
-            "__get_entity__",
-            self._get_from_model
-        )
+        if self.cache is None:
+            return
+        try:
+            # pylint:disable=import-outside-toplevel
+            from sqlalchemy import inspect as sa_inspect
+            from sqlalchemy.exc import NoInspectionAvailable
+        except ImportError:
+            sa_inspect = None
+        tablename = entity.__tablename__
+        for attr in self.lookup_attrs.get(tablename, ()):
+            values = {getattr(entity, attr, None)}
+            if sa_inspect is not None:
+                try:
+                    # The value the entity was cached by before the update
+                    values.update(sa_inspect(entity).attrs[attr].history.deleted or ())
+                except (NoInspectionAvailable, KeyError):
+                    # Not a SQLAlchemy model or attribute
+                    pass
+            for value in values:
+                self.cache.delete((tablename, attr, value))
+
+    def _on_entity_change(self, mapper, connection, target) -> None:
+        # pylint:disable=unused-argument
+        self.invalidate(target)
+
+    def register_invalidation_hooks(self) -> None:
+        """
+        Listens to SQLAlchemy's `after_update` & `after_delete` events on each
+        entity model so that changes are removed from the cache
+        :return: None
+        """
+        if self.cache is None:
+            return
+        try:
+            # pylint:disable=import-outside-toplevel
+            from sqlalchemy import event
+        except ImportError:
+            return
+        for model in self.config.entity_models:
+            if hasattr(model, "__mapper__"):
+                for identifier in ("after_update", "after_delete"):
+                    if not event.contains(model, identifier, self._on_entity_change):
+                        event.listen(model, identifier, self._on_entity_change)
 
     def clean_up(self) -> None:
         """
         Cleans up the following from the previous request:
-            - oauth_entity_key
-            - tablename
+            - decoded_token, auth_model, oauth_entity_key & tablename
             - Removes any entities from g contained in config.entity_models
         """
-        self.oauth_entity_key = None
-        self.tablename = None
+        self.reset()
         # This removes all entities attached from the previous request
-        for v in self.config.entity_models:
-            if hasattr(g, v.__tablename__):
-                delattr(g, v.__tablename__)
+        for tablename in self.config.entity_index:
+            if hasattr(g, tablename):
+                delattr(g, tablename)
@@ -53,6 +53,19 @@
             return "I don't need authorizing!"
 
 
+    Or tag the view functions, the tags are matched on the request's endpoint
+    so they don't need updating when the url rule or api name changes::
+
+        @app.route("/register", methods=["POST"])
+        @jwt_routes.public
+        def register():
+            return "I don't need authorizing!"
+
+        @app.route("/api/v1/account", methods=["GET"])
+        @jwt_routes.protected  # Takes priority over WHITE_LIST_ROUTES
+        def account():
+            ...
+
     Bypass Flask-JWT-Router on specified routes::
 
         # Define homepage template routes for example on JWT_IGNORE_ROUTES
@@ -62,6 +75,13 @@
             ("GET", "/")
         ]
 
+    Routes are classified (static, ignored, whitelisted or protected) once per url rule & method.
+    Classify all registered routes up front & check the cache counters::
+
+        jwt_routes.routing.warm_classification_cache()
+        jwt_routes.routing.classification_cache_info()
+        # {"hits": 1024, "misses": 0, "size": 12}
+
 
     Declare an entity model::
 
@@ -79,6 +99,19 @@
             ...
             jwt_routes.init_app(app, entity_models=[UserModel, TeacherModel, ...etc])
 
+    Blueprints & Url Prefixes
+    =========================
+
+    By default every request to the app is classified. To only authorize part of the app,
+    e.g. an api served next to html pages & health checks, pass the blueprints or url prefixes.
+    Other requests skip Flask-JWT-Router completely::
+
+        api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+        JwtRoutes(app, blueprints=[api])  # Or blueprint names e.g. ["api"]
+        # Or
+        JwtRoutes(app, url_prefixes=["/api/", "/admin/"])
+
     Setting the Token Expire Duration
     =================================
 
@@ -98,6 +131,248 @@
 
     By default the expire duration is set to 30 days
 
+    Signing Algorithms
+    ==================
+
+    Tokens are signed with HS256 & your app's SECRET_KEY by default. To let other services
+    verify tokens with only a public key, use an RSA, ECDSA or Ed25519 algorithm
+    (requires ``pip install flask-jwt-router[crypto]``)::
+
+        # The service that creates tokens
+        app.config["JWT_ROUTER_ALGORITHM"] = "RS256"  # or PS256, ES256, EdDSA etc.
+        app.config["JWT_ROUTER_PRIVATE_KEY_FILE"] = "/secrets/jwt_private.pem"
+        app.config["JWT_ROUTER_PRIVATE_KEY_PASSWORD"] = "optional password"
+
+        # Services that only verify tokens
+        app.config["JWT_ROUTER_ALGORITHM"] = "RS256"
+        app.config["JWT_ROUTER_PUBLIC_KEY_FILE"] = "/secrets/jwt_public.pem"
+        # Or a local JWKS file
+        app.config["JWT_ROUTER_JWKS_FILE"] = "/secrets/jwks.json"
+
+    Keys are loaded once when ``init_app`` is called.
+
+    Key Rotation
+    ============
+
+    Tokens are stamped with a *kid* header & verified with the matching key, so keys can be
+    rotated without invalidating every live token. Tokens without a *kid* header are verified
+    with SECRET_KEY (or the PEM key)::
+
+        app.config["JWT_ROUTER_KEYS"] = {
+            "2021-06": "previous_secret",
+            "2021-07": "current_secret",
+        }
+        app.config["JWT_ROUTER_SIGNING_KID"] = "2021-07"
+
+        # For RSA, ECDSA & Ed25519 each key in JWT_ROUTER_JWKS_FILE is stored under its kid
+
+    Add & retire keys at runtime::
+
+        # 1. Accept tokens signed with the new key
+        jwt_routes.add_key("2021-08", "next_secret")
+        # 2. Sign new tokens with the new key
+        jwt_routes.use_signing_key("2021-08")
+        # 3. Once the old tokens have expired, stop accepting them
+        jwt_routes.retire_key("2021-07")
+
+        # Or update JWT_ROUTER_JWKS_FILE & reload the keyring in each worker
+        jwt_routes.reload_keys()
+
+    Caching Verified Tokens
+    =======================
+
+    Clients often send the same token on every request. Opt in to caching the verified claims
+    so repeated tokens skip the signature check & JSON decoding::
+
+        app.config["JWT_ROUTER_TOKEN_CACHE"] = True
+        # Optional
+        app.config["JWT_ROUTER_TOKEN_CACHE_SIZE"] = 1024  # Max number of cached tokens
+        app.config["JWT_ROUTER_TOKEN_CACHE_TTL"] = 300  # Seconds, always capped by the token's exp
+        app.config["JWT_ROUTER_TOKEN_CACHE_POLICY"] = "lru"  # or "fifo"
+
+    Caching Entities
+    ================
+
+    Each protected request loads its entity from the database. Opt in to caching entities
+    between requests::
+
+        app.config["JWT_ROUTER_ENTITY_CACHE"] = True
+        # Optional
+        app.config["JWT_ROUTER_ENTITY_CACHE_SIZE"] = 1024  # Max number of cached entities
+        app.config["JWT_ROUTER_ENTITY_CACHE_TTL"] = 60  # Seconds
+
+    SQLAlchemy models are removed from the cache when they are updated or deleted. The cache
+    holds a snapshot of each entity's columns, & each request gets its own instance in the
+    session of the model's ``query`` without a database query, so cached entities are read &
+    changed like loaded ones. For more than one process, pass a shared backend that implements
+    :class:`~flask_jwt_router._cache.BaseCache`::
+
+        class RedisEntityCache(BaseCache):
+            ...
+
+        JwtRoutes(app, entity_models=[UserModel], entity_cache=RedisEntityCache())
+
+    An entity is removed by its primary key & each OAuth strategy's `email_field`, whichever
+    process cached it. If a custom loader looks entities up by another attribute, register it
+    with ``jwt_routes.entity.register_lookup_attr("users", "username")``.
+
+    Entity Loaders
+    ==============
+
+    By default entities are loaded with ``UserModel.query.filter_by(id=...).one()``.
+    Register a custom loader per entity model, e.g. to eager load relationships::
+
+        def load_user(entity_key, entity_value):
+            return UserModel.query.options(joinedload(UserModel.roles)).get(entity_value)
+
+        jwt_routes.register_entity_loader(UserModel, load_user)
+        # Or
+        JwtRoutes(app, entity_models=[UserModel], entity_loaders={UserModel: load_user})
+
+    Lazy Entities
+    =============
+
+    Views that only need an authenticated caller don't need the entity. Opt in to attaching
+    a proxy to Flask's global context instead, the token is still verified on every request
+    but the entity is only queried the first time the view reads it::
+
+        app.config["JWT_ROUTER_LAZY_ENTITY"] = True
+
+        @app.route("/users/me")
+        def me():
+            return {"name": g.users.name}  # The entity is queried here
+
+    ``g.users`` is a :class:`werkzeug.local.LocalProxy`, call ``g.users._get_current_object()``
+    for the entity itself, e.g. before passing it to ``db.session.merge``.
+
+    Claims Only
+    ===========
+
+    Services that only need the entity's id & table name can skip the database completely.
+    The verified claims are attached to Flask's global context as an immutable
+    :class:`~flask_jwt_router._claims.Claims` object instead of the entity::
+
+        app.config["JWT_ROUTER_CLAIMS_ONLY"] = True
+
+        @app.route("/orders")
+        def orders():
+            user_id = g.claims.entity_id
+            table_name = g.claims.table_name
+            role = g.claims.get("role")  # Any other claim in the token
+
+    Custom Claims
+    =============
+
+    Data that rarely changes, such as roles or a tenant id, can be stored in the token so views
+    don't need to load the entity. Pass extra claims when a token is created or updated,
+    or register a claims builder for an entity model::
+
+        jwt_routes.create_token(entity_id=user.id, table_name="users", claims={"role": user.role})
+
+        jwt_routes.register_claims_builder(
+            UserModel, lambda user_id: {"tenant_id": get_tenant_id(user_id)}
+        )
+
+    The verified claims of every request are attached to ``g.claims``. Read them with a type check::
+
+        role = g.claims.get_claim("role", str)
+        tenant_id = g.claims.get_claim("tenant_id", int, default=0)
+
+    Claims are only refreshed when a new token is created, so keep them small & update the
+    token when they change. ``table_name``, the entity key & the registered JWT claims
+    (``exp``, ``aud``, ``nbf``, ``iat``, ``iss`` & ``jti``) can not be overridden.
+
+    Roles & Scopes
+    ==============
+
+    Restrict protected routes to the roles or scopes in the token's claims (see Custom Claims).
+    Requests are rejected with a 403 before the entity is loaded::
+
+        @app.route("/api/v1/reports", methods=["GET"])
+        @jwt_routes.requires(roles=["admin", "manager"], scopes=["reports:read"])
+        def reports():
+            ...
+
+        # Or declare the policies with the url rules registered with Flask
+        app.config["JWT_ROUTER_POLICIES"] = [
+            ("DELETE", "/api/v1/users/<int:user_id>", {"roles": ["admin"]}),
+        ]
+        # Optional
+        app.config["JWT_ROUTER_ROLES_CLAIM"] = "roles"  # A list of roles
+        app.config["JWT_ROUTER_SCOPES_CLAIM"] = "scope"  # A space separated string or a list
+
+    The token needs at least one of the roles & every scope. Policies are compiled on the first
+    request, call ``jwt_routes.routing.compile_policies()`` if routes are added later.
+    A warning is logged for each ``JWT_ROUTER_POLICIES`` entry that matches no url rule
+    or method, e.g. a typo in the rule.
+
+    Requests authorized by an OAuth strategy are checked against the provider's claims or
+    userinfo response, e.g. the *roles* claim of an OIDC token. Google's userinfo has no roles
+    or scopes, so Google users are rejected with a 403 from routes with a policy.
+
+    Threaded Servers
+    ================
+
+    The state of each request (the decoded token & entity model) is held in a context
+    variable & each ``JwtRoutes`` instance has its own routing & strategies, so apps can be
+    served with threads or greenlets, e.g. ``gunicorn --threads 8`` or ``--worker-class gevent``.
+
+    OAuth Provider Connections
+    ==========================
+
+    Calls to an OAuth provider (e.g. Google's token & userinfo apis) reuse keep alive connections
+    from a pool, so each call skips the TCP & TLS handshake. If the provider can not be reached,
+    times out or responds with a 5xx status then the request fails with a 503 & a circuit breaker
+    fails requests fast while the provider is down. See :class:`~flask_jwt_router.oauth2.google`::
+
+        app.config["JWT_ROUTER_OAUTH_POOL_SIZE"] = 10  # Idle connections kept for each host
+        app.config["JWT_ROUTER_OAUTH_CONNECT_TIMEOUT"] = 5  # Seconds
+        app.config["JWT_ROUTER_OAUTH_READ_TIMEOUT"] = 10  # Seconds
+
+    As with ``urllib.request``, provider calls go through the proxies set by the *http_proxy*,
+    *https_proxy* & *no_proxy* environment variables, which are read when the app is initialised.
+
+    OAuth Strategies
+    ================
+
+    Each strategy reads its tokens from its own header (e.g. *X-Auth-Token* for Google) & is
+    created with its own urls & options, keyed by the strategy's class name. Only the headers
+    of the registered strategies are read on each request::
+
+        jwt_routes.init_app(
+            app,
+            strategies=[Google, MyProvider],
+            strategy_options={
+                "Google": google_options,  # Or pass google_oauth=google_options
+                "MyProvider": my_provider_options,
+            },
+        )
+
+    Asyncio Middleware
+    ==================
+
+    Set *JWT_ROUTER_ASYNC* to register ``Routing.before_middleware_async`` instead of the sync
+    middleware. OAuth tokens are authorized with the strategy's ``authorize_async``, so the provider
+    calls of concurrent requests wait on one event loop. Google & OIDC call the provider with
+    asyncio streams; other strategies run ``authorize`` in the event loop's default executor.
+    Entity loaders that are coroutine functions are awaited::
+
+        # Flask needs the async extra: pip install flask[async]
+        app.config["JWT_ROUTER_ASYNC"] = True
+
+        async def load_user(entity_key, entity_value):
+            return await users.get(**{entity_key: entity_value})
+
+        jwt_routes.init_app(app, entity_models=[UserModel], entity_loaders={UserModel: load_user})
+
+    Flask runs each async function in a new event loop, so provider connections are only kept alive
+    when the middleware is awaited on a long running loop, e.g. from an ASGI framework::
+
+        await jwt_routes.routing.before_middleware_async()
+
+    Synchronous entity loaders are still called on the event loop's thread, so they share the
+    request's database session. Lazy entities (*JWT_ROUTER_LAZY_ENTITY*) need a synchronous loader.
+
     Authorization & Tokens
     ======================
 
@@ -173,16 +448,20 @@
 
 import logging
 from warnings import warn
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Type, Union
+from flask import Blueprint, request
 
+from ._cache import BaseCache, TTLCache
 from ._config import Config
-from ._entity import BaseEntity, Entity, _ORMType
+from ._keys import load_keyring
+from ._entity import BaseEntity, Entity, EntityLoader, _ORMType
 from ._routing import BaseRouting, RoutingMixin
+from ._policies import requires, public, protected
 from ._authentication import BaseAuthentication, Authentication
 from .oauth2.google import Google
-from .oauth2._base import BaseOAuth, TestBaseOAuth
+from .oauth2._base import BaseOAuth
 from .oauth2.http_requests import HttpRequests
-from .oauth2._urls import GOOGLE_OAUTH_URL
+from .oauth2._exceptions import StrategyOptionsError
 
 # pylint:disable=invalid-name
 logger = logging.getLogger()
@@ -236,13 +515,42 @@ class BaseJwtRoutes:
     #: Optional. A Lust of strategies to be implement in the routing
     strategies: List[BaseOAuth]
 
+    #: Optional. Each strategy's options keyed by the strategy's class name,
+    #: e.g. `{"Google": {...}}`.
+    #: Google strategies without options use *google_oauth*
+    strategy_options: Dict[str, Dict[str, Any]]
+
     #: List of instantiated strategies
-    strategy_dict: Dict[str, BaseOAuth] = {}
+    strategy_dict: Dict[str, BaseOAuth]
+
+    #: Optional. A custom entity cache backend. See :class:`~flask_jwt_router._cache.BaseCache`
+    entity_cache: Optional[BaseCache] = None
+
+    #: Custom entity loaders keyed by entity model. See
+    #: :class:`~flask_jwt_router.register_entity_loader`
+    entity_loaders: Dict[_ORMType, EntityLoader]
+
+    #: Callables that build extra claims from the entity id, keyed by `__tablename__`.
+    #: See :class:`~flask_jwt_router.register_claims_builder`
+    claims_builders: Dict[str, Callable[[Any], Dict[str, Any]]]
+
+    #: Optional. Only requests handled by these blueprints (or blueprint names) are authorized
+    blueprints: List[Union[Blueprint, str]]
+
+    #: Optional. Only requests whose path starts with one of these prefixes are authorized
+    url_prefixes: List[str]
 
     def __init__(self, app=None, **kwargs):
         self.entity_models = kwargs.get("entity_models")
+        self.blueprints = kwargs.get("blueprints")
+        self.url_prefixes = kwargs.get("url_prefixes")
         self.google_oauth = kwargs.get("google_oauth")
         self.strategies = kwargs.get("strategies")
+        self.strategy_options = dict(kwargs.get("strategy_options") or {})
+        self.entity_cache = kwargs.get("entity_cache")
+        self.entity_loaders = dict(kwargs.get("entity_loaders") or {})
+        self.strategy_dict = {}
+        self.claims_builders = {}
         self.config = Config()
         self.auth = Authentication()
         self.app = app
@@ -259,22 +567,74 @@ class BaseJwtRoutes:
         entity_models = self.entity_models or kwargs.get("entity_models")
         self.google_oauth = self.google_oauth or kwargs.get("google_oauth")
         self.strategies = self.strategies or kwargs.get("strategies") or []
+        self.entity_cache = self.entity_cache or kwargs.get("entity_cache")
+        self.blueprints = self.blueprints or kwargs.get("blueprints")
+        self.url_prefixes = self.url_prefixes or kwargs.get("url_prefixes")
         app_config = self.get_app_config(self.app)
-        if len(self.strategies):
-            for S in self.strategies:
-                strategy = S(HttpRequests(GOOGLE_OAUTH_URL))
-                strategy.init(**self.google_oauth)
-                self.strategy_dict[strategy.__class__.__name__] = strategy
-
+        self.strategy_options.update(kwargs.get("strategy_options") or {})
         self.config.init_config(app_config, entity_models=entity_models, google_oauth=self.google_oauth)
-        self.entity = Entity(self.config)
+        for S in self.strategies:
+            self.strategy_dict[S.__name__] = self._create_strategy(S)
+
+        self.entity_loaders.update(kwargs.get("entity_loaders") or {})
+        self.entity = Entity(self.config, self._create_entity_cache(), self.entity_loaders)
+        for strategy in self.strategy_dict.values():
+            # OAuth entities are looked up by the strategy's email field
+            self.entity.register_lookup_attr(strategy.tablename, strategy.email_field)
+        self.entity.register_invalidation_hooks()
         self.routing.init(self.app, self.config, self.entity, self.strategy_dict)
-        self.app.before_request(self.routing.before_middleware)
+        self._register_middleware()
         if self.config.expire_days:
             self.exp = self.config.expire_days
         else:
             self.exp = EXPIRE_DEFAULT
 
+    def _register_middleware(self) -> None:
+        """
+        Runs the routing middleware before every request, or only before requests
+        handled by `blueprints` or with a path starting with one of `url_prefixes`.
+        The asyncio middleware is registered if JWT_ROUTER_ASYNC is set.
+        :return: None
+        """
+        if self.config.async_middleware:
+            middleware = self.routing.before_middleware_async
+        else:
+            middleware = self.routing.before_middleware
+        blueprint_names = tuple(
+            bp if isinstance(bp, str) else bp.name for bp in self.blueprints or ()
+        )
+        url_prefixes = tuple(self.url_prefixes or ())
+        if not blueprint_names and not url_prefixes:
+            self.app.before_request(middleware)
+            return
+        for name in blueprint_names:
+            # Blueprints may be registered on the app after init_app is called
+            self.app.before_request_funcs.setdefault(name, []).append(middleware)
+        if url_prefixes and self.config.async_middleware:
+            async def prefixed_middleware():
+                if (request.path.startswith(url_prefixes)
+                        and request.blueprint not in blueprint_names):
+                    return await middleware()
+                return None
+            self.app.before_request(prefixed_middleware)
+        elif url_prefixes:
+            def prefixed_middleware():
+                if (request.path.startswith(url_prefixes)
+                        and request.blueprint not in blueprint_names):
+                    return middleware()
+                return None
+            self.app.before_request(prefixed_middleware)
+
+    def _create_entity_cache(self) -> Optional[BaseCache]:
+        """
+        :return: The custom entity cache, a TTLCache if JWT_ROUTER_ENTITY_CACHE is set or None
+        """
+        if self.entity_cache is not None:
+            return self.entity_cache
+        if self.config.entity_cache:
+            return TTLCache(self.config.entity_cache_size, self.config.entity_cache_ttl)
+        return None
+
     # pylint:disable=no-self-use
     def get_app_config(self, app):
         """
@@ -316,6 +676,8 @@ class BaseJwtRoutes:
                                         If provided, it will trigger a warning and will be used as 'table_name'.
             table_name (str): The name of the table/entity for which the token is being generated.
                             This argument is required.
+            claims (dict, optional): Extra claims e.g. `{"role": "admin"}`, these are added to
+                            the claims from the entity model's claims builder.
 
         Returns:
             str: The generated token.
@@ -333,26 +695,190 @@ class BaseJwtRoutes:
         if 'table_name' not in kwargs:
             raise KeyError("create_token() missing 1 required argument: table_name")
         table_name = kwargs.get("table_name")
-        self.config.entity_key = self.entity.get_attr_name(table_name)
-        return self.auth.create_token(self.config, self.exp, **kwargs)
+        entity_key = self.entity.get_attr_name(table_name)
+        kwargs["claims"] = self._build_claims(
+            table_name, kwargs.get("entity_id"), kwargs.get("claims")
+        )
+        return self.auth.create_token(self.config, self.exp, entity_key=entity_key, **kwargs)
 
     def update_token(self, **kwargs) -> str:
         """
         :param kwargs:
+            - entity_id: Represents the entity's primary key
+            - claims: Optional. Extra claims e.g. `{"role": "admin"}`
         :return: str
         """
-        self.config.entity_key = self.entity.get_attr_name()
+        entity_key = self.entity.get_attr_name()
         table_name = self.entity.get_entity_from_ext().__tablename__
-        return self.auth.update_token(self.config, self.exp, table_name, **kwargs)
+        kwargs["claims"] = self._build_claims(
+            table_name, kwargs.get("entity_id"), kwargs.get("claims")
+        )
+        return self.auth.update_token(
+            self.config, self.exp, table_name, entity_key=entity_key, **kwargs
+        )
 
     def encode_token(self, entity_id) -> str:
         """
         :param entity_id:
         :return:
         """
-        self.config.entity_key = self.entity.get_attr_name()
+        entity_key = self.entity.get_attr_name()
         table_name = self.entity.get_entity_from_ext().__tablename__
-        return self.auth.encode_token(self.config, entity_id, self.exp, table_name)
+        claims = self._build_claims(table_name, entity_id)
+        return self.auth.encode_token(
+            self.config, entity_id, self.exp, table_name, entity_key, claims
+        )
+
+    def _build_claims(self, table_name: str, entity_id: Any,
+                      claims: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        :param table_name: The entity model's `__tablename__`
+        :param entity_id: The entity's primary key
+        :param claims: Optional. Extra claims, these override the claims builder's claims
+        :return: The extra claims
+        """
+        builder = self.claims_builders.get(table_name)
+        if builder is None:
+            return claims or {}
+        return {**builder(entity_id), **(claims or {})}
+
+    def register_claims_builder(self, auth_model: _ORMType,
+                                builder: Callable[[Any], Dict[str, Any]]) -> None:
+        """
+        Adds extra claims to every token created for an entity model, e.g.::
+
+            def user_claims(entity_id):
+                user = UserModel.query.get(entity_id)
+                return {"role": user.role, "tenant_id": user.tenant_id}
+
+            jwt_routes.register_claims_builder(UserModel, user_claims)
+
+        :param auth_model: The entity model
+        :param builder: Called with the entity id when a token is created or updated, returns a dict
+            of claims
+        :return: None
+        """
+        self.claims_builders[auth_model.__tablename__] = builder
+
+    # pylint:disable=no-self-use
+    def public(self, view):
+        """
+        Tags a view as public, requests don't need a token::
+
+            @app.route("/register", methods=["POST"])
+            @jwt_routes.public
+            def register():
+                ...
+
+        :param view: The view function
+        :return: The view function
+        """
+        return public(view)
+
+    # pylint:disable=no-self-use
+    def protected(self, view):
+        """
+        Tags a view as protected, requests need a valid token even if the route
+        matches WHITE_LIST_ROUTES
+        :param view: The view function
+        :return: The view function
+        """
+        return protected(view)
+
+    # pylint:disable=no-self-use
+    def requires(self, roles: List[str] = None, scopes: List[str] = None):
+        """
+        Restricts a protected route to tokens with at least one of the roles
+        & all of the scopes. Requests without them receive a 403::
+
+            @app.route("/api/v1/users", methods=["DELETE"])
+            @jwt_routes.requires(roles=["admin"], scopes=["users:write"])
+            def delete_user():
+                ...
+
+        :param roles: Optional. The roles that may access the route
+        :param scopes: Optional. The scopes required to access the route
+        :return: Callable
+        """
+        return requires(roles=roles, scopes=scopes)
+
+    def register_entity_loader(self, auth_model: _ORMType, loader: EntityLoader) -> None:
+        """
+        Loads an entity model's entities with a custom callable instead of
+        `auth_model.query.filter_by(**{entity_key: entity_value}).one()`
+        :param auth_model: The entity model
+        :param loader: Called with the entity key & value, returns the entity
+        :return: None
+        """
+        self.entity_loaders[auth_model] = loader
+        entity = getattr(self, "entity", None)
+        if entity is not None:
+            entity.register_loader(auth_model, loader)
+
+    def _clear_token_cache(self) -> None:
+        token_cache = getattr(self.routing, "token_cache", None)
+        if token_cache is not None:
+            token_cache.clear()
+
+    def add_key(self, kid: str, key: Any, *, signing: bool = False) -> None:
+        """
+        Adds a key to the keyring at runtime. See :class:`~flask_jwt_router._keys.Keyring`
+        :param kid: The key ID stamped on the token's *kid* header
+        :param key: A secret for HMAC algorithms, otherwise a parsed private or public key
+        :param signing: Sign new tokens with this key
+        :return: None
+        """
+        self.config.keyring.add(kid, key, signing=signing)
+
+    def use_signing_key(self, kid: str) -> None:
+        """
+        Signs new tokens with a key already in the keyring
+        :param kid: The key ID
+        :return: None
+        """
+        self.config.keyring.use_signing_key(kid)
+
+    def retire_key(self, kid: str) -> None:
+        """
+        Removes a key from the keyring. Tokens signed with this key will receive a 401
+        :param kid: The key ID
+        :return: None
+        """
+        self.config.keyring.retire(kid)
+        self._clear_token_cache()
+
+    def reload_keys(self) -> None:
+        """
+        Reloads the keyring from the app config, e.g. after JWT_ROUTER_JWKS_FILE has been
+        updated. Call this from each worker to rotate keys without a restart.
+        :return: None
+        """
+        self.config.keyring = load_keyring(
+            self.config.algorithm, self.config.secret_key, self.get_app_config(self.app)
+        )
+        self._clear_token_cache()
+
+    def _create_strategy(self, strategy_class: Type[BaseOAuth]) -> BaseOAuth:
+        """
+        Creates the strategy with its own urls & options
+        :param strategy_class: A subclass of :class:`~flask_jwt_router.oauth2._base.BaseOAuth`
+        :return: The initialised strategy
+        """
+        name = strategy_class.__name__
+        options = self.strategy_options.get(name)
+        if options is None and issubclass(strategy_class, Google):
+            options = self.google_oauth
+        if options is None:
+            raise StrategyOptionsError(f"No options for the {name} strategy")
+        http = HttpRequests(
+            strategy_class.urls,
+            pool_size=self.config.oauth_pool_size,
+            connect_timeout=self.config.oauth_connect_timeout,
+            read_timeout=self.config.oauth_read_timeout,
+        )
+        strategy = strategy_class(http)
+        strategy.init(**options)
+        return strategy
 
     def get_strategy(self, name: str) -> Optional[BaseOAuth]:
         """
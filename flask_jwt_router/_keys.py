@@ -0,0 +1,280 @@
+"""
+    Loads the keys used to sign & verify tokens.
+
+    HMAC algorithms (HS256 etc.) use the app's SECRET_KEY. RSA, ECDSA & Ed25519
+    algorithms load their keys from PEM files or a local JWKS file once, when the
+    app is initialised, so each token is signed & verified with a parsed key object.
+    Keys are held in a :class:`~flask_jwt_router._keys.Keyring` indexed by their key ID.
+    These algorithms require the *cryptography* package::
+
+        pip install pyjwt[crypto]
+"""
+import json
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from jwt.algorithms import get_default_algorithms
+
+HMAC_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+
+class KeyLoadError(Exception):
+    message = "Unable to load the key used to sign or verify tokens. " \
+              "See https://flask-jwt-router.readthedocs.io/en/latest/jwt_routes.html"
+
+    def __init__(self, err=""):
+        super(KeyLoadError, self).__init__(f"{err}\n{self.message}")
+
+
+class SigningKeyError(Exception):
+    message = "This app has no key to sign tokens with. " \
+              "Set JWT_ROUTER_PRIVATE_KEY_FILE, add a private key to JWT_ROUTER_JWKS_FILE " \
+              "or set a signing key with jwt_routes.add_key(kid, key, signing=True)."
+
+    def __init__(self):
+        super(SigningKeyError, self).__init__(self.message)
+
+
+def _read(path: str) -> bytes:
+    try:
+        with open(path, "rb") as key_file:
+            return key_file.read()
+    except OSError as err:
+        raise KeyLoadError(err) from err
+
+
+def _serialization():
+    try:
+        # pylint:disable=import-outside-toplevel
+        from cryptography.hazmat.primitives import serialization
+    except ImportError as err:
+        raise KeyLoadError(
+            f"{err}. Asymmetric algorithms require `pip install pyjwt[crypto]`"
+        ) from err
+    return serialization
+
+
+def prepare_key(algorithm: str, key: Any) -> Any:
+    """
+    Checks the key can be used with the algorithm
+    :param algorithm: The JWT algorithm name e.g. RS256
+    :param key: A secret or a parsed key object
+    :return: The prepared key
+    """
+    algorithms = get_default_algorithms()
+    if algorithm not in algorithms or algorithm == "none":
+        raise KeyLoadError(f"Unsupported algorithm: {algorithm}")
+    try:
+        return algorithms[algorithm].prepare_key(key)
+    except Exception as err:
+        raise KeyLoadError(f"The key can not be used with {algorithm}: {err}") from err
+
+
+def load_private_key(path: str, password: Optional[str] = None) -> Any:
+    """
+    :param path: Path to a PEM encoded private key
+    :param password: Optional. The private key's password
+    :return: The parsed private key
+    """
+    serialization = _serialization()
+    password = password.encode("utf-8") if password else None
+    try:
+        return serialization.load_pem_private_key(_read(path), password=password)
+    except (ValueError, TypeError) as err:
+        raise KeyLoadError(err) from err
+
+
+def load_public_key(path: str) -> Any:
+    """
+    :param path: Path to a PEM encoded public key
+    :return: The parsed public key
+    """
+    serialization = _serialization()
+    try:
+        return serialization.load_pem_public_key(_read(path))
+    except (ValueError, TypeError) as err:
+        raise KeyLoadError(err) from err
+
+
+def load_jwks(path: str) -> Dict[Optional[str], Dict[str, Any]]:
+    """
+    Reads a local JWKS file, e.g. `{"keys": [{"kty": "RSA", "kid": "2021-07", ...}]}`
+    :param path: Path to the JWKS file
+    :return: Each JWK keyed by its *kid*
+    """
+    try:
+        jwks = json.loads(_read(path))
+        return {jwk.get("kid"): jwk for jwk in jwks["keys"]}
+    except (ValueError, KeyError, TypeError) as err:
+        raise KeyLoadError(f"Invalid JWKS file {path}: {err}") from err
+
+
+def load_jwk(jwk: Dict[str, Any], algorithm: str) -> Tuple[Any, Any]:
+    """
+    :param jwk: A single JSON Web Key
+    :param algorithm: The JWT algorithm name e.g. RS256
+    :return: A tuple of the parsed private key (or None) & public key
+    """
+    algorithms = get_default_algorithms()
+    try:
+        key = algorithms[algorithm].from_jwk(json.dumps(jwk))
+    except Exception as err:
+        raise KeyLoadError(f"Invalid JWK for {algorithm}: {err}") from err
+    if hasattr(key, "public_key") and "d" in jwk:
+        return key, key.public_key()
+    return None, key
+
+
+class Keyring:
+    """
+    The keys used to sign & verify tokens, indexed by their key ID (*kid*).
+    Tokens are signed with a single signing key & stamped with its *kid* header.
+    Tokens are verified with the key found from their *kid* header, tokens without
+    a *kid* header are verified with the key stored under *None*.
+    Keys can be added & retired at runtime.
+    See :class:`~flask_jwt_router._jwt_routes.BaseJwtRoutes.add_key`
+    :param algorithm: The JWT algorithm name e.g. HS256 or RS256
+    """
+    #: The JWT algorithm name
+    algorithm: str
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        self._lock = Lock()
+        # Readers never lock, the dicts are replaced rather than mutated
+        self._verifying_keys: Dict[Optional[str], Any] = {}
+        self._signing_keys: Dict[Optional[str], Any] = {}
+        self._signer: Optional[Tuple[Optional[str], Any]] = None
+
+    @property
+    def kids(self) -> List[Optional[str]]:
+        """
+        :return: The key ID of every verification key
+        """
+        return list(self._verifying_keys)
+
+    @property
+    def signing_kid(self) -> Optional[str]:
+        """
+        :return: The key ID of the signing key
+        """
+        return self._signer[0] if self._signer else None
+
+    def add(self, kid: Optional[str], key: Any, *, signing: bool = False) -> None:
+        """
+        Adds a key. For HMAC algorithms the key is a secret, otherwise it is a parsed
+        private key (used to sign & verify) or public key (only used to verify).
+        :param kid: The key ID
+        :param key: A secret or a parsed key object
+        :param signing: Sign new tokens with this key
+        :return: None
+        """
+        if self.algorithm in HMAC_ALGORITHMS:
+            signing_key = verifying_key = prepare_key(self.algorithm, key)
+        elif hasattr(key, "public_key"):
+            signing_key = prepare_key(self.algorithm, key)
+            verifying_key = prepare_key(self.algorithm, key.public_key())
+        else:
+            signing_key = None
+            verifying_key = prepare_key(self.algorithm, key)
+        if signing and signing_key is None:
+            raise KeyLoadError(f"The key {kid} is a public key & can not sign tokens")
+        with self._lock:
+            self._verifying_keys = {**self._verifying_keys, kid: verifying_key}
+            if signing_key is not None:
+                self._signing_keys = {**self._signing_keys, kid: signing_key}
+                if signing or self._signer is None:
+                    self._signer = (kid, signing_key)
+
+    def use_signing_key(self, kid: Optional[str]) -> None:
+        """
+        Signs new tokens with a key that has already been added
+        :param kid: The key ID
+        :return: None
+        """
+        with self._lock:
+            try:
+                self._signer = (kid, self._signing_keys[kid])
+            except KeyError as err:
+                raise KeyLoadError(f"No signing key with the kid: {kid}") from err
+
+    def retire(self, kid: Optional[str]) -> None:
+        """
+        Removes a key. Tokens signed with the key will no longer be verified.
+        If the key is the signing key then no new tokens can be signed until
+        another signing key is set.
+        :param kid: The key ID
+        :return: None
+        """
+        with self._lock:
+            self._verifying_keys = {k: v for k, v in self._verifying_keys.items() if k != kid}
+            self._signing_keys = {k: v for k, v in self._signing_keys.items() if k != kid}
+            if self._signer and self._signer[0] == kid:
+                self._signer = None
+
+    def verifying_key(self, kid: Optional[str]) -> Any:
+        """
+        :param kid: The key ID from the token's header
+        :return: The key or None
+        """
+        return self._verifying_keys.get(kid)
+
+    def signing_key(self) -> Tuple[Optional[str], Any]:
+        """
+        :return: A tuple of the key ID & the signing key
+        """
+        signer = self._signer
+        if signer is None:
+            raise SigningKeyError()
+        return signer
+
+
+def load_keyring(algorithm: str, secret_key: Optional[str], app_config: Dict[str, Any]) -> Keyring:
+    """
+    Loads the keyring from the app config. HMAC algorithms use:
+        - SECRET_KEY: Signs & verifies tokens without a *kid* header
+        - JWT_ROUTER_KEYS: Optional. A dict of *kid* to secret e.g. `{"2021-07": "secret"}`
+
+    Other algorithms use:
+        - JWT_ROUTER_PRIVATE_KEY_FILE: PEM encoded private key used to sign tokens
+        - JWT_ROUTER_PRIVATE_KEY_PASSWORD: Optional. Password of the private key
+        - JWT_ROUTER_PUBLIC_KEY_FILE: PEM encoded public key used to verify tokens
+        - JWT_ROUTER_KEY_ID: Optional. The *kid* of the PEM encoded key
+        - JWT_ROUTER_JWKS_FILE: A local JWKS file, each key is stored under its *kid*
+
+    Set JWT_ROUTER_SIGNING_KID to choose the signing key, otherwise the first key that can
+    sign tokens is used.
+    :param algorithm: The JWT algorithm name e.g. RS256
+    :param secret_key: The app's secret key, used by HMAC algorithms
+    :param app_config: Flask's app config
+    :return: Keyring
+    """
+    keyring = Keyring(algorithm)
+    if algorithm in HMAC_ALGORITHMS:
+        if secret_key:
+            keyring.add(None, secret_key)
+        for kid, secret in (app_config.get("JWT_ROUTER_KEYS") or {}).items():
+            keyring.add(kid, secret)
+    else:
+        jwks_file = app_config.get("JWT_ROUTER_JWKS_FILE")
+        if jwks_file:
+            for kid, jwk in load_jwks(jwks_file).items():
+                private_key, public_key = load_jwk(jwk, algorithm)
+                keyring.add(kid, private_key or public_key)
+        kid = app_config.get("JWT_ROUTER_KEY_ID")
+        private_key_file = app_config.get("JWT_ROUTER_PRIVATE_KEY_FILE")
+        public_key_file = app_config.get("JWT_ROUTER_PUBLIC_KEY_FILE")
+        if private_key_file:
+            password = app_config.get("JWT_ROUTER_PRIVATE_KEY_PASSWORD")
+            keyring.add(kid, load_private_key(private_key_file, password))
+        elif public_key_file:
+            keyring.add(kid, load_public_key(public_key_file))
+    if not keyring.kids:
+        raise KeyLoadError(
+            f"{algorithm} requires JWT_ROUTER_PUBLIC_KEY_FILE, JWT_ROUTER_PRIVATE_KEY_FILE"
+            " or JWT_ROUTER_JWKS_FILE"
+        )
+    signing_kid = app_config.get("JWT_ROUTER_SIGNING_KID")
+    if signing_kid is not None:
+        keyring.use_signing_key(signing_kid)
+    return keyring
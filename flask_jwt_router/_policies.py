@@ -0,0 +1,155 @@
+"""
+    Route level policies declared on view functions.
+
+    - Role & scope policies are checked against the token's claims before the
+      entity is loaded. Policies are declared in the app config or with the
+      :class:`~flask_jwt_router._jwt_routes.BaseJwtRoutes.requires` decorator &
+      compiled once into a predicate per ``(url_rule.rule, method)``.
+    - The ``public`` & ``protected`` decorators tag views & are compiled once into
+      an endpoint to classification map.
+"""
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from ._route_index import PUBLIC, PROTECTED
+
+#: Called with the token's claims, returns True if the request is authorized
+Predicate = Callable[[Mapping[str, Any]], bool]
+
+#: The view function attribute set by :class:`~flask_jwt_router._policies.requires`
+POLICY_ATTR = "__jwt_router_policy__"
+
+#: The view function attribute set by :class:`~flask_jwt_router._policies.public`
+#: & :class:`~flask_jwt_router._policies.protected`
+ACCESS_ATTR = "__jwt_router_access__"
+
+
+def _claim_set(value: Any) -> FrozenSet[str]:
+    """
+    :param value: A space separated string (e.g. the OAuth 2.0 *scope* claim) or a list
+    :return: FrozenSet[str]
+    """
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        return frozenset(value.split())
+    return frozenset(value)
+
+
+def compile_policy(
+        roles: Iterable[str] = None,
+        scopes: Iterable[str] = None,
+        roles_claim: str = "roles",
+        scopes_claim: str = "scope",
+) -> Predicate:
+    """
+    The token must have at least one of the roles & every one of the scopes
+    :param roles: Optional. The roles that may access the route
+    :param scopes: Optional. The scopes required to access the route
+    :param roles_claim: The name of the claim listing the entity's roles
+    :param scopes_claim: The name of the claim listing the token's scopes
+    :return: Predicate
+    """
+    required_roles = _claim_set(roles)
+    required_scopes = _claim_set(scopes)
+
+    def predicate(claims: Mapping[str, Any]) -> bool:
+        if required_roles and required_roles.isdisjoint(_claim_set(claims.get(roles_claim))):
+            return False
+        if required_scopes and not required_scopes <= _claim_set(claims.get(scopes_claim)):
+            return False
+        return True
+    return predicate
+
+
+def requires(roles: Iterable[str] = None, scopes: Iterable[str] = None) -> Callable:
+    """
+    Declares the roles or scopes a view requires. Place it below Flask's `route` decorator.
+    :param roles: Optional. The roles that may access the route
+    :param scopes: Optional. The scopes required to access the route
+    :return: Callable
+    """
+    def decorator(view: Callable) -> Callable:
+        setattr(view, POLICY_ATTR, {"roles": roles, "scopes": scopes})
+        return view
+    return decorator
+
+
+def compile_policies(
+        app,
+        policies: List[Tuple[str, str, Dict[str, Any]]],
+        roles_claim: str = "roles",
+        scopes_claim: str = "scope",
+) -> Dict[Tuple[str, str], Predicate]:
+    """
+    :param app: Flask application instance
+    :param policies: List of (method, url rule, {"roles": [...], "scopes": [...]})
+    :param roles_claim: The name of the claim listing the entity's roles
+    :param scopes_claim: The name of the claim listing the token's scopes
+    :return: A predicate keyed by (url_rule.rule, method)
+    """
+    compiled = {}
+    for rule in app.url_map.iter_rules():
+        view = app.view_functions.get(rule.endpoint)
+        policy: Optional[Dict[str, Any]] = getattr(view, POLICY_ATTR, None)
+        if policy is None:
+            continue
+        predicate = compile_policy(roles_claim=roles_claim, scopes_claim=scopes_claim, **policy)
+        for method in rule.methods or ():
+            compiled[(rule.rule, method)] = predicate
+    for method, rule, policy in policies:
+        compiled[(rule, method)] = compile_policy(
+            roles_claim=roles_claim, scopes_claim=scopes_claim, **policy
+        )
+    return compiled
+
+
+def unmatched_policies(
+        app,
+        policies: List[Tuple[str, str, Dict[str, Any]]],
+) -> List[Tuple[str, str]]:
+    """
+    :param app: Flask application instance
+    :param policies: List of (method, url rule, {"roles": [...], "scopes": [...]})
+    :return: The (method, url rule) pairs that match no url rule registered with the app
+    """
+    methods: Dict[str, FrozenSet[str]] = {}
+    for rule in app.url_map.iter_rules():
+        methods[rule.rule] = methods.get(rule.rule, frozenset()) | frozenset(rule.methods or ())
+    return [
+        (method, rule)
+        for method, rule, _ in policies
+        if method not in methods.get(rule, frozenset())
+    ]
+
+
+def public(view: Callable) -> Callable:
+    """
+    Tags a view as public, requests don't need a token
+    :param view: The view function
+    :return: Callable
+    """
+    setattr(view, ACCESS_ATTR, PUBLIC)
+    return view
+
+
+def protected(view: Callable) -> Callable:
+    """
+    Tags a view as protected, requests need a valid token even if the
+    route is in WHITE_LIST_ROUTES
+    :param view: The view function
+    :return: Callable
+    """
+    setattr(view, ACCESS_ATTR, PROTECTED)
+    return view
+
+
+def compile_endpoint_access(app) -> Dict[str, str]:
+    """
+    :param app: Flask application instance
+    :return: The classification of each tagged view keyed by endpoint
+    """
+    return {
+        endpoint: getattr(view, ACCESS_ATTR)
+        for endpoint, view in app.view_functions.items()
+        if hasattr(view, ACCESS_ATTR)
+    }
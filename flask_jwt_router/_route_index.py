@@ -0,0 +1,267 @@
+"""
+    Compiled lookup tables for whitelisted & ignored routes.
+
+    Routes are compiled once when the app is initialised so that the per request
+    lookup cost depends on the depth of the path rather than on the number of
+    routes declared in ``WHITE_LIST_ROUTES`` or ``IGNORED_ROUTES``.
+"""
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class _Node:
+    # pylint:disable=missing-class-docstring
+    __slots__ = ("children", "wildcard", "terminal")
+
+    def __init__(self):
+        #: Literal path segments
+        self.children: Dict[str, "_Node"] = {}
+        #: Dynamic segments such as ``<int:user_id>`` (or empty segments)
+        self.wildcard: Optional["_Node"] = None
+        #: A route ends at this node
+        self.terminal: bool = False
+
+
+def _match(node: _Node, path: str, start: int) -> bool:
+    """
+    Walks the trie one path segment at a time. Segments are sliced from the
+    path with ``str.find`` so that no intermediate list is allocated.
+    :param node: The current trie node
+    :param path: The request path
+    :param start: Index of the current segment or -1 if the path is exhausted
+    :return: bool
+    """
+    if node.terminal or start < 0:
+        return True
+    end = path.find("/", start)
+    if end < 0:
+        segment = path[start:]
+        next_start = -1
+    else:
+        segment = path[start:end]
+        next_start = end + 1
+    child = node.children.get(segment)
+    if child is not None and _match(child, path, next_start):
+        return True
+    wildcard = node.wildcard
+    return wildcard is not None and _match(wildcard, path, next_start)
+
+
+#: Route classifications. See :class:`~flask_jwt_router._routing.Routing.before_middleware`
+STATIC = "static"
+MISSING = "missing"
+IGNORED = "ignored"
+PUBLIC = "public"
+PROTECTED = "protected"
+#: The classification of the url rule depends on the request path
+PER_PATH = "per_path"
+
+_NO_MATCH = 0
+_MAYBE = 1
+_ALWAYS = 2
+
+
+def _match_rule(node: _Node, segments: List[str], i: int) -> int:
+    """
+    Walks the trie with the segments of a Flask url rule. A dynamic rule segment
+    such as ``<int:user_id>`` may or may not equal a literal trie segment.
+    :return: _ALWAYS, _MAYBE or _NO_MATCH
+    """
+    if node.terminal or i == len(segments):
+        return _ALWAYS
+    segment = segments[i]
+    result = _NO_MATCH
+    if "<" in segment:
+        for child in node.children.values():
+            result = max(result, min(_MAYBE, _match_rule(child, segments, i + 1)))
+    else:
+        child = node.children.get(segment)
+        if child is not None:
+            result = _match_rule(child, segments, i + 1)
+    if result != _ALWAYS and node.wildcard is not None:
+        result = max(result, _match_rule(node.wildcard, segments, i + 1))
+    return result
+
+
+def _rule_may_equal(segments: List[str], path: str) -> bool:
+    """
+    :param segments: The segments of a Flask url rule
+    :param path: A literal path
+    :return: True if Werkzeug could match the path to the url rule
+    """
+    path_segments = path.split("/")
+    if len(path_segments) != len(segments):
+        return False
+    for r, p in zip(segments, path_segments):
+        if "<" in r:
+            if not p:
+                return False
+        elif r != p:
+            return False
+    return True
+
+
+class RouteIndex:
+    """
+    Exact ``(method, path)`` pairs are stored in a set per verb. Routes with
+    dynamic segments (e.g. ``("PUT", "/users/<int:user_id>")``) are stored in a
+    segment trie per verb.
+
+    Dynamic routes keep the same matching rules as previous releases: every
+    literal segment of the route must equal the path segment at the same
+    position & Flask / Werkzeug handles the url conversion.
+
+    The index is built from ``routes`` & is not modified afterwards, create a
+    new index to change the routes.
+
+    :param routes: List of tuple pairs of verb & url path
+    """
+    _exact: Dict[str, Set[str]]
+
+    _dynamic: Dict[str, _Node]
+
+    _size: int
+
+    def __init__(self, routes: Iterable[Tuple[str, str]] = ()):
+        self._exact = {}
+        self._dynamic = {}
+        self._size = 0
+        for method, path in routes:
+            self._add(method, path)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _add(self, method: str, path: str) -> None:
+        """
+        :param method: The http verb
+        :param path: The url path
+        :return: None
+        """
+        self._exact.setdefault(method, set()).add(path)
+        self._size += 1
+        if "<" not in path:
+            return
+        node = self._dynamic.setdefault(method, _Node())
+        for segment in path.split("/"):
+            if not segment or segment[0] == "<":
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+        node.terminal = True
+
+    def match(self, method: str, path: str) -> bool:
+        """
+        :param method: The http verb
+        :param path: The request path
+        :return: True if the route is in the index
+        """
+        exact = self._exact.get(method)
+        if exact is None:
+            return False
+        if path in exact:
+            return True
+        root = self._dynamic.get(method)
+        if root is None:
+            return False
+        return _match(root, path, 0)
+
+    def match_rule(self, method: str, rule: str) -> Optional[bool]:
+        """
+        Matches a Flask url rule, e.g. ``/users/<int:user_id>``, against the index.
+        :param method: The http verb
+        :param rule: The url rule string
+        :return: True if every path of the rule is in the index, False if none are
+            & None if it depends on the request path
+        """
+        exact = self._exact.get(method)
+        if exact is None:
+            return False
+        if "<" not in rule:
+            return self.match(method, rule)
+        if "<path" in rule:
+            # The path converter can match any number of segments
+            return None
+        segments = rule.split("/")
+        for path in exact:
+            if "<" not in path and _rule_may_equal(segments, path):
+                return None
+        root = self._dynamic.get(method)
+        if root is None:
+            return False
+        result = _match_rule(root, segments, 0)
+        if result == _MAYBE:
+            return None
+        return result == _ALWAYS
+
+
+class ClassificationCache:
+    """
+    Route classifications keyed by ``(url_rule.rule, method)``.
+    Check the *hits* & *misses* counters to confirm the cache is being used.
+    """
+    #: Number of lookups that found a classification
+    hits: int = 0
+
+    #: Number of lookups that had to classify the url rule
+    misses: int = 0
+
+    def __init__(self):
+        self._data: Dict[Tuple[str, str], str] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._data
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        """
+        :param key: (url_rule.rule, method)
+        :return: The classification or None
+        """
+        with self._lock:
+            classification = self._data.get(key)
+            if classification is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return classification
+
+    def set(self, key: Tuple[str, str], classification: str) -> None:
+        """
+        :param key: (url_rule.rule, method)
+        :param classification: See :class:`~flask_jwt_router._route_index.PROTECTED` etc.
+        :return: None
+        """
+        with self._lock:
+            self._data[key] = classification
+
+    def info(self) -> Dict[str, Any]:
+        """
+        :return: The hit & miss counters & the number of classified url rules
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+            }
+
+
+class RouteTable(NamedTuple):
+    """
+    The compiled routes consumed by :class:`~flask_jwt_router._routing.Routing`.
+    See :class:`~flask_jwt_router._config.Config.compile_routes`
+    """
+    #: IGNORED_ROUTES
+    ignored: RouteIndex
+
+    #: WHITE_LIST_ROUTES prefixed with JWT_ROUTER_API_NAME
+    whitelist: RouteIndex
+
+    #: Classifications for each (url_rule.rule, method)
+    classifications: ClassificationCache
@@ -4,18 +4,26 @@
 from abc import ABC, abstractmethod
 # pylint:disable=invalid-name
 import logging
-from typing import List, Optional, Dict
+import hashlib
+from threading import Lock
+from time import time
+from types import MappingProxyType
+from typing import Any, List, Optional, Dict, Tuple
 from flask import request, abort, g, Flask
-from werkzeug.routing import RequestRedirect
+from werkzeug.routing import RequestRedirect, Rule
 from werkzeug.exceptions import MethodNotAllowed, NotFound
 from jwt.exceptions import InvalidTokenError
 import jwt
 
 
+from ._claims import Claims
 from ._entity import BaseEntity
-from .oauth2.google import BaseOAuth
+from ._policies import Predicate, compile_policies, compile_endpoint_access, unmatched_policies
+from ._route_index import RouteIndex, STATIC, MISSING, IGNORED, PUBLIC, PROTECTED, PER_PATH
+from ._cache import LRUCache, TTLCache
 from ._config import Config
-from flask_jwt_router.oauth2._base import BaseOAuth, TestBaseOAuth
+from .oauth2._base import BaseOAuth, TestBaseOAuth
+from .oauth2._exceptions import ProviderUnavailableError
 
 logger = logging.getLogger()
 
@@ -49,30 +57,56 @@ class Routing(BaseRouting):
 
     strategy_dict: Dict[str, BaseOAuth]
 
+    #: The strategies keyed by their header name, built when the app is initialised
+    strategy_index: Dict[str, BaseOAuth]
+
+    #: (path, method) -> exists for requests that Flask resolved to a redirect
+    route_cache: LRUCache
+
+    #: Verified token claims keyed by a digest of the token. None unless JWT_ROUTER_TOKEN_CACHE is
+    #: set
+    token_cache: Optional[TTLCache] = None
+
+    #: Role & scope predicates keyed by (url_rule.rule, method). Compiled on the first request
+    #: or with :class:`~flask_jwt_router._routing.Routing.compile_policies`
+    policies: Optional[Dict[Tuple[str, str], Predicate]] = None
+
+    #: Classifications of views tagged with `public` or `protected` keyed by endpoint.
+    #: Compiled on the first request or with
+    #: :class:`~flask_jwt_router._routing.Routing.compile_endpoint_access`
+    endpoint_access: Optional[Dict[str, str]] = None
+
+    def __init__(self):
+        # (header name, strategy) pairs, iterated on each request
+        self._strategy_headers: Tuple[Tuple[str, BaseOAuth], ...] = ()
+        self._policies_lock = Lock()
+
     def init(self, app, config: Config, entity: BaseEntity, strategy_dict: Dict[str, BaseOAuth] = None) -> None:
         self.app = app
         self.config = config
         self.logger = logger
         self.entity = entity
         self.strategy_dict = strategy_dict
-
-    def _prefix_api_name(self, w_routes=None):
-        """
-        If the config has JWT_ROUTER_API_NAME defined then
-        update each white listed route with an api name
-        :example: "/user" -> "/api/v1/user"
-        :param w_routes:
-        :return List[str]:
-        """
-        api_name = self.config.api_name
-        if not api_name:
-            return w_routes
-        # Prepend the api name to the white listed route
-        named_white_routes = []
-        for route_name in w_routes:
-            verb, path = route_name
-            named_white_routes.append((verb, f"{api_name}{path}"))
-        return named_white_routes
+        self.strategy_index = {}
+        for strategy in (strategy_dict or {}).values():
+            if strategy.header_name in self.strategy_index:
+                other = self.strategy_index[strategy.header_name]
+                raise ValueError(
+                    f"The {strategy.__class__.__name__} & {other.__class__.__name__} "
+                    f"strategies both use the {strategy.header_name} header"
+                )
+            self.strategy_index[strategy.header_name] = strategy
+        self._strategy_headers = tuple(self.strategy_index.items())
+        self.route_cache = LRUCache(self.config.route_cache_size)
+        self.policies = None
+        self.endpoint_access = None
+        self.token_cache = None
+        if self.config.token_cache:
+            self.token_cache = TTLCache(
+                self.config.token_cache_size,
+                self.config.token_cache_ttl,
+                self.config.token_cache_policy,
+            )
 
     def _add_static_routes(self, path: str) -> bool:
         """
@@ -80,13 +114,12 @@ class Routing(BaseRouting):
         :param path:
         :return:
         """
-        paths = path.split("/")
-        defined_static = self.app.static_url_path[1:]
-        if path == "favicon.ico" or\
-                paths[1] == "static" or\
-                paths[1] == defined_static:
+        if path == "favicon.ico":
             return True
-        return False
+        # Compare the first path segment without splitting the whole path
+        end = path.find("/", 1)
+        segment = path[1:end] if end > 0 else path[1:]
+        return segment == "static" or segment == self.app.static_url_path[1:]
 
     # pylint:disable=no-self-use
     def _handle_pre_flight(self, method: str) -> bool:
@@ -99,83 +132,370 @@ class Routing(BaseRouting):
             return True
         return False
 
-    def _handle_query_params(self, white_route: str, path: str):
-        """
-        Handles dynamic query params
-        All we care about that a path segment has no url conversion.
-        We compare it's the same as the whitelist segment & let Flask
-        / Werkzeug handle the url matching
-        :param white_route:
-        :param path:
-        :return bool:
-        """
-        if "<" not in white_route:
-            return False
-
-        route_segments = white_route.split("/")
-        path_segments = path.split("/")
-
-        for r, p in zip(route_segments, path_segments):
-            if len(r) > 0:
-                if r[0] != "<":
-                    if r != p:
-                        return False
-        return True
-
-    def _allow_public_routes(self, white_routes):
+    def _allow_public_routes(self, route_index: RouteIndex) -> bool:
         """
-        Create a list of tuples ie [("POST", "/users")] as public routes.
-        Returns False if current route and verb are white listed.
-        :param flask_request:
-        :param white_routes: List[Tuple]:
+        Returns False if current route and verb are in the compiled route index.
+        See :class:`~flask_jwt_router._route_index.RouteIndex`
+        :param route_index: RouteIndex
         :returns bool:
         """
+        if not route_index:
+            return True
         method = request.method
-        path = request.path
-        for white_route in white_routes:
-            if self._handle_pre_flight(method):
-                return False
-            if method == white_route[0] and path == white_route[1]:
-                return False
-            if method == white_route[0] and self._handle_query_params(white_route[1], path):
-                return False
-        return True
+        if self._handle_pre_flight(method):
+            return False
+        return not route_index.match(method, request.path)
 
-    def _does_route_exist(self, url: str, method: str) -> bool:
+    def _match_url_map(self, url: str, method: str) -> bool:
         adapter = self.app.url_map.bind('')
         try:
             adapter.match(url, method=method)
         except RequestRedirect as e:
             # recursively match redirects
-            return self._does_route_exist(e.new_url, method)
+            return self._match_url_map(e.new_url, method)
         except (MethodNotAllowed, NotFound):
             # no match
             return False
         return True
 
+    def _does_route_exist(self, url: str, method: str) -> bool:
+        """
+        Flask has already matched the request against the url map by the time
+        `before_request` handlers run, so reuse that result. Only redirects are
+        matched again & the result is kept in a bounded LRU cache.
+        Set JWT_ROUTER_REUSE_URL_RULE to False to always match against the url map.
+        :param url:
+        :param method:
+        :return: bool
+        """
+        if not self.config.reuse_url_rule:
+            return self._match_url_map(url, method)
+        if request.url_rule is not None:
+            return True
+        if isinstance(request.routing_exception, (MethodNotAllowed, NotFound)):
+            return False
+        key = (url, method)
+        exists = self.route_cache.get(key)
+        if exists is None:
+            exists = self._match_url_map(url, method)
+            self.route_cache.set(key, exists)
+        return exists
+
+    def _classify(self, path: str, method: str) -> str:
+        """
+        Classifies the current request from its path
+        :param path:
+        :param method:
+        :return: str
+        """
+        if self._add_static_routes(path):
+            return STATIC
+        if not self._does_route_exist(path, method):
+            return MISSING
+        route_table = self.config.route_table
+        if not self._allow_public_routes(route_table.ignored):
+            return IGNORED
+        if not self._allow_public_routes(route_table.whitelist):
+            return PUBLIC
+        return PROTECTED
+
+    def _match_rule(self, route_index: RouteIndex, rule: str, method: str) -> Optional[bool]:
+        """
+        The url rule equivalent of :class:`~flask_jwt_router._routing.Routing._allow_public_routes`
+        :return: True if public, False if not & None if it depends on the request path
+        """
+        if not route_index:
+            return False
+        if self._handle_pre_flight(method):
+            return True
+        return route_index.match_rule(method, rule)
+
+    def _classify_rule(self, rule: Rule, method: str) -> str:
+        """
+        Classifies every request that Flask matches to `rule` & `method`.
+        Returns PER_PATH if the classification depends on the request path.
+        :param rule: The Werkzeug url rule
+        :param method:
+        :return: str
+        """
+        rule_text = rule.rule
+        strict_slashes = rule.strict_slashes
+        if strict_slashes is None:
+            strict_slashes = rule.map.strict_slashes if rule.map else True
+        end = rule_text.find("/", 1)
+        first_segment = rule_text[1:end] if end > 0 else rule_text[1:]
+        if not strict_slashes or "<" in first_segment:
+            return PER_PATH
+        if self._add_static_routes(rule_text):
+            return STATIC
+        route_table = self.config.route_table
+        is_ignored = self._match_rule(route_table.ignored, rule_text, method)
+        if is_ignored is None:
+            return PER_PATH
+        if is_ignored:
+            return IGNORED
+        is_public = self._match_rule(route_table.whitelist, rule_text, method)
+        if is_public is None:
+            return PER_PATH
+        return PUBLIC if is_public else PROTECTED
+
+    def warm_classification_cache(self) -> None:
+        """
+        Classifies every url rule registered on the app. Call this once your routes
+        are registered, otherwise each url rule is classified on its first request.
+        :return: None
+        """
+        classifications = self.config.route_table.classifications
+        for rule in self.app.url_map.iter_rules():
+            for method in rule.methods or ():
+                key = (rule.rule, method)
+                if key not in classifications:
+                    classifications.set(key, self._classify_rule(rule, method))
+
+    def compile_policies(self) -> Dict[Tuple[str, str], Predicate]:
+        """
+        Compiles JWT_ROUTER_POLICIES & the policies of views decorated with `requires`.
+        This is called on the first protected request, call it again if url rules are
+        added after the app has started handling requests. Logs a warning for each
+        JWT_ROUTER_POLICIES entry that matches no url rule, e.g. a typo in the rule.
+        :return: The predicates keyed by (url_rule.rule, method)
+        """
+        with self._policies_lock:
+            for method, rule in unmatched_policies(self.app, self.config.policies):
+                self.logger.warning(
+                    "JWT_ROUTER_POLICIES entry (%s, %s) matches no url rule", method, rule
+                )
+            self.policies = compile_policies(
+                self.app,
+                self.config.policies,
+                self.config.roles_claim,
+                self.config.scopes_claim,
+            )
+            return self.policies
+
+    def compile_endpoint_access(self) -> Dict[str, str]:
+        """
+        Compiles the views tagged with `public` or `protected`. This is called on the
+        first request, call it again if views are added after the app has started
+        handling requests.
+        :return: The classifications keyed by endpoint
+        """
+        with self._policies_lock:
+            self.endpoint_access = compile_endpoint_access(self.app)
+            return self.endpoint_access
+
+    def _authorize_claims(self, claims: Claims) -> None:
+        """
+        Aborts with a 403 if the token's claims don't satisfy the route's policy
+        :param claims: The verified token's claims
+        :return: None
+        """
+        rule = request.url_rule
+        if rule is None:
+            return
+        policies = self.policies
+        if policies is None:
+            policies = self.compile_policies()
+        predicate = policies.get((rule.rule, request.method))
+        if predicate is not None and not predicate(claims):
+            abort(403)
+
+    def classification_cache_info(self) -> Dict[str, Any]:
+        """
+        :return: The classification cache hit & miss counters
+        """
+        return self.config.route_table.classifications.info()
+
     def before_middleware(self) -> None:
         """
         Handles ignored & whitelisted & static routes with api name
-        If it's not static, ignored whitelisted then authorize
+        If it's not static, ignored whitelisted then authorize.
         :return: Callable or None
         """
-        #pylint:disable=inconsistent-return-statements
+        self.entity.reset()
+        if self._requires_token():
+            self.entity.clean_up()
+            self.handle_token()
+
+    async def before_middleware_async(self) -> None:
+        """
+        The asyncio variant of :class:`~flask_jwt_router._routing.Routing.before_middleware`,
+        registered in its place if JWT_ROUTER_ASYNC is set
+        :return: None
+        """
+        self.entity.reset()
+        if self._requires_token():
+            self.entity.clean_up()
+            await self.handle_token_async()
+
+    def _requires_token(self) -> bool:
+        """
+        Views tagged with `public` or `protected` are classified by their endpoint.
+        Requests that Flask matched to a url rule are classified once per url rule & method.
+        :return: True if the request must be authorized
+        """
         path = request.path
-        is_static = self._add_static_routes(path)
         method = request.method
-        if not is_static:
-            # Handle ignored routes
-            if self._does_route_exist(path, method):
-                is_ignored = False
-                ignored_routes = self.config.ignored_routes
-                if len(ignored_routes) > 0:
-                    is_ignored = not self._allow_public_routes(ignored_routes)
-                if not is_ignored:
-                    white_routes = self._prefix_api_name(self.config.whitelist_routes)
-                    not_whitelist = self._allow_public_routes(white_routes)
-                    if not_whitelist:
-                        self.entity.clean_up()
-                        self.handle_token()
+        rule = request.url_rule
+        endpoint_access = self.endpoint_access
+        if endpoint_access is None:
+            endpoint_access = self.compile_endpoint_access()
+        classification = endpoint_access.get(request.endpoint) if endpoint_access else None
+        if classification is not None:
+            if classification == PROTECTED and self._handle_pre_flight(method):
+                classification = PUBLIC
+        elif rule is not None and self.config.classification_cache:
+            classifications = self.config.route_table.classifications
+            key = (rule.rule, method)
+            classification = classifications.get(key)
+            if classification is None:
+                classification = self._classify_rule(rule, method)
+                classifications.set(key, classification)
+            if classification == PER_PATH:
+                classification = self._classify(path, method)
+        else:
+            classification = self._classify(path, method)
+        return classification == PROTECTED
+
+    def _verify_token(self, token: str) -> Dict[str, Any]:
+        """
+        Verifies the token with the key matching the token's *kid* header
+        :param token:
+        :return: The token's claims
+        """
+        keyring = self.config.keyring
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = keyring.verifying_key(kid)
+        if key is None:
+            raise InvalidTokenError(f"No verification key with the kid: {kid}")
+        return jwt.decode(token, key, algorithms=[keyring.algorithm])
+
+    def _decode_token(self, token: str) -> Dict[str, Any]:
+        """
+        Verifies & decodes the token. If JWT_ROUTER_TOKEN_CACHE is set then the verified
+        claims are cached until the token expires or JWT_ROUTER_TOKEN_CACHE_TTL is reached,
+        so repeated tokens skip the signature check & JSON decoding.
+        :param token:
+        :return: The token's claims
+        """
+        token_cache = self.token_cache
+        if token_cache is None:
+            return self._verify_token(token)
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        claims = token_cache.get(key)
+        if claims is None:
+            claims = MappingProxyType(self._verify_token(token))
+            ttl = token_cache.ttl
+            if "exp" in claims:
+                ttl = min(ttl, claims["exp"] - time())
+            if ttl > 0:
+                token_cache.set(key, claims, ttl)
+        return claims
+
+    def _attach_claims(self, decoded_token: Dict[str, Any]) -> None:
+        """
+        Attaches the token's claims to Flask's global context as `g.claims`
+        :param decoded_token: The verified token's claims
+        :return: None
+        """
+        entry = self.config.entity_index.get(decoded_token.get("table_name"))
+        entity_key = entry[1] if entry and entry[1] else self.config.entity_key
+        # update_token() reads the table name from the decoded token
+        self.entity.decoded_token = decoded_token
+        g.claims = Claims(decoded_token, entity_key)
+
+    def _find_strategy(self) -> Tuple[Optional[BaseOAuth], Optional[str]]:
+        """
+        Only the headers of the registered strategies are read
+        :return: The strategy & the value of its header, or (None, None)
+        """
+        headers = request.headers
+        for header_name, strategy in self._strategy_headers:
+            value = headers.get(header_name)
+            if value is not None:
+                return strategy, value
+        return None, None
+
+    def _request_token(self) -> str:
+        """
+        Reads the token from the *auth* param or the Authorization header
+        :return: The token
+        """
+        token = request.args.get("auth")
+        if token:
+            return token
+        # Sometimes a developer may define the auth field name as Bearer or Basic
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            abort(401)
+        if "Bearer " in auth_header:
+            return auth_header.split("Bearer ")[1]
+        if "Basic " in auth_header:
+            return auth_header.split("Basic ")[1]
+        return abort(401)
+
+    @staticmethod
+    def _strategy_token(oauth_headers: str) -> str:
+        """
+        :param oauth_headers: The value of the strategy's header
+        :return: The bearer token
+        """
+        token = oauth_headers.partition("Bearer ")[2]
+        if not token:
+            abort(401)
+        return token
+
+    def _authorize_token(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Verifies the token, attaches its claims to `g.claims` & checks the route's policy.
+        Attaches a lazy entity if JWT_ROUTER_LAZY_ENTITY is set.
+        :param token: A token signed by this app
+        :return: The token's claims if the entity must be loaded, otherwise None
+        """
+        decoded_token = self._decode_token(token)
+        self._attach_claims(decoded_token)
+        self._authorize_claims(g.claims)
+        if self.config.claims_only:
+            return None
+        if self.config.lazy_entity:
+            self._attach_entity(self.entity.get_lazy_entity(decoded_token))
+            return None
+        return decoded_token
+
+    def _attach_entity(self, entity: Any) -> None:
+        """
+        Attaches the entity to Flask's global context using the table name as the attribute name
+        :param entity: The entity or None
+        :return: None
+        """
+        setattr(g, self.entity.get_entity_from_ext().__tablename__, entity)
+
+    def _authorize_oauth(self, strategy: BaseOAuth,
+                         auth_results: Optional[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+        """
+        :param strategy: The strategy that authorized the token
+        :param auth_results: The result of the strategy's authorize
+        :return: The authorized user's email & the table name from the X-Auth-Resource header
+            or None
+        :raises TypeError: If the strategy rejected the token
+        """
+        email = auth_results["email"]
+        # The route's policy is checked against the provider's claims or userinfo response
+        self._authorize_claims(Claims(auth_results, "email"))
+        self.entity.oauth_entity_key = strategy.email_field
+        # If multiple tables are used to look up against incoming oauth users
+        # then the X-Auth-Resource header names the entity's table.
+        return email, request.headers.get("X-Auth-Resource")
+
+    def _attach_oauth_entity(self, resource_headers: Optional[str], entity: Any,
+                             token: str) -> None:
+        """
+        Attaches the entity to Flask's global context using the X-Auth-Resource header
+        or the table name as the attribute name
+        :return: None
+        """
+        setattr(g, resource_headers or self.entity.get_entity_from_ext().__tablename__, entity)
+        setattr(g, "access_token", token)
 
     def handle_token(self):
         """
@@ -183,84 +503,72 @@ class Routing(BaseRouting):
         Checks to see that the route is white listed.
         :return None:
         """
-        strategy: Optional[BaseOAuth] = None
-        oauth_key: str = ""
         try:
-            # TODO update docs
-            resource_headers = request.headers.get("X-Auth-Resource")
-            oauth_headers = request.headers.get("X-Auth-Token")
-            if oauth_headers:
-                # TODO When we have more than one strategy then `oauth_key` should derive the key dynamically
-                oauth_key = "X-Auth-Token"
-            if request.args.get("auth"):
-                token = request.args.get("auth")
-            # Strategies --------------------------------------------------------- #
-
-            elif oauth_headers is not None and len(self.strategy_dict.keys()):
-                for s in self.strategy_dict.values():
-                    if s.header_name == oauth_key:
-                        strategy = s
-                if not strategy:
-                    abort(401)
-                bearer = oauth_headers
-                token = bearer.split("Bearer ")[1]
-                if not token:
-                    abort(401)
+            strategy, oauth_headers = self._find_strategy()
+            if strategy is not None and not request.args.get("auth"):
+                # Strategies --------------------------------------------------------- #
+                token = self._strategy_token(oauth_headers)
                 try:
                     # Currently token refreshing is not supported, so pass the current token through
                     auth_results = strategy.authorize(token)
-                    email = auth_results["email"]
-                    self.entity.oauth_entity_key = self.config.oauth_entity
-                    if resource_headers:
-                        # If multiple tables are used to look up against incoming oauth users
-                        # then assign the value from the X-Auth-Resource headers as the entity table name.
-                        entity = self.entity.get_entity_from_token_or_tablename(
-                            tablename=resource_headers,
-                            email_value=email,
-                        )
-                        setattr(g, resource_headers, entity)
-                    else:
-                        # Attach the the entity using the table name as the attribute name to Flask's
-                        # global context object.
-                        entity = self.entity.get_entity_from_token_or_tablename(
-                            tablename=strategy.tablename,
-                            email_value=email,
-                        )
-                        setattr(g, self.entity.get_entity_from_ext().__tablename__, entity)
-                    setattr(g, "access_token", token)
+                    email, resource_headers = self._authorize_oauth(strategy, auth_results)
+                    entity = self.entity.get_entity_from_token_or_tablename(
+                        tablename=resource_headers or strategy.tablename,
+                        email_value=email,
+                    )
+                    self._attach_oauth_entity(resource_headers, entity, token)
                     return None
-                except InvalidTokenError:
+                except (InvalidTokenError, AttributeError, TypeError):
+                    # TypeError is raised from auth_results["email"] if the token is rejected
                     return abort(401)
-                except AttributeError:
-                    return abort(401)
-                except TypeError:
-                    # This is raised from auth_results["email"] not present
-                    abort(401)
-            else:
-                # Basic Auth --------------------------------------------------------- #
-                # Sometimes a developer may define the auth field name as Bearer or Basic
-                auth_header = request.headers.get("Authorization")
-                if not auth_header:
-                    abort(401)
-                if "Bearer " in auth_header:
-                    token = auth_header.split("Bearer ")[1]
-                elif "Basic " in auth_header:
-                    token = auth_header.split("Basic ")[1]
+                except ProviderUnavailableError as err:
+                    # The token may be valid, let the client retry rather than sign the user out
+                    logger.warning(err)
+                    return abort(503)
+            # Basic Auth --------------------------------------------------------- #
+            token = self._request_token()
         except AttributeError:
             return abort(401)
         try:
-            decoded_token = jwt.decode(
-                token,
-                self.config.secret_key,
-                algorithms="HS256"
-            )
-            self.entity_key = self.config.entity_key
-            entity = self.entity.get_entity_from_token_or_tablename(decoded_token)
-            setattr(g, self.entity.get_entity_from_ext().__tablename__, entity)
+            decoded_token = self._authorize_token(token)
+            if decoded_token is not None:
+                self._attach_entity(self.entity.get_entity_from_token_or_tablename(decoded_token))
             return None
-        except ValueError:
+        except (ValueError, InvalidTokenError):
             return abort(401)
-        except InvalidTokenError:
+
+    async def handle_token_async(self) -> None:
+        """
+        The asyncio variant of :class:`~flask_jwt_router._routing.Routing.handle_token`.
+        OAuth tokens are authorized with the strategy's ``authorize_async`` & entities are
+        loaded with entity loaders that are coroutine functions without blocking the event loop.
+        :return None:
+        """
+        strategy, oauth_headers = self._find_strategy()
+        if strategy is not None and not request.args.get("auth"):
+            token = self._strategy_token(oauth_headers)
+            try:
+                auth_results = await strategy.authorize_async(token)
+                email, resource_headers = self._authorize_oauth(strategy, auth_results)
+                entity = await self.entity.get_entity_from_token_or_tablename_async(
+                    tablename=resource_headers or strategy.tablename,
+                    email_value=email,
+                )
+                self._attach_oauth_entity(resource_headers, entity, token)
+                return None
+            except (InvalidTokenError, AttributeError, TypeError):
+                return abort(401)
+            except ProviderUnavailableError as err:
+                logger.warning(err)
+                return abort(503)
+        token = self._request_token()
+        try:
+            decoded_token = self._authorize_token(token)
+            if decoded_token is not None:
+                entity = await self.entity.get_entity_from_token_or_tablename_async(decoded_token)
+                self._attach_entity(entity)
+            return None
+        except (ValueError, InvalidTokenError):
             return abort(401)
 
 
@@ -276,30 +584,23 @@ class _TestMixin(Routing):
 
     def handle_token(self):
 
-        strategy: Optional[TestBaseOAuth] = None
-
         try:
             resource_headers = request.headers.get("X-Auth-Resource")
-            oauth_headers = request.headers.get("X-Auth-Token")
+            strategy, oauth_headers = self._find_strategy()
             if request.args.get("auth"):
                 super(_TestMixin, self).handle_token()
             # Strategies --------------------------------------------------------- #
-            elif oauth_headers is not None and len(self.strategy_dict.keys()):
-                for s in self.strategy_dict.values():
-                    if s.header_name == "X-Auth-Token":
-                        strategy = s
-                if not strategy:
-                    abort(401)
-                bearer = oauth_headers
-                token = bearer.split("Bearer ")[1]
+            elif strategy is not None:
+                token = oauth_headers.partition("Bearer ")[2]
                 if not token:
                     abort(401)
                 try:
                     if not strategy.test_metadata:
                         strategy.create_test_headers(email=token)
                     email, entity = strategy.update_test_metadata(token)
+                    self._authorize_claims(Claims({"email": email}, "email"))
 
-                    self.entity.oauth_entity_key = self.config.oauth_entity
+                    self.entity.oauth_entity_key = strategy.email_field
                     if not entity:
                         if resource_headers:
                             # If multiple tables are used to look up against incoming oauth users
@@ -337,10 +638,25 @@ class _TestMixin(Routing):
         except AttributeError:
             return abort(401)
 
+    async def handle_token_async(self) -> None:
+        # The test strategies do not call the provider
+        return self.handle_token()
+
 
 class RoutingMixin:
-    routing = Routing()
+    """
+    Creates a :class:`~flask_jwt_router._routing.Routing` instance for each
+    :class:`~flask_jwt_router.JwtRoutes` instance
+    """
+    #: The class used to create the routing instance
+    routing_class = Routing
+
+    routing: BaseRouting
+
+    def __init__(self, *args, **kwargs):
+        self.routing = self.routing_class()
+        super(RoutingMixin, self).__init__(*args, **kwargs)
 
 
-class TestRoutingMixin:
-    routing = _TestMixin()
+class TestRoutingMixin(RoutingMixin):
+    routing_class = _TestMixin
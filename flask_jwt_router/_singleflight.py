@@ -0,0 +1,127 @@
+"""
+    Coalesces concurrent calls that share a key into a single call
+"""
+import asyncio
+from concurrent.futures import Future
+from functools import partial
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    # pylint:disable=missing-class-docstring
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    While a call for a key is in flight, other callers with the same key wait for
+    it to return & share its result (or exception) instead of making the call again.
+    Once the call returns the key is forgotten, so results are not cached.
+    """
+    #: Number of callers that shared the result of an in flight call
+    shared: int = 0
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        :param key: Callers with the same key share a call
+        :param fn: The function to call
+        :param args: Passed to *fn*
+        :param kwargs: Passed to *fn*
+        :return: The result of *fn*
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class _CallCancelled(Exception):
+    """
+    The task of a shared call was cancelled, e.g. because its event loop was shut down
+    """
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio counterpart of :class:`~flask_jwt_router._singleflight.SingleFlight`. Callers
+    with the same key await the call that is in flight, including callers on other event loops,
+    as Flask runs each async view on its own loop. The call runs in a task on the loop of the
+    caller that started it, so a cancelled caller (including that one) does not cancel the call
+    the other callers await. If the task is cancelled anyway, the waiting callers start a new call.
+    """
+    #: Number of callers that shared the result of an in flight call
+    shared: int = 0
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        :param key: Callers with the same key share a call
+        :param fn: The coroutine function to call
+        :param args: Passed to *fn*
+        :param kwargs: Passed to *fn*
+        :return: The result of *fn*
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = Future()
+                else:
+                    self.shared += 1
+            if leader:
+                task = asyncio.get_running_loop().create_task(fn(*args, **kwargs))
+                task.add_done_callback(partial(self._done, key, call))
+            try:
+                # A cancelled caller must not cancel the call it shares
+                return await asyncio.shield(asyncio.wrap_future(call))
+            except _CallCancelled:
+                continue
+
+    def _done(self, key: Hashable, call: Future, task: asyncio.Task) -> None:
+        with self._lock:
+            del self._calls[key]
+        if task.cancelled():
+            call.set_exception(_CallCancelled())
+        elif task.exception() is not None:
+            call.set_exception(task.exception())
+        else:
+            call.set_result(task.result())
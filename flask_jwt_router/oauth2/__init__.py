@@ -1,2 +1,3 @@
 from .google import Google
+from .oidc import OIDC
 from .http_requests import HttpRequests
\ No newline at end of file
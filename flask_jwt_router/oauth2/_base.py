@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Tuple
 
@@ -14,10 +15,18 @@ class _FlaskRequestType(ABC):
 
 class BaseOAuth(ABC):
 
+    #: The request header that carries this strategy's tokens. Each strategy needs its own header
     header_name: str
 
+    #: The provider's urls keyed by name, passed to the strategy's HttpRequests
+    urls: Dict[str, str] = {}
+
+    #: Value of SQLAlchemy's __tablename__ attribute
     tablename: str
 
+    #: The entity's column that is matched against the email of the authorized user
+    email_field: str
+
     @abstractmethod
     def init(self, *, client_id, client_secret, redirect_uri, expires_in, email_field, tablename) -> None:
         pass
@@ -30,6 +39,15 @@ class BaseOAuth(ABC):
     def authorize(self, token: str) -> Dict:
         pass
 
+    async def authorize_async(self, token: str) -> Dict:
+        """
+        Authorizes the token without blocking the event loop. Strategies that do not
+        override this run ``authorize`` in the event loop's default executor.
+        :param token: The token from the strategy's header
+        :return: The same result as ``authorize``
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.authorize, token)
+
 
 class TestBaseOAuth(BaseOAuth, ABC):
     test_metadata: Dict[str, Dict[str, str]] = {}
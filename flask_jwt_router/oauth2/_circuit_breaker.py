@@ -0,0 +1,124 @@
+"""
+    Fails calls to an OAuth provider fast while the provider is down, instead of
+    holding a worker thread on a connection or read timeout for every request.
+"""
+import asyncio
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable
+
+from ._exceptions import CircuitOpenError, ProviderUnavailableError
+
+#: Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    The circuit opens after *failure_threshold* consecutive calls raise
+    :class:`~flask_jwt_router.oauth2._exceptions.ProviderUnavailableError`. While it is open
+    calls raise :class:`~flask_jwt_router.oauth2._exceptions.CircuitOpenError` without calling
+    the provider. After *reset_timeout* seconds one trial call is let through, the circuit closes
+    if it succeeds & opens again if it fails.
+    :param failure_threshold: Consecutive failures that open the circuit. Default is *5*, 0 disables
+        the breaker
+    :param reset_timeout: Seconds the circuit stays open before a trial call. Default is *30*
+    :param timer: Returns the current time in seconds. Default is `time.monotonic`
+    """
+    #: Consecutive failures that open the circuit
+    failure_threshold: int
+
+    #: Seconds the circuit stays open before a trial call
+    reset_timeout: float
+
+    #: Number of consecutive failures
+    failures: int = 0
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30,
+                 timer: Callable[[], float] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timer = timer or monotonic
+        self._lock = Lock()
+        self._state = CLOSED
+        self._opened_at: float = 0
+
+    @property
+    def state(self) -> str:
+        """
+        :return: closed, open or half_open
+        """
+        return self._state
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self.timer() - self._opened_at >= self.reset_timeout:
+                # Let this call through as the trial call
+                self._state = HALF_OPEN
+                return
+            raise CircuitOpenError()
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+
+    def _on_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self.timer()
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        :param fn: The function that calls the provider
+        :param args: Passed to *fn*
+        :param kwargs: Passed to *fn*
+        :return: The result of *fn*
+        """
+        if self.failure_threshold <= 0:
+            return fn(*args, **kwargs)
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except ProviderUnavailableError:
+            self._on_failure()
+            raise
+        except BaseException:
+            # The provider responded, e.g. with a body that could not be decoded
+            self._on_success()
+            raise
+        self._on_success()
+        return result
+
+    async def call_async(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        :param fn: The coroutine function that calls the provider
+        :param args: Passed to *fn*
+        :param kwargs: Passed to *fn*
+        :return: The result of *fn*
+        """
+        if self.failure_threshold <= 0:
+            return await fn(*args, **kwargs)
+        self._before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except ProviderUnavailableError:
+            self._on_failure()
+            raise
+        except asyncio.CancelledError:
+            # The caller gave up, the provider has not failed
+            with self._lock:
+                if self._state == HALF_OPEN:
+                    self._state = OPEN
+            raise
+        except BaseException:
+            self._on_success()
+            raise
+        self._on_success()
+        return result
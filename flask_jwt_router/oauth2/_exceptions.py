@@ -12,3 +12,23 @@ class ClientExchangeCodeError(Exception):
     def __init__(self, client_url):
         super(ClientExchangeCodeError, self).__init__()
         self.message = f"Error in POST {client_url} from client - code value not in request body."
+
+
+class ProviderUnavailableError(Exception):
+    message = "The OAuth provider is unavailable"
+
+    def __init__(self, url="", err=""):
+        super(ProviderUnavailableError, self).__init__(f"{self.message}: {url} {err}".rstrip())
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    message = "The OAuth provider's circuit breaker is open after repeated failures"
+
+
+class StrategyOptionsError(Exception):
+    message = "Pass each OAuth strategy's options to init_app, e.g. " \
+              "strategy_options={\"<STRATEGY_NAME>\": {...}}. " \
+              "See https://flask-jwt-router.readthedocs.io/en/latest/"
+
+    def __init__(self, err=""):
+        super(StrategyOptionsError, self).__init__(f"{err}\n{self.message}")
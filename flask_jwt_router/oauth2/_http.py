@@ -0,0 +1,241 @@
+"""
+    The HTTP/1.1 connection pool & response handling shared by the sync & asyncio
+    OAuth provider clients
+"""
+import json
+import logging
+from base64 import b64encode
+from http.client import HTTPConnection, HTTPSConnection, HTTPMessage
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlsplit, urlunsplit
+from urllib.request import getproxies, proxy_bypass_environment
+
+from ._exceptions import ProviderUnavailableError
+
+_PoolKey = Tuple[str, str, int]
+
+#: A proxy's host, port & Proxy-Authorization header
+_Proxy = Tuple[str, int, Dict[str, str]]
+
+#: Requests that are resent on a new connection if a pooled connection was closed by the provider
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def get_proxy(proxies: Dict[str, str], scheme: str, host: str) -> Optional[_Proxy]:
+    """
+    :param proxies: Proxy urls keyed by scheme, e.g. from `urllib.request.getproxies()`
+    :param scheme: The scheme of the provider's url
+    :param host: The provider's host
+    :return: The proxy for the url or None
+    """
+    proxy = proxies.get(scheme) if proxies else None
+    if not proxy or proxy_bypass_environment(host, proxies):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    parts = urlsplit(proxy)
+    headers = {}
+    if parts.username:
+        credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+        headers["Proxy-Authorization"] = f"Basic {b64encode(credentials).decode('ascii')}"
+    return parts.hostname, parts.port or 80, headers
+
+
+class Response(NamedTuple):
+    """
+    A response read from a pooled connection
+    """
+    #: The http status code
+    status: int
+
+    #: The response headers
+    headers: HTTPMessage
+
+    #: The response body
+    body: bytes
+
+
+class ConnectionPool:
+    """
+    Keep alive `http.client` connections pooled per scheme, host & port, so each call
+    to an OAuth provider reuses an open TCP & TLS connection instead of opening a new one.
+    Like `urllib.request`, connections go through the proxies in the *http_proxy*,
+    *https_proxy* & *no_proxy* environment variables. Https requests are tunnelled with CONNECT.
+    :param maxsize: The maximum number of idle connections kept for each host
+    :param connect_timeout: Seconds to wait for a new connection to open
+    :param read_timeout: Seconds to wait for the provider to respond
+    :param proxies: Optional. Proxy urls keyed by scheme. Default is `urllib.request.getproxies()`
+    """
+    #: The maximum number of idle connections kept for each host
+    maxsize: int
+
+    #: Seconds to wait for a new connection to open
+    connect_timeout: float
+
+    #: Seconds to wait for the provider to respond
+    read_timeout: float
+
+    #: Number of connections opened
+    created: int = 0
+
+    #: Number of requests sent on a pooled connection
+    reused: int = 0
+
+    #: Proxy urls keyed by scheme, & hosts that bypass the proxies keyed by *no*
+    proxies: Dict[str, str]
+
+    def __init__(self, maxsize: int = 10, connect_timeout: float = 5, read_timeout: float = 10,
+                 proxies: Dict[str, str] = None):
+        self.maxsize = maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.proxies = getproxies() if proxies is None else proxies
+        self._pools: Dict[_PoolKey, List[HTTPConnection]] = {}
+        self._lock = Lock()
+
+    def _connect(self, key: _PoolKey, proxy: Optional[_Proxy]) -> HTTPConnection:
+        scheme, host, port = key
+        connection_class = HTTPSConnection if scheme == "https" else HTTPConnection
+        if proxy is None:
+            conn = connection_class(host, port, timeout=self.connect_timeout)
+        else:
+            proxy_host, proxy_port, proxy_headers = proxy
+            conn = connection_class(proxy_host, proxy_port, timeout=self.connect_timeout)
+            if scheme == "https":
+                conn.set_tunnel(host, port, headers=proxy_headers)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def _acquire(self, key: _PoolKey) -> Optional[HTTPConnection]:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool:
+                self.reused += 1
+                return pool.pop()
+        return None
+
+    def _release(self, key: _PoolKey, conn: HTTPConnection) -> None:
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            if len(pool) < self.maxsize:
+                pool.append(conn)
+                return
+        conn.close()
+
+    @staticmethod
+    def _send(conn: HTTPConnection, method: str, path: str, headers: Dict[str, str],
+              body) -> Tuple[Response, bool]:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        return Response(response.status, response.msg, data), response.will_close
+
+    def request(self, method: str, url: str, headers: Dict[str, str], body=None) -> Response:
+        """
+        Sends the request on a pooled connection. A pooled connection the provider has
+        since closed is replaced with a new connection & an idempotent request is sent once more.
+        Other requests, e.g. the POST that exchanges a single use authorization code, are sent
+        on a new connection, so they are never resent.
+        :param method: The http verb
+        :param url: The absolute url
+        :param headers: The request headers
+        :param body: Optional. The request body
+        :return: Response
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        proxy = get_proxy(self.proxies, scheme, parts.hostname)
+        if proxy is not None and scheme == "http":
+            # The proxy forwards plain http requests to the absolute url
+            path = urlunsplit((scheme, parts.netloc, parts.path or "/", parts.query, ""))
+            headers = {**headers, **proxy[2]}
+        conn = self._acquire(key) if method in IDEMPOTENT_METHODS else None
+        try:
+            if conn is not None:
+                try:
+                    response, will_close = self._send(conn, method, path, headers, body)
+                except ConnectionError:
+                    # The provider closed the idle keep alive connection
+                    conn.close()
+                    conn = None
+            if conn is None:
+                conn = self._connect(key, proxy)
+                response, will_close = self._send(conn, method, path, headers, body)
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            raise
+        if will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return response
+
+    def clear(self) -> None:
+        """
+        Closes every idle connection
+        :return: None
+        """
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            for conn in pool:
+                conn.close()
+
+
+class BaseHttpRequests:
+    """
+    The request headers & response handling of
+    :class:`~flask_jwt_router.oauth2.http_requests.HttpRequests` &
+    :class:`~flask_jwt_router.oauth2.async_http_requests.AsyncHttpRequests`
+    """
+
+    logger = logging.getLogger()
+
+    def _get_headers(self, token: str = None) -> Dict[str, str]:
+        t = {"Authorization": f"Bearer {token}"} if token else {}
+        return {
+            **t,
+            "Content-type": "application/x-www-form-urlencoded",
+        }
+
+    def _check_status(self, url: str, verb: str, response: Response) -> Optional[Response]:
+        """
+        :return: The response or None if the provider rejected the request
+        :raises ProviderUnavailableError: If the provider responded with a 5xx or 429 status
+        """
+        if response.status >= 500 or response.status == 429:
+            raise ProviderUnavailableError(url, response.status)
+        if response.status != 200:
+            self.logger.debug(f"{verb} {url} returned {response.status}")
+            return None
+        return response
+
+    def _decode(self, url: str, response: Optional[Response]) -> Optional[Dict]:
+        if response is None:
+            return None
+        self.logger.debug(f"Successfully authenticated from {url}")
+        return json.loads(response.body.decode("utf-8"))
+
+    def _decode_json(
+            self,
+            response: Optional[Response],
+    ) -> Tuple[Optional[Dict], Optional[HTTPMessage]]:
+        """
+        :return: A tuple of the decoded response body & the response headers, or (None, None)
+        """
+        if response is None:
+            return None, None
+        try:
+            return json.loads(response.body.decode("utf-8")), response.headers
+        except ValueError as err:
+            self.logger.debug(err, exc_info=True)
+            return None, None
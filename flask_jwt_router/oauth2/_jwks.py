@@ -0,0 +1,153 @@
+"""
+    Caches an OAuth provider's JSON Web Key Set (JWKS), e.g. Google's signing certs, so
+    ID tokens are verified locally instead of with a network call on each request.
+
+    The keys are refreshed when the *Cache-Control* max-age of the JWKS response has passed,
+    or when a token is signed with a *kid* that is not in the cache (the provider has rotated
+    its keys). Refreshes are rate limited by *min_refresh_interval*.
+"""
+import logging
+import re
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .._keys import Keyring, KeyLoadError, load_jwk, load_jwks
+from .http_requests import HttpRequests
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def max_age(headers) -> Optional[int]:
+    """
+    :param headers: The response headers
+    :return: Seconds the response can be cached for from the *Cache-Control* & *Age*
+        headers, or None if there is no max-age
+    """
+    if headers is None:
+        return None
+    cache_control = headers.get("Cache-Control") or ""
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return None
+    try:
+        age = int(headers.get("Age") or 0)
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class JWKSCache:
+    """
+    The provider's verification keys indexed by *kid*.
+    :param http: The strategy's :class:`~flask_jwt_router.oauth2.http_requests.HttpRequests`
+    :param jwks_uri: The url of the JWKS or the path to a local JWKS file
+    :param algorithm: The algorithm the provider signs tokens with. Default is *RS256*
+    :param default_ttl: Seconds the keys are cached for if the response has no max-age. 
+        Default is *3600*
+    :param min_refresh_interval: The minimum seconds between refreshes. Default is *60*
+    :param timer: Returns the current time in seconds. Default is `time.monotonic`
+    """
+    logger = logging.getLogger()
+
+    #: The url of the JWKS or the path to a local JWKS file
+    jwks_uri: str
+
+    #: The algorithm the provider signs tokens with
+    algorithm: str
+
+    #: Number of times the keys have been fetched
+    refreshes: int = 0
+
+    def __init__(self, http: HttpRequests, jwks_uri: str, *, algorithm: str = "RS256",
+                 default_ttl: float = 3600, min_refresh_interval: float = 60,
+                 timer: Callable[[], float] = None):
+        self.http = http
+        self.jwks_uri = jwks_uri
+        self.algorithm = algorithm
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timer = timer or monotonic
+        self._lock = Lock()
+        self._keyring: Optional[Keyring] = None
+        self._expires_at: float = 0
+        self._refreshed_at: Optional[float] = None
+
+    @property
+    def kids(self):
+        """
+        :return: The *kid* of every cached key
+        """
+        return self._keyring.kids if self._keyring else []
+
+    def _fetch(self) -> Tuple[Optional[Dict[Optional[str], Dict[str, Any]]], Optional[int]]:
+        """
+        :return: A tuple of the JWKs keyed by *kid* & the response's max-age
+        """
+        if not self.jwks_uri.startswith(("http://", "https://")):
+            return load_jwks(self.jwks_uri), None
+        jwks, headers = self.http.get_json(self.jwks_uri)
+        if not isinstance(jwks, dict) or not isinstance(jwks.get("keys"), list):
+            return None, None
+        return {jwk.get("kid"): jwk for jwk in jwks["keys"]}, max_age(headers)
+
+    def _refresh(self, is_stale: Callable[[float], bool]) -> None:
+        """
+        Fetches the keys if they are still stale once the lock is held, so concurrent
+        requests that find stale keys fetch them once.
+        :param is_stale: Called with the current time
+        :return: None
+        """
+        with self._lock:
+            now = self.timer()
+            if not is_stale(now):
+                return
+            self._refreshed_at = now
+            try:
+                jwks, ttl = self._fetch()
+            except KeyLoadError as err:
+                self.logger.debug(err, exc_info=True)
+                jwks, ttl = None, None
+            if jwks is None:
+                # Keep the current keys & try again after min_refresh_interval
+                self._expires_at = now + self.min_refresh_interval
+                return
+            keyring = Keyring(self.algorithm)
+            for kid, jwk in jwks.items():
+                if jwk.get("alg", self.algorithm) != self.algorithm:
+                    continue
+                try:
+                    _, public_key = load_jwk(jwk, self.algorithm)
+                    keyring.add(kid, public_key)
+                except KeyLoadError as err:
+                    self.logger.debug(err, exc_info=True)
+            ttl = self.default_ttl if ttl is None else ttl
+            self._keyring = keyring
+            self._expires_at = now + max(ttl, self.min_refresh_interval)
+            self.refreshes += 1
+
+    def _expired(self, now: float) -> bool:
+        return self._keyring is None or now >= self._expires_at
+
+    def _may_refresh(self, now: float) -> bool:
+        return self._refreshed_at is None or now - self._refreshed_at >= self.min_refresh_interval
+
+    def get_key(self, kid: Optional[str]) -> Any:
+        """
+        :param kid: The *kid* from the token's header
+        :return: The verification key or None
+        """
+        if self._expired(self.timer()):
+            self._refresh(self._expired)
+        keyring = self._keyring
+        key = keyring.verifying_key(kid) if keyring else None
+        if key is None and self._may_refresh(self.timer()):
+            # The provider may have rotated its keys
+            self._refresh(lambda now: self._may_refresh(now) and (
+                self._keyring is None or self._keyring.verifying_key(kid) is None
+            ))
+            keyring = self._keyring
+            key = keyring.verifying_key(kid) if keyring else None
+        return key
@@ -2,4 +2,5 @@ GOOGLE_OAUTH_URL = {
     "token": "https://oauth2.googleapis.com/token",
     "auth": "https://googleapis.com/auth/",
     "user_info.email": "https://www.googleapis.com/oauth2/v2/userinfo",
+    "certs": "https://www.googleapis.com/oauth2/v3/certs",
 }
@@ -0,0 +1,410 @@
+"""
+    An asyncio client for OAuth provider calls, so requests authorized on an event loop
+    wait for the provider without blocking the loop. Connections are opened with asyncio
+    streams & kept alive per event loop, as a connection can only be used on the loop it
+    was opened on. A loop's connections are closed when the loop is shut down, e.g. at the
+    end of each of Flask's async views, which run on their own event loop. Requests through
+    a proxy are sent with the sync
+    :class:`~flask_jwt_router.oauth2.http_requests.ConnectionPool` in the loop's default
+    executor.
+"""
+import asyncio
+import re
+import ssl
+from http.client import HTTPException, HTTPMessage, RemoteDisconnected
+from threading import Lock
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+from weakref import WeakKeyDictionary
+
+from ._exceptions import ProviderUnavailableError
+from ._http import (
+    IDEMPOTENT_METHODS,
+    BaseHttpRequests,
+    ConnectionPool,
+    Response,
+    _PoolKey,
+    get_proxy,
+)
+
+_Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+#: The idle connections of an event loop
+_LoopPools = Dict[_PoolKey, List[_Connection]]
+
+#: An event loop's idle connections & the async generator that closes them
+_LoopEntry = Tuple[_LoopPools, AsyncGenerator]
+
+#: The maximum size of a response header line
+_MAX_LINE = 65536
+
+#: The maximum number of response headers, as in `http.client`
+_MAX_HEADERS = 100
+
+# The header checks of `http.client`, which rejects the characters that would end a header line
+_is_legal_header_name = re.compile(rb"[^:\s][^:\r\n]*").fullmatch
+_is_illegal_header_value = re.compile(rb"\n(?![ \t])|\r(?![ \t\n])").search
+
+
+def _header_line(name: str, value) -> bytes:
+    """
+    :raises ValueError: If the header name or value could end the header line
+    """
+    name = name.encode("latin-1")
+    value = str(value).encode("latin-1")
+    if not _is_legal_header_name(name):
+        raise ValueError(f"Invalid header name {name!r}")
+    if _is_illegal_header_value(value):
+        raise ValueError(f"Invalid header value {value!r}")
+    return name + b": " + value + b"\r\n"
+
+
+class AsyncConnectionPool:
+    """
+    Keep alive asyncio stream connections pooled per event loop & per scheme, host & port.
+    :param maxsize: The maximum number of idle connections kept for each host
+    :param connect_timeout: Seconds to wait for a new connection to open
+    :param read_timeout: Seconds to wait for the provider to respond
+    :param max_response_size: The maximum size in bytes of a response body. Default is 1 MiB
+    :param proxies: Optional. Proxy urls keyed by scheme. Default is `urllib.request.getproxies()`
+    """
+    #: The maximum number of idle connections kept for each host
+    maxsize: int
+
+    #: The maximum size in bytes of a response body
+    max_response_size: int
+
+    #: Seconds to wait for a new connection to open
+    connect_timeout: float
+
+    #: Seconds to wait for the provider to respond
+    read_timeout: float
+
+    #: Number of connections opened
+    created: int = 0
+
+    #: Number of requests sent on a pooled connection
+    reused: int = 0
+
+    def __init__(self, maxsize: int = 10, connect_timeout: float = 5, read_timeout: float = 10,
+                 max_response_size: int = 1 << 20, proxies: Dict[str, str] = None):
+        self.maxsize = maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_response_size = max_response_size
+        self.proxies = getproxies() if proxies is None else proxies
+        self._proxy_pool: Optional[ConnectionPool] = None
+        # Each loop's idle connections & the generator that closes them when the loop shuts down
+        self._pools: "WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopEntry]" = \
+            WeakKeyDictionary()
+        self._lock = Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    async def _loop_pools(self) -> _LoopPools:
+        """
+        :return: The idle connections of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._pools.get(loop)
+            if entry is not None:
+                return entry[0]
+            pools: _LoopPools = {}
+            closer = self._close_with_loop(pools)
+            self._pools[loop] = (pools, closer)
+        # Started on the running loop, so the loop closes it at shutdown
+        await closer.asend(None)
+        return pools
+
+    async def _close_with_loop(self, pools: _LoopPools) -> AsyncGenerator[None, None]:
+        """
+        Suspended until the loop closes its async generators with `loop.shutdown_asyncgens()`,
+        which `asyncio.run` & asgiref (which runs Flask's async views) call before they close
+        the loop. Otherwise the loop's connections would stay open after the loop is gone.
+        """
+        try:
+            yield
+        finally:
+            loop = asyncio.get_running_loop()
+            with self._lock:
+                entry = self._pools.get(loop)
+                if entry is not None and entry[0] is pools:
+                    del self._pools[loop]
+            await self._close(pools)
+
+    @staticmethod
+    async def _close(pools: _LoopPools) -> None:
+        writers = [writer for pool in pools.values() for _, writer in pool]
+        pools.clear()
+        for writer in writers:
+            writer.close()
+        for writer in writers:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _connect(self, key: _PoolKey) -> _Connection:
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        conn = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=ssl_context, limit=_MAX_LINE),
+            self.connect_timeout,
+        )
+        self.created += 1
+        return conn
+
+    def _acquire(self, pools: _LoopPools, key: _PoolKey) -> Optional[_Connection]:
+        pool = pools.get(key)
+        while pool:
+            reader, writer = pool.pop()
+            if reader.at_eof() or writer.is_closing():
+                # The provider closed the idle keep alive connection
+                writer.close()
+                continue
+            self.reused += 1
+            return reader, writer
+        return None
+
+    def _release(self, pools: _LoopPools, key: _PoolKey, conn: _Connection) -> None:
+        pool = pools.setdefault(key, [])
+        if len(pool) < self.maxsize:
+            pool.append(conn)
+            return
+        conn[1].close()
+
+    @staticmethod
+    def _request_head(method: str, host: str, path: str, headers: Dict[str, str],
+                      body: Optional[bytes]) -> bytes:
+        """
+        :raises ValueError: If the path or a header contains a character that could end its line
+        """
+        if _is_illegal_header_value(path.encode("latin-1")) or " " in path:
+            raise ValueError(f"Invalid request path {path!r}")
+        lines = [f"{method} {path} HTTP/1.1\r\n".encode("latin-1"), _header_line("Host", host),
+                 b"Accept-Encoding: identity\r\n"]
+        lines.extend(_header_line(name, value) for name, value in headers.items())
+        if body is not None or method in ("POST", "PUT", "PATCH"):
+            lines.append(_header_line("Content-Length", len(body or b"")))
+        lines.append(b"\r\n")
+        return b"".join(lines)
+
+    async def _readline(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except ValueError as err:
+            # The line is longer than _MAX_LINE
+            raise HTTPException("The response line is too long") from err
+
+    def _check_size(self, size: int) -> None:
+        if size > self.max_response_size:
+            raise HTTPException(f"The response body is larger than {self.max_response_size} bytes")
+
+    async def _send(self, conn: _Connection, head: bytes, method: str,
+                    body: Optional[bytes]) -> Tuple[Response, bool]:
+        reader, writer = conn
+        writer.write(head + (body or b""))
+        await writer.drain()
+
+        status_line = await self._readline(reader)
+        if not status_line:
+            raise RemoteDisconnected("The provider closed the connection without a response")
+        try:
+            version, status = status_line.decode("latin-1").split(None, 2)[:2]
+            status = int(status)
+        except ValueError as err:
+            raise HTTPException(f"Invalid status line: {status_line!r}") from err
+        response_headers = HTTPMessage()
+        while True:
+            line = await self._readline(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(response_headers) >= _MAX_HEADERS:
+                raise HTTPException(f"More than {_MAX_HEADERS} response headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip()] = value.strip()
+
+        connection = (response_headers.get("Connection") or "").lower()
+        will_close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+        try:
+            if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+                data = b""
+            elif "chunked" in (response_headers.get("Transfer-Encoding") or "").lower():
+                chunks = []
+                total = 0
+                while True:
+                    size = int((await self._readline(reader)).split(b";", 1)[0], 16)
+                    if size == 0:
+                        # Discard any trailers
+                        while (await self._readline(reader)) not in (b"\r\n", b"\n", b""):
+                            pass
+                        break
+                    total += size
+                    self._check_size(total)
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readexactly(2)
+                data = b"".join(chunks)
+            elif response_headers.get("Content-Length") is not None:
+                size = int(response_headers["Content-Length"])
+                self._check_size(size)
+                data = await reader.readexactly(size)
+            else:
+                # The body ends when the provider closes the connection
+                data = await reader.read(self.max_response_size + 1)
+                self._check_size(len(data))
+                will_close = True
+        except ValueError as err:
+            # An invalid chunk size or Content-Length
+            raise HTTPException(f"Invalid response body: {err}") from err
+        return Response(status, response_headers, data), will_close
+
+    async def request(self, method: str, url: str, headers: Dict[str, str],
+                      body: bytes = None) -> Response:
+        """
+        Sends the request on a pooled connection of the running event loop. A pooled connection
+        the provider has since closed is replaced with a new connection & an idempotent request
+        is sent once more. Other requests are sent on a new connection, so they are never resent.
+        :param method: The http verb
+        :param url: The absolute url
+        :param headers: The request headers
+        :param body: Optional. The request body
+        :return: Response
+        :raises ValueError: If the url or a header contains a character that could end its line
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        default_port = 443 if scheme == "https" else 80
+        if get_proxy(self.proxies, scheme, parts.hostname) is not None:
+            return await self._request_through_proxy(method, url, headers, body)
+        key = (scheme, parts.hostname, parts.port or default_port)
+        host = parts.hostname
+        if parts.port and parts.port != default_port:
+            host = f"{parts.hostname}:{parts.port}"
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        head = self._request_head(method, host, path, headers, body)
+        pools = await self._loop_pools()
+        conn = self._acquire(pools, key) if method in IDEMPOTENT_METHODS else None
+        try:
+            if conn is not None:
+                try:
+                    response, will_close = await asyncio.wait_for(
+                        self._send(conn, head, method, body),
+                        self.read_timeout,
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The provider closed the idle keep alive connection
+                    conn[1].close()
+                    conn = None
+            if conn is None:
+                conn = await self._connect(key)
+                response, will_close = await asyncio.wait_for(
+                    self._send(conn, head, method, body),
+                    self.read_timeout,
+                )
+        except BaseException:
+            if conn is not None:
+                conn[1].close()
+            raise
+        if will_close:
+            conn[1].close()
+        else:
+            self._release(pools, key, conn)
+        return response
+
+    async def _request_through_proxy(self, method: str, url: str, headers: Dict[str, str],
+                                     body: Optional[bytes]) -> Response:
+        """
+        Sends the request with the sync pool, which tunnels https through the proxy
+        """
+        if self._proxy_pool is None:
+            self._proxy_pool = ConnectionPool(
+                self.maxsize, self.connect_timeout, self.read_timeout, self.proxies
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._proxy_pool.request, method, url, headers, body
+        )
+
+    async def aclose(self) -> None:
+        """
+        Closes the idle connections of the running event loop. This is called when the loop
+        is shut down by `asyncio.run` or by Flask's async views, call it directly if you close
+        the loop without `loop.shutdown_asyncgens()`.
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._pools.pop(loop, None)
+        if entry is not None:
+            await entry[1].aclose()
+
+
+class AsyncHttpRequests(BaseHttpRequests):
+    """
+    The asyncio counterpart of :class:`~flask_jwt_router.oauth2.http_requests.HttpRequests`.
+    Each call takes the absolute url, e.g. from ``HttpRequests.get_url``.
+    :param pool_size: The maximum number of idle keep alive connections kept for each host.
+        Default is *10*
+    :param connect_timeout: Seconds to wait for a connection to open. Default is *5*
+    :param read_timeout: Seconds to wait for the provider to respond. Default is *10*
+    """
+
+    #: The keep alive connections. See
+    #: :class:`~flask_jwt_router.oauth2.async_http_requests.AsyncConnectionPool`
+    pool: AsyncConnectionPool
+
+    def __init__(self, *, pool_size: int = 10, connect_timeout: float = 5,
+                 read_timeout: float = 10):
+        self.pool = AsyncConnectionPool(pool_size, connect_timeout, read_timeout)
+
+    async def _send(self, url: str, verb: str, headers: Dict[str, str],
+                    data=None) -> Optional[Response]:
+        """
+        :return: The response or None if the provider rejected the request
+        :raises ProviderUnavailableError: If the provider could not be reached, timed out
+            or responded with a 5xx or 429 status
+        """
+        try:
+            response = await self.pool.request(verb, url, headers, data)
+        except (OSError, HTTPException, asyncio.TimeoutError, asyncio.IncompleteReadError) as err:
+            # OSError includes connection errors, HTTPException a malformed or oversized response
+            self.logger.debug(err, exc_info=True)
+            raise ProviderUnavailableError(url, err) from err
+        return self._check_status(url, verb, response)
+
+    async def _request(self, url: str, verb: str, headers: Dict[str, str],
+                       data=None) -> Optional[Dict]:
+        return self._decode(url, await self._send(url, verb, headers, data))
+
+    async def get_json(self, url: str) -> Tuple[Optional[Dict], Optional[HTTPMessage]]:
+        """
+        :param url: The absolute url
+        :return: A tuple of the decoded response body & the response headers, or (None, None)
+        """
+        try:
+            response = await self._send(url, "GET", {"Accept": "application/json"})
+        except ProviderUnavailableError as err:
+            self.logger.debug(err, exc_info=True)
+            return None, None
+        return self._decode_json(response)
+
+    async def token(self, url: str, verb: str = "POST", data=None) -> Optional[Dict]:
+        try:
+            return await self._request(url, verb, self._get_headers(), data)
+        except ProviderUnavailableError as err:
+            self.logger.debug(err, exc_info=True)
+            return None
+
+    async def get_by_scope(self, url: str, token, *, verb="GET", data=None) -> Optional[Dict]:
+        """
+        :return: The response body or None if the provider rejected the token
+        :raises ProviderUnavailableError: If the provider is unavailable
+        """
+        return await self._request(url, verb, self._get_headers(token), data)
@@ -126,20 +126,101 @@
         my_entity = User(email="user@gmail.com") # If you're testing against a real db, make sure this is an entry in the db
         _ = jwt_routes.google.create_test_headers(email="user@gmail.com", scope="application", entity=my_entity)
 
+    Caching Userinfo
+    ++++++++++++++++
+
+    Each request with an *X-Auth-Token* header calls Google's userinfo api to authorize the
+    access token. Set *cache_ttl* to cache the userinfo response for each access token, so repeat
+    requests with the same token are authorized without calling Google. The time to live is capped
+    by *expires_in*. Rejected tokens are cached for *negative_cache_ttl* seconds (Default is 10)
+    so a client retrying a bad token does not call Google on every request. For example::
+
+        oauth_options = {
+            ...
+            "cache_ttl": 300, # Default is 0, which disables the cache
+            "cache_size": 1024, # Default is 1024 access tokens
+            "negative_cache_ttl": 10,
+        }
+
+    A revoked access token is still authorized until its cache entry expires, so keep *cache_ttl*
+    shorter than the time you can allow a revoked token to be used for. Check the cache's *hits* &
+    *misses* counters with ``jwt_routes.get_strategy("Google").userinfo_cache``.
+
+    Concurrent requests with the same access token (e.g. a page that makes 20 api calls at once)
+    share a single userinfo call, whether or not the cache is set.
+
+    Provider Outages
+    ++++++++++++++++
+
+    If Google can not be reached, times out or responds with a 5xx status then the request fails
+    with a 503 rather than a 401, so clients can retry without signing the user out. After
+    *circuit_failures* consecutive failures the circuit breaker opens & requests fail fast with
+    a 503 for *circuit_reset_timeout* seconds, before a single trial call checks whether Google
+    is back.
+
+    Set *stale_ttl* (with *cache_ttl*) to keep serving a cached userinfo response for up to
+    *stale_ttl* seconds after it expires, while it is refreshed in the background. If the refresh
+    fails because Google is unavailable the cached response is served until the grace period
+    ends. The grace period is capped by *expires_in*. For example::
+
+        oauth_options = {
+            ...
+            "cache_ttl": 300,
+            "stale_ttl": 600, # Default is 0, which disables serving stale responses
+            "connect_timeout": 2, # Optional. Overrides JWT_ROUTER_OAUTH_CONNECT_TIMEOUT for Google
+            "read_timeout": 3, # Optional. Overrides JWT_ROUTER_OAUTH_READ_TIMEOUT for Google
+            "circuit_failures": 5, # Default is 5, 0 disables the circuit breaker
+            "circuit_reset_timeout": 30, # Default is 30 seconds
+        }
+
+    Google ID Tokens
+    ++++++++++++++++
+
+    If your client sends Google ID tokens (JWTs) rather than access tokens in the *X-Auth-Token*
+    header, set *id_token* to verify each token locally against Google's signing certs instead of
+    calling the userinfo api. The token's audience must be your *client_id*. The certs are cached
+    until their *Cache-Control* max-age has passed & are fetched again if a token is signed with
+    an unknown key. For example::
+
+        oauth_options = {
+            ...
+            "id_token": True,
+            # Optional. A url or a local JWKS file
+            "jwks_uri": "https://www.googleapis.com/oauth2/v3/certs",
+        }
+
+    The verified claims (including *email*) are returned from ``authorize``. Tokens without an
+    *email_verified* claim of true are rejected, as the entity is looked up by the email.
+
 """
-from typing import Dict
+import hashlib
+import logging
+from threading import Lock, Thread
+from types import MappingProxyType
+from typing import Dict, Optional, Set
+
+import jwt
 
 from .http_requests import HttpRequests
 from ._base import BaseOAuth, _FlaskRequestType
-from ._exceptions import RequestAttributeError, ClientExchangeCodeError
+from ._urls import GOOGLE_OAUTH_URL
+from ._exceptions import RequestAttributeError, ClientExchangeCodeError, ProviderUnavailableError
+from ._circuit_breaker import CircuitBreaker
+from ._jwks import JWKSCache
+from .._cache import TTLCache
+from .._singleflight import AsyncSingleFlight, SingleFlight
 
 
 class Google(BaseOAuth):
     # test_metadata: Dict[str, Dict[str, str]] = {} TODO remove
 
+    logger = logging.getLogger()
+
     #: The X header name used for the Google Auth2.0 Strategy (subsequent strategies should be "X-<STRATEGY_NAME>-Token"
     header_name = "X-Auth-Token"
 
+    urls = GOOGLE_OAUTH_URL
+
     #: As defined in https://tools.ietf.org/html/rfc6749#section-4.1.3
     #: Value MUST be set to "authorization_code".
     grant_type = "authorization_code"
@@ -167,6 +248,43 @@ class Google(BaseOAuth):
     #: Value of the email field column in the
     email_field: str
 
+    #: OPTIONAL. Default is 0, which disables the cache. The time to live in seconds of a cached
+    #: userinfo response, capped by *expires_in*
+    cache_ttl: int = 0
+
+    #: OPTIONAL. Default is 1024. The maximum number of cached access tokens
+    cache_size: int = 1024
+
+    #: OPTIONAL. Default is 10. The time to live in seconds of a rejected access token
+    negative_cache_ttl: int = 10
+
+    #: OPTIONAL. Default is 0. Seconds an expired userinfo response is served for while it is
+    #: refreshed
+    stale_ttl: int = 0
+
+    #: Tuples of the time the response expires & the userinfo response, keyed by a digest
+    #: of the access token. None if *cache_ttl* is 0
+    userinfo_cache: Optional[TTLCache] = None
+
+    #: Fails userinfo calls fast while Google is unavailable
+    circuit_breaker: CircuitBreaker
+
+    #: OPTIONAL. Default is False. Verify Google ID tokens locally instead of calling the userinfo
+    #: api
+    id_token: bool = False
+
+    #: The *iss* claim of Google ID tokens
+    id_token_issuers = ("accounts.google.com", "https://accounts.google.com")
+
+    #: Google's signing certs. None unless *id_token* is set
+    jwks: Optional[JWKSCache] = None
+
+    #: Concurrent userinfo calls for the same access token share one call to Google
+    in_flight: SingleFlight
+
+    #: Concurrent ``authorize_async`` calls for the same access token share one call to Google
+    async_in_flight: AsyncSingleFlight
+
     _url: str = None
 
     _code: str = None
@@ -179,6 +297,11 @@ class Google(BaseOAuth):
 
     def __init__(self, http):
         self.http = http
+        self.in_flight = SingleFlight()
+        self.async_in_flight = AsyncSingleFlight()
+        self.circuit_breaker = CircuitBreaker()
+        self._lock = Lock()
+        self._revalidating: Set[bytes] = set()
 
     @property
     def code(self):
@@ -188,13 +311,32 @@ class Google(BaseOAuth):
     def code(self, val):
         self._code = val
 
-    def init(self, *, client_id, client_secret, redirect_uri, expires_in, email_field, tablename) -> None:
+    def init(self, *, client_id, client_secret, redirect_uri, expires_in, email_field, tablename,
+             cache_ttl=0, cache_size=1024, negative_cache_ttl=10, id_token=False, jwks_uri=None,
+             stale_ttl=0, connect_timeout=None, read_timeout=None, circuit_failures=5,
+             circuit_reset_timeout=30) -> None:
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.expires_in = expires_in or self._set_expires()
         self.email_field = email_field
         self.tablename = tablename
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.negative_cache_ttl = negative_cache_ttl
+        self.userinfo_cache = None
+        if cache_ttl and cache_size:
+            self.userinfo_cache = TTLCache(cache_size, min(cache_ttl, self.expires_in))
+        self.id_token = id_token
+        self.jwks = None
+        if id_token:
+            self.jwks = JWKSCache(self.http, jwks_uri or self.http.get_url("certs"))
+        self.stale_ttl = stale_ttl
+        self.circuit_breaker = CircuitBreaker(circuit_failures, circuit_reset_timeout)
+        if connect_timeout is not None:
+            self.http.pool.connect_timeout = connect_timeout
+        if read_timeout is not None:
+            self.http.pool.read_timeout = read_timeout
 
     def update_base_path(self, path: str, redirect_uri: str) -> None:
         # TODO rename this method
@@ -252,15 +394,149 @@ class Google(BaseOAuth):
 
     def authorize(self, token: str) -> Dict:
         """
-        Call to a Google API to authenticate via access_token
+        Call to a Google API to authenticate via access_token. Concurrent calls with the
+        same access token share one userinfo call. If *cache_ttl* is set then the response
+        is cached for the access token.
+        :param token: The Google OAuth 2.0 access token or ID token if *id_token* is set
+        :return: The userinfo response or None if Google rejected the access token
+        :raises ProviderUnavailableError: If Google is unavailable & there is no cached response
         """
-        url = self.http.get_url("user_info.email")
-        data = self.http.get_by_scope(url, token)
+        if self.jwks is not None:
+            return self._verify_id_token(token)
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        userinfo_cache = self.userinfo_cache
+        if userinfo_cache is None:
+            return self.in_flight.do(key, self._get_user_info, token)
+        entry = userinfo_cache.get(key)
+        if entry is None:
+            return self.in_flight.do(key, self._cache_user_info, key, token)
+        expires_at, data = entry
+        if data is not None and userinfo_cache.timer() >= expires_at:
+            # Only kept past expires_at if stale_ttl is set
+            self._revalidate(key, token)
         return data
 
+    async def authorize_async(self, token: str) -> Dict:
+        """
+        The asyncio variant of ``authorize``. The userinfo api is called on the running
+        event loop & shares the userinfo cache with ``authorize``.
+        :param token: The Google OAuth 2.0 access token or ID token if *id_token* is set
+        :return: The userinfo response or None if Google rejected the access token
+        :raises ProviderUnavailableError: If Google is unavailable & there is no cached response
+        """
+        if self.jwks is not None:
+            # Verified locally, the certs are only fetched when they expire or rotate
+            return await super(Google, self).authorize_async(token)
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        userinfo_cache = self.userinfo_cache
+        if userinfo_cache is None:
+            return await self.async_in_flight.do(key, self._get_user_info_async, token)
+        entry = userinfo_cache.get(key)
+        if entry is None:
+            return await self.async_in_flight.do(key, self._cache_user_info_async, key, token)
+        expires_at, data = entry
+        if data is not None and userinfo_cache.timer() >= expires_at:
+            self._revalidate(key, token)
+        return data
+
+    def _cache_user_info(self, key: bytes, token: str) -> Optional[Dict]:
+        """
+        :param key: The digest of the access token
+        :param token: The Google OAuth 2.0 access token
+        :return: The userinfo response or None
+        """
+        now = self.userinfo_cache.timer()
+        return self._store_user_info(key, now, self._get_user_info(token))
+
+    async def _cache_user_info_async(self, key: bytes, token: str) -> Optional[Dict]:
+        now = self.userinfo_cache.timer()
+        return self._store_user_info(key, now, await self._get_user_info_async(token))
+
+    def _store_user_info(self, key: bytes, now: float, data: Optional[Dict]) -> Optional[Dict]:
+        """
+        :param key: The digest of the access token
+        :param now: The time the userinfo api was called
+        :param data: The userinfo response or None
+        :return: The cached userinfo response or None
+        """
+        userinfo_cache = self.userinfo_cache
+        if data and "email" in data:
+            data = MappingProxyType(data)
+            ttl = userinfo_cache.ttl
+            lifetime = max(ttl, min(ttl + self.stale_ttl, self.expires_in))
+            userinfo_cache.set(key, (now + ttl, data), lifetime)
+        elif self.negative_cache_ttl > 0:
+            ttl = min(self.negative_cache_ttl, userinfo_cache.ttl)
+            userinfo_cache.set(key, (now + ttl, None), ttl)
+        return data
+
+    def _revalidate(self, key: bytes, token: str) -> None:
+        """
+        Refreshes an expired userinfo response in a background thread
+        :param key: The digest of the access token
+        :param token: The Google OAuth 2.0 access token
+        :return: None
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def refresh():
+            try:
+                self.in_flight.do(key, self._cache_user_info, key, token)
+            except ProviderUnavailableError as err:
+                # Keep serving the expired response until stale_ttl has passed
+                self.logger.debug(err, exc_info=True)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        Thread(target=refresh, daemon=True).start()
+
+    def _verify_id_token(self, token: str) -> Optional[Dict]:
+        """
+        Verifies a Google ID token with Google's cached signing certs
+        :param token: The Google ID token
+        :return: The token's claims or None if the token is invalid
+        """
+        try:
+            key = self.jwks.get_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[self.jwks.algorithm],
+                audience=self.client_id,
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except jwt.InvalidTokenError:
+            return None
+        if claims["iss"] not in self.id_token_issuers:
+            return None
+        if claims.get("email_verified") is not True:
+            # Anyone can sign in to Google with an unverified email they don't own
+            return None
+        return claims
+
+    def _get_user_info(self, token: str) -> Optional[Dict]:
+        """
+        :param token: The Google OAuth 2.0 access token
+        :return: The userinfo response or None
+        """
+        url = self.http.get_url("user_info.email")
+        return self.circuit_breaker.call(self.http.get_by_scope, url, token)
+
+    async def _get_user_info_async(self, token: str) -> Optional[Dict]:
+        url = self.http.get_url("user_info.email")
+        return await self.circuit_breaker.call_async(
+            self.http.async_requests.get_by_scope, url, token
+        )
+
     def _set_expires(self):
         """
         The default expire is set to 7 days
-        :return: None
+        :return: int
         """
-        self.expires_in = 3600 * 24 * 7
+        return 3600 * 24 * 7
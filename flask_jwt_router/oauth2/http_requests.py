@@ -1,70 +1,92 @@
-import urllib.request
-from urllib.error import HTTPError, URLError, ContentTooShortError
-from typing import Dict, Tuple
-import logging
-import json
+from http.client import HTTPException, HTTPMessage
+from typing import Dict, Optional, Tuple
 
+from ._exceptions import ProviderUnavailableError
+from ._http import IDEMPOTENT_METHODS, BaseHttpRequests, ConnectionPool, Response, get_proxy
 
-class HttpRequests:
+__all__ = ["IDEMPOTENT_METHODS", "ConnectionPool", "HttpRequests", "Response", "get_proxy"]
 
-    logger = logging.getLogger()
+
+class HttpRequests(BaseHttpRequests):
+    """
+    :param urls: The OAuth provider's urls keyed by name
+    :param pool_size: The maximum number of idle keep alive connections kept for each host.
+        Default is *10*
+    :param connect_timeout: Seconds to wait for a connection to open. Default is *5*
+    :param read_timeout: Seconds to wait for the provider to respond. Default is *10*
+    """
 
     urls: Dict
 
-    headers: Dict[str, str]
+    #: The keep alive connections. See
+    #: :class:`~flask_jwt_router.oauth2.http_requests.ConnectionPool`
+    pool: ConnectionPool
+
+    _async_requests = None
 
-    def __init__(self, urls):
+    def __init__(self, urls, *, pool_size: int = 10, connect_timeout: float = 5,
+                 read_timeout: float = 10):
         self.urls = urls
+        self.pool = ConnectionPool(pool_size, connect_timeout, read_timeout)
+
+    @property
+    def async_requests(self):
+        """
+        The asyncio client, created with this client's pool size & timeouts when it is first used.
+        See :class:`~flask_jwt_router.oauth2.async_http_requests.AsyncHttpRequests`
+        """
+        if self._async_requests is None:
+            # pylint:disable=import-outside-toplevel
+            from .async_http_requests import AsyncHttpRequests
+            self._async_requests = AsyncHttpRequests(
+                pool_size=self.pool.maxsize,
+                connect_timeout=self.pool.connect_timeout,
+                read_timeout=self.pool.read_timeout,
+            )
+        return self._async_requests
 
     def get_url(self, name: str) -> str:
         return self.urls[name]
 
-    def _get_headers(self, token: str = None) -> Dict[str, str]:
-        t = {"Authorization": f"Bearer {token}"} if token else {}
-        return {
-            **t,
-            "Content-type": "application/x-www-form-urlencoded",
-        }
-
-    def token(self, url: str, verb: str = "POST", data=None) -> Dict:
+    def _send(self, url: str, verb: str, headers: Dict[str, str], data=None) -> Optional[Response]:
+        """
+        :return: The response or None if the provider rejected the request
+        :raises ProviderUnavailableError: If the provider could not be reached, timed out
+            or responded with a 5xx or 429 status
+        """
         try:
-            req = urllib.request.Request(
-                url=url,
-                data=data,
-                method=verb,
-                headers=self._get_headers(),
-            )
-            with urllib.request.urlopen(req) as response:
-                data = response.read().decode("utf-8")
-            assert 200 == response.status
-            self.logger.debug(f"Successfully authenticated from {url}")
-            return json.loads(data)
-        except HTTPError as err:
-            self.logger.debug(err, exc_info=True)
-        except ContentTooShortError as err:
-            self.logger.debug(err, exc_info=True)
-        except URLError as err:
+            response = self.pool.request(verb, url, headers, data)
+        except (OSError, HTTPException) as err:
+            # OSError includes connection errors & timeouts
             self.logger.debug(err, exc_info=True)
-        # except AssertionError as err: TODO - move this to _routing.py
-        #     self.logger.debug(err, exc_info=True)
+            raise ProviderUnavailableError(url, err) from err
+        return self._check_status(url, verb, response)
 
-    def get_by_scope(self, url: str, token, *, verb="GET", data=None) -> Dict:
+    def _request(self, url: str, verb: str, headers: Dict[str, str], data=None) -> Optional[Dict]:
+        return self._decode(url, self._send(url, verb, headers, data))
+
+    def get_json(self, url: str) -> Tuple[Optional[Dict], Optional[HTTPMessage]]:
+        """
+        :param url: The absolute url
+        :return: A tuple of the decoded response body & the response headers, or (None, None)
+        """
         try:
-            self.headers = self._get_headers(token)
-            req = urllib.request.Request(
-                url=url,
-                data=data,
-                method=verb,
-                headers=self.headers,
-            )
-            with urllib.request.urlopen(req) as response:
-                data = response.read().decode("utf-8")
-            assert 200 == response.status
-            self.logger.debug(f"Successfully authenticated from {url}")
-            return json.loads(data)
-        except HTTPError as err:
+            response = self._send(url, "GET", {"Accept": "application/json"})
+        except ProviderUnavailableError as err:
             self.logger.debug(err, exc_info=True)
-        except ContentTooShortError as err:
-            self.logger.debug(err, exc_info=True)
-        except URLError as err:
+            return None, None
+        return self._decode_json(response)
+
+    def token(self, url: str, verb: str = "POST", data=None) -> Dict:
+        try:
+            return self._request(url, verb, self._get_headers(), data)
+        except ProviderUnavailableError as err:
             self.logger.debug(err, exc_info=True)
+            return None
+
+    def get_by_scope(self, url: str, token, *, verb="GET", data=None) -> Dict:
+        """
+        :return: The response body or None if the provider rejected the token
+        :raises ProviderUnavailableError: If the provider is unavailable
+        """
+        return self._request(url, verb, self._get_headers(token), data)
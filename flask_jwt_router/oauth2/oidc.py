@@ -0,0 +1,341 @@
+"""
+    OpenID Connect Quick Start
+    ==========================
+
+    Authorize requests with tokens from any OpenID Connect (OIDC) provider, e.g. your
+    own identity provider, Keycloak or Auth0. The provider's endpoints are read once from its
+    discovery document (``<issuer>/.well-known/openid-configuration``) when the first token is
+    authorized.
+
+    Basic Usage::
+
+        from flask_jwt_router import JwtRoutes, OIDC
+
+        oidc_options = {
+            "issuer": "https://idp.example.com",
+            "client_id": "<CLIENT_ID>",
+            "client_secret": "<CLIENT_SECRET>", # Optional. Only used by oauth_login
+            "redirect_uri": "http://localhost:3000", # Optional. Only used by oauth_login
+            "tablename": "users",
+            "email_field": "email",
+        }
+
+        jwt_routes.init_app(app, strategies=[OIDC], strategy_options={"OIDC": oidc_options})
+
+    Each request must send the ID token or access token in the *X-OIDC-Token* header::
+
+        {
+            "X-OIDC-Token" : "Bearer <YOUR_OIDC_TOKEN>"
+        }
+
+    Tokens that are JWTs are verified locally against the provider's JWKS, which is cached until
+    its *Cache-Control* max-age has passed & fetched again if a token is signed with an unknown key.
+    The token must be issued by *issuer* & its audience must be *client_id* or *audience*. Opaque
+    access tokens, & JWT access tokens without an email claim, are sent to the provider's userinfo
+    endpoint. The entity is looked up by the email, so claims or userinfo responses without an
+    *email_verified* of true are rejected, unless *require_email_verified* is False. An
+    *email_verified* of false is always rejected.
+
+    Options
+    +++++++
+
+    - *issuer*: The provider's issuer url, the *iss* claim of its tokens
+    - *client_id*: Your client's ID, the audience of ID tokens
+    - *tablename*: Value of SQLAlchemy's __tablename__ attribute
+    - *email_field*: The entity's column matched against the email claim
+    - *audience*: Optional. The audience of access tokens, e.g. your api's identifier
+    - *discovery_url*: Optional. Default is ``<issuer>/.well-known/openid-configuration``
+    - *email_claim*: Optional. Default is *email*
+    - *require_email_verified*: Optional. Reject emails without an *email_verified* claim.
+      Default is *True*
+    - *algorithm*: Optional. Default is *RS256*
+    - *leeway*: Optional. Seconds of clock skew allowed when checking *exp*. Default is *0*
+    - *min_jwks_refresh_interval*: Optional. The minimum seconds between JWKS fetches.
+      Default is *60*
+    - *client_secret*, *redirect_uri*: Optional. Used by ``oauth_login`` to exchange a code
+      for tokens
+    - *circuit_failures*, *circuit_reset_timeout*: Optional. See the Google strategy's
+      *Provider Outages*
+
+    Login
+    +++++
+
+    Exchange the client's authorization code for tokens at the provider's token endpoint::
+
+        @app.route("/login", methods=["POST"])
+        def login():
+            return jwt_routes.get_strategy("OIDC").oauth_login(request)
+
+"""
+import hashlib
+from threading import Lock
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import jwt
+
+from .http_requests import HttpRequests
+from ._base import BaseOAuth, _FlaskRequestType
+from ._circuit_breaker import CircuitBreaker
+from ._exceptions import (
+    ClientExchangeCodeError,
+    ProviderUnavailableError,
+    RequestAttributeError,
+    StrategyOptionsError,
+)
+from ._jwks import JWKSCache
+from .._singleflight import AsyncSingleFlight, SingleFlight
+
+
+class DiscoveryError(Exception):
+    message = "The OpenID Connect discovery document is invalid. " \
+              "See https://openid.net/specs/openid-connect-discovery-1_0.html"
+
+    def __init__(self, err=""):
+        super(DiscoveryError, self).__init__(f"{err}\n{self.message}")
+
+
+class OIDC(BaseOAuth):
+    """
+    A generic OpenID Connect strategy. See :class:`~flask_jwt_router.oauth2.oidc`
+    """
+    #: The header that carries the OIDC ID token or access token
+    header_name = "X-OIDC-Token"
+
+    #: Filled from the discovery document
+    urls: Dict[str, str] = {}
+
+    #: The provider's issuer url
+    issuer: str
+
+    #: Your client's ID, the audience of ID tokens
+    client_id: str
+
+    #: Optional. Only used by oauth_login
+    client_secret: Optional[str] = None
+
+    #: Optional. Only used by oauth_login
+    redirect_uri: Optional[str] = None
+
+    #: Optional. The audience of access tokens
+    audience: Optional[str] = None
+
+    #: The url of the provider's discovery document
+    discovery_url: str
+
+    #: The claim holding the user's email
+    email_claim: str = "email"
+
+    #: Reject emails without an *email_verified* claim of true
+    require_email_verified: bool = True
+
+    #: The algorithm of the provider's signing keys
+    algorithm: str = "RS256"
+
+    #: The minimum seconds between JWKS fetches
+    min_jwks_refresh_interval: float = 60
+
+    #: Optional. Accepted for the :class:`~flask_jwt_router.oauth2._base.BaseOAuth` interface
+    expires_in: Optional[int] = None
+
+    #: Seconds of clock skew allowed when checking *exp*
+    leeway: float = 0
+
+    #: The discovery document. None until the first token is authorized
+    discovery: Optional[Dict[str, Any]] = None
+
+    #: The provider's verification keys. None until the discovery document is read
+    jwks: Optional[JWKSCache] = None
+
+    http: HttpRequests
+
+    def __init__(self, http):
+        self.http = http
+        self.in_flight = SingleFlight()
+        self.async_in_flight = AsyncSingleFlight()
+        self.circuit_breaker = CircuitBreaker()
+        self._lock = Lock()
+
+    def init(self, *, client_id, client_secret=None, redirect_uri=None, expires_in=None,
+             email_field, tablename, issuer=None, audience=None, discovery_url=None,
+             email_claim="email", require_email_verified=True, algorithm="RS256", leeway=0,
+             min_jwks_refresh_interval=60, circuit_failures=5, circuit_reset_timeout=30) -> None:
+        """
+        Takes the options of :class:`~flask_jwt_router.oauth2._base.BaseOAuth` & the OIDC options.
+        See :class:`~flask_jwt_router.oauth2.oidc`
+        :raises StrategyOptionsError: If there is no *issuer*
+        """
+        if not issuer:
+            raise StrategyOptionsError("The OIDC strategy needs an issuer")
+        self.issuer = issuer
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.redirect_uri = redirect_uri
+        self.expires_in = expires_in
+        self.tablename = tablename
+        self.email_field = email_field
+        self.audience = audience
+        self.discovery_url = (
+            discovery_url or f"{issuer.rstrip('/')}/.well-known/openid-configuration"
+        )
+        self.email_claim = email_claim
+        self.require_email_verified = require_email_verified
+        self.algorithm = algorithm
+        self.leeway = leeway
+        self.min_jwks_refresh_interval = min_jwks_refresh_interval
+        self.circuit_breaker = CircuitBreaker(circuit_failures, circuit_reset_timeout)
+        self.discovery = None
+        self.jwks = None
+
+    def _fetch_discovery(self) -> Dict[str, Any]:
+        document, _ = self.http.get_json(self.discovery_url)
+        if document is None:
+            raise ProviderUnavailableError(self.discovery_url)
+        # The issuer must be identical, including any trailing slash
+        if document.get("issuer") != self.issuer:
+            raise DiscoveryError(
+                f"The issuer {document.get('issuer')} does not match {self.issuer}"
+            )
+        if not document.get("jwks_uri"):
+            raise DiscoveryError("The discovery document has no jwks_uri")
+        return document
+
+    def _discover(self) -> Dict[str, Any]:
+        """
+        Reads the discovery document once
+        :return: The discovery document
+        """
+        discovery = self.discovery
+        if discovery is not None:
+            return discovery
+        with self._lock:
+            if self.discovery is None:
+                document = self.circuit_breaker.call(self._fetch_discovery)
+                self.http.urls = {
+                    **self.http.urls,
+                    "token": document.get("token_endpoint"),
+                    "user_info.email": document.get("userinfo_endpoint"),
+                    "certs": document["jwks_uri"],
+                }
+                self.jwks = JWKSCache(
+                    self.http,
+                    document["jwks_uri"],
+                    algorithm=self.algorithm,
+                    min_refresh_interval=self.min_jwks_refresh_interval,
+                )
+                self.discovery = document
+        return self.discovery
+
+    def oauth_login(self, request: _FlaskRequestType, **kwargs) -> Dict:
+        """
+        Exchanges the client's authorization code for tokens
+        :param request: Flask request object
+        :key redirect_uri: Optional. Overrides the *redirect_uri* option
+        :return: The provider's token response, e.g. `{"access_token": ..., "id_token": ...}`
+        """
+        if not request:
+            raise RequestAttributeError()
+        code = (request.get_json() or {}).get("code")
+        if not code:
+            raise ClientExchangeCodeError(request.base_url)
+        self._discover()
+        data = urlencode({
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": kwargs.get("redirect_uri") or self.redirect_uri,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        }).encode("utf-8")
+        return self.http.token(self.http.get_url("token"), data=data)
+
+    def authorize(self, token: str) -> Optional[Dict]:
+        """
+        Verifies JWTs locally & sends other tokens to the userinfo endpoint
+        :param token: An ID token or access token
+        :return: The token's claims or userinfo response with an *email* key, or None if the token
+            is invalid
+        :raises ProviderUnavailableError: If the provider is needed & unavailable
+        """
+        self._discover()
+        if token.count(".") != 2:
+            return self._get_user_info(token)
+        claims = self._verify(token)
+        if claims is None:
+            return None
+        if self.email_claim in claims:
+            return self._with_email(claims)
+        # An access token without an email claim
+        return self._get_user_info(token)
+
+    async def authorize_async(self, token: str) -> Optional[Dict]:
+        """
+        The asyncio variant of ``authorize``. Opaque access tokens are sent to the userinfo
+        endpoint on the running event loop.
+        :param token: An ID token or access token
+        :return: The token's claims or userinfo response with an *email* key, or None if the token
+            is invalid
+        :raises ProviderUnavailableError: If the provider is needed & unavailable
+        """
+        if self.discovery is None or token.count(".") == 2:
+            # The discovery document is read once & JWTs are verified locally
+            return await super(OIDC, self).authorize_async(token)
+        url = self.http.urls.get("user_info.email")
+        if not url:
+            return None
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        data = await self.async_in_flight.do(
+            key,
+            self.circuit_breaker.call_async,
+            self.http.async_requests.get_by_scope,
+            url,
+            token,
+        )
+        return self._with_email(data)
+
+    def _verify(self, token: str) -> Optional[Dict]:
+        """
+        :param token: A JWT signed by the provider
+        :return: The verified claims or None
+        """
+        try:
+            key = self.jwks.get_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[self.algorithm],
+                audience=[aud for aud in (self.client_id, self.audience) if aud],
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except jwt.InvalidTokenError:
+            return None
+
+    def _get_user_info(self, token: str) -> Optional[Dict]:
+        """
+        :param token: An access token
+        :return: The userinfo response with an *email* key or None
+        """
+        url = self.http.urls.get("user_info.email")
+        if not url:
+            return None
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        data = self.in_flight.do(key, self.circuit_breaker.call, self.http.get_by_scope, url, token)
+        return self._with_email(data)
+
+    def _with_email(self, data: Optional[Dict]) -> Optional[Dict]:
+        """
+        :param data: The verified claims or userinfo response
+        :return: The claims with an *email* key, or None if there is no email or it is not verified
+        """
+        if not data or self.email_claim not in data:
+            return None
+        # Some providers send the claim as a string
+        email_verified = data.get("email_verified")
+        if email_verified in (False, "false"):
+            return None
+        if self.require_email_verified and email_verified not in (True, "true"):
+            return None
+        return {**data, "email": data[self.email_claim]}
@@ -10,7 +10,6 @@ setup(
     packages=["flask_jwt_router", "flask_jwt_router.oauth2"],
     classifiers=[
         'Development Status :: 3 - Alpha',
-        'Programming Language :: Python :: 3.6',
         "Programming Language :: Python :: 3.7",
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -18,6 +17,7 @@ setup(
         "Operating System :: OS Independent",
     ],
     py_modules=["flask_jwt_router"],
+    python_requires=">=3.7",
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/joegasewicz/Flask-JWT-Router",
@@ -26,5 +26,9 @@ setup(
     install_requires=[
         "PyJWT",
         "python-dateutil>=2.8.0"
-    ]
+    ],
+    extras_require={
+        "crypto": ["PyJWT[crypto]"],
+        "async": ["flask[async]"],
+    },
 )
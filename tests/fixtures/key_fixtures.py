@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from jwt.algorithms import get_default_algorithms
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, ed25519
+
+
+def generate_private_key(algorithm):
+    if algorithm.startswith("RS") or algorithm.startswith("PS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(algorithm)
+
+
+def write_pem_keys(tmp_path, algorithm, name="key"):
+    private_key = generate_private_key(algorithm)
+    private_file = tmp_path / f"{name}.pem"
+    public_file = tmp_path / f"{name}.pub.pem"
+    private_file.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    public_file.write_bytes(private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ))
+    return str(private_file), str(public_file)
+
+
+def to_jwk(algorithm, key, kid=None):
+    jwk = json.loads(get_default_algorithms()[algorithm].to_jwk(key))
+    if kid:
+        jwk["kid"] = kid
+    return jwk
+
+
+def write_jwks(tmp_path, jwks, name="jwks.json"):
+    jwks_file = tmp_path / name
+    jwks_file.write_text(json.dumps({"keys": jwks}))
+    return str(jwks_file)
+
+
+@pytest.fixture
+def pem_keys(tmp_path):
+    def inner(algorithm="RS256", name="key"):
+        return write_pem_keys(tmp_path, algorithm, name)
+    return inner
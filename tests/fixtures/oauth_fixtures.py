@@ -2,6 +2,7 @@ import pytest
 
 from tests.fixtures.main_fixture import db
 from tests.fixtures.models import OAuthUserModel
+from tests.mock_server.mock_server import ServerThread, user_info_calls, certs_calls, oidc_calls
 
 TEST_OAUTH_URL = {
     "local_flask": "http://localhost:5009/ibanez/api/v1/staffs/login",
@@ -17,6 +18,31 @@ def oauth_urls():
     return TEST_OAUTH_URL
 
 
+@pytest.fixture(scope="module")
+def mock_server_thread():
+    server = ServerThread()
+    server.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def mock_server_urls(mock_server_thread):
+    user_info_calls.clear()
+    certs_calls.clear()
+    return {
+        "token": f"{mock_server_thread.base_url}/mock_google_exchange",
+        "user_info.email": f"{mock_server_thread.base_url}/mock_google_user_info",
+        "certs": f"{mock_server_thread.base_url}/mock_google_certs",
+    }
+
+
+@pytest.fixture
+def mock_idp_issuer(mock_server_thread):
+    oidc_calls.clear()
+    return f"{mock_server_thread.base_url}/oidc"
+
+
 @pytest.fixture
 def google_oauth_user():
     oauth_user = OAuthUserModel(email="test_one@oauth.com")
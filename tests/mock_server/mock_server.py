@@ -2,7 +2,9 @@
 A testing server that runs in a thread for testing http requests
 """
 from flask import Flask, request
+from werkzeug.serving import make_server, WSGIRequestHandler
 import threading
+import time
 
 app = Flask(__name__)
 
@@ -14,6 +16,38 @@ mock_exchange_response = {
     "refresh_token": "<refresh_token>"
 }
 
+mock_user_info_response = {
+    "family_name": "Pastorius",
+    "name": "Jaco Pastorius",
+    "picture": "https://lh3.googleusercontent.com/a-/lalalala",
+    "locale": "en",
+    "email": "jaco@gmail.com",
+    "given_name": "Jaco",
+    "id": "1234567890",
+    "verified_email": True
+}
+
+#: Access tokens the mock userinfo endpoint accepts
+VALID_ACCESS_TOKENS = {"<access_token>"}
+
+#: Seconds the mock userinfo endpoint takes to respond, roughly a round trip to Google
+USER_INFO_LATENCY = 0.05
+
+#: Number of requests made to the mock userinfo endpoint
+user_info_calls = []
+
+#: Set to simulate a Google outage, the mock userinfo endpoint responds with a 503
+USER_INFO_UNAVAILABLE = False
+
+#: The JWKS served by the mock certs endpoint
+mock_jwks = {"keys": []}
+
+#: Cache-Control header of the mock certs endpoint, Google's certs are cached for several hours
+CERTS_CACHE_CONTROL = "public, max-age=21600, must-revalidate, no-transform"
+
+#: Number of requests made to the mock certs endpoint
+certs_calls = []
+
 
 def shutdown_server():
     func = request.environ.get('werkzeug.server.shutdown')
@@ -35,4 +69,97 @@ def mock_google_exchange():
     return mock_exchange_response
 
 
+@app.route("/mock_google_user_info", methods=["GET"])
+def mock_google_user_info():
+    user_info_calls.append(request.headers.get("Authorization"))
+    time.sleep(USER_INFO_LATENCY)
+    if USER_INFO_UNAVAILABLE:
+        return {"error": {"code": 503, "status": "UNAVAILABLE"}}, 503
+    token = request.headers.get("Authorization", "").replace("Bearer ", "", 1)
+    if token not in VALID_ACCESS_TOKENS:
+        return {"error": {"code": 401, "status": "UNAUTHENTICATED"}}, 401
+    return mock_user_info_response
+
+
+@app.route("/mock_google_certs", methods=["GET"])
+def mock_google_certs():
+    certs_calls.append(request.path)
+    return mock_jwks, 200, {"Cache-Control": CERTS_CACHE_CONTROL}
+
+
+#: The JWKS served by the mock OIDC identity provider
+mock_oidc_jwks = {"keys": []}
+
+#: Paths requested from the mock OIDC identity provider
+oidc_calls = []
+
+
+@app.route("/oidc/.well-known/openid-configuration", methods=["GET"])
+def mock_oidc_discovery():
+    oidc_calls.append(request.path)
+    issuer = f"{request.host_url}oidc"
+    return {
+        "issuer": issuer,
+        "authorization_endpoint": f"{issuer}/authorize",
+        "token_endpoint": f"{issuer}/token",
+        "userinfo_endpoint": f"{issuer}/userinfo",
+        "jwks_uri": f"{issuer}/jwks",
+        "id_token_signing_alg_values_supported": ["RS256"],
+    }
+
+
+@app.route("/oidc/jwks", methods=["GET"])
+def mock_oidc_jwks_endpoint():
+    oidc_calls.append(request.path)
+    return mock_oidc_jwks, 200, {"Cache-Control": "public, max-age=3600"}
+
+
+@app.route("/oidc/userinfo", methods=["GET"])
+def mock_oidc_userinfo():
+    oidc_calls.append(request.path)
+    if request.headers.get("Authorization") != "Bearer <opaque_access_token>":
+        return {"error": "invalid_token"}, 401
+    return {"sub": "1234567890", "email": "jaco@gmail.com", "email_verified": True}
+
+
+@app.route("/oidc/token", methods=["POST"])
+def mock_oidc_token():
+    oidc_calls.append(request.path)
+    if request.form.get("code") != "<CODE>" or request.form.get("client_secret") != "<CLIENT_SECRET>":
+        return {"error": "invalid_grant"}, 400
+    return {"access_token": "<opaque_access_token>", "id_token": "<id_token>", "token_type": "Bearer"}
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class _KeepAliveRequestHandler(_QuietRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Werkzeug writes the headers & body separately, send them without waiting for an ACK
+    disable_nagle_algorithm = True
+
+
+class ServerThread(threading.Thread):
+    """
+    Runs the mock server on a free port until *shutdown* is called.
+    Connections are kept alive between requests, like Google's servers
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 0, keep_alive: bool = True):
+        super(ServerThread, self).__init__(daemon=True)
+        handler = _KeepAliveRequestHandler if keep_alive else _QuietRequestHandler
+        self.server = make_server(host, port, app, threaded=True, request_handler=handler)
+        self.base_url = f"http://{host}:{self.server.server_port}"
+
+    def run(self):
+        self.server.serve_forever()
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.join()
+
+
 server_thread = threading.Thread(target=app.run, kwargs={"host": "localhost", "port": 5009})
@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from flask_jwt_router.oauth2.async_http_requests import AsyncHttpRequests
+from flask_jwt_router.oauth2.http_requests import HttpRequests
+from flask_jwt_router.oauth2._exceptions import ProviderUnavailableError
+from tests.mock_server import mock_server
+from tests.fixtures.oauth_fixtures import mock_server_thread, mock_server_urls
+
+
+def run(h, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await h.pool.aclose()
+    return asyncio.run(main())
+
+
+class TestAsyncHttpRequests:
+
+    def test_reuses_connection(self, mock_server_urls):
+        h = AsyncHttpRequests()
+
+        async def calls():
+            return [await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>") for _ in range(5)]
+
+        results = run(h, calls())
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        assert h.pool.created == 1
+        assert h.pool.reused == 4
+
+    def test_concurrent_calls(self, mock_server_urls):
+        h = AsyncHttpRequests(pool_size=2)
+
+        async def calls():
+            return await asyncio.gather(*(
+                h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>") for _ in range(8)
+            ))
+
+        results = run(h, calls())
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        # The calls wait for the provider at the same time, each on its own connection
+        assert h.pool.created == 8
+        assert len(mock_server.user_info_calls) == 8
+
+    def test_token(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        result = run(h, h.token(mock_server_urls["token"]))
+        assert result["access_token"] == "<access_token>"
+
+    def test_get_json(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        jwks, headers = run(h, h.get_json(mock_server_urls["certs"]))
+        assert jwks == mock_server.mock_jwks
+        assert headers["Cache-Control"] == mock_server.CERTS_CACHE_CONTROL
+
+    def test_rejected_token(self, mock_server_urls):
+        h = AsyncHttpRequests()
+
+        async def calls():
+            rejected = await h.get_by_scope(mock_server_urls["user_info.email"], "<revoked_token>")
+            return rejected, await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>")
+
+        rejected, result = run(h, calls())
+        assert rejected is None
+        assert result["email"] == "jaco@gmail.com"
+        assert h.pool.created == 1
+
+    def test_read_timeout(self, mock_server_urls, monkeypatch):
+        monkeypatch.setattr(mock_server, "USER_INFO_LATENCY", 0.5)
+        h = AsyncHttpRequests(read_timeout=0.1)
+        with pytest.raises(ProviderUnavailableError):
+            run(h, h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>"))
+
+    def test_connect_error(self):
+        h = AsyncHttpRequests(connect_timeout=0.1)
+        with pytest.raises(ProviderUnavailableError):
+            run(h, h.get_by_scope("http://localhost:1/userinfo", "<access_token>"))
+        assert run(h, h.token("http://localhost:1/token")) is None
+        assert run(h, h.get_json("http://localhost:1/certs")) == (None, None)
+
+    def test_server_error(self, mock_server_urls, monkeypatch):
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        h = AsyncHttpRequests()
+        with pytest.raises(ProviderUnavailableError):
+            run(h, h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>"))
+
+    def test_closed_connection_is_replaced(self, mock_server_urls):
+        h = AsyncHttpRequests()
+
+        async def calls():
+            await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>")
+            # Close the pooled connection as if the server dropped the idle connection
+            for pool in (await h.pool._loop_pools()).values():
+                for _, writer in pool:
+                    writer.transport.abort()
+            return await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>")
+
+        assert run(h, calls())["email"] == "jaco@gmail.com"
+        assert h.pool.created == 2
+
+    def test_connections_are_pooled_per_event_loop(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        for _ in range(2):
+            run(h, h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>"))
+        assert h.pool.created == 2
+        assert len(h.pool._pools) == 0
+
+    def test_connections_are_closed_with_the_loop(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        writers = []
+
+        async def call():
+            result = await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>")
+            writers.extend(writer for pool in (await h.pool._loop_pools()).values() for _, writer in pool)
+            return result
+
+        # Without aclose, asyncio.run shuts down the loop's async generators
+        assert asyncio.run(call())["email"] == "jaco@gmail.com"
+        assert len(writers) == 1
+        assert writers[0].is_closing()
+        assert len(h.pool._pools) == 0
+
+    def test_created_from_http_requests(self):
+        http = HttpRequests({}, pool_size=3, connect_timeout=1, read_timeout=2)
+        h = http.async_requests
+        assert h is http.async_requests
+        assert (h.pool.maxsize, h.pool.connect_timeout, h.pool.read_timeout) == (3, 1, 2)
+
+    def test_header_injection(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        with pytest.raises(ValueError):
+            run(h, h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>\r\nX-Injected: 1"))
+        assert h.pool.created == 0
+
+    def test_response_size(self, mock_server_urls):
+        h = AsyncHttpRequests()
+        h.pool.max_response_size = 10
+        with pytest.raises(ProviderUnavailableError):
+            run(h, h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>"))
+
+    def test_post_is_not_resent(self, mock_server_urls):
+        h = AsyncHttpRequests()
+
+        async def calls():
+            await h.get_by_scope(mock_server_urls["user_info.email"], "<access_token>")
+            return await h.token(mock_server_urls["token"])
+
+        assert run(h, calls())["access_token"] == "<access_token>"
+        # The POST is sent on a new connection rather than the pooled one
+        assert (h.pool.created, h.pool.reused) == (2, 0)
+
+    def test_http_proxy(self, mock_server_urls, mock_server_thread):
+        # The mock server stands in for the proxy & serves the absolute url
+        h = AsyncHttpRequests(connect_timeout=0.1)
+        h.pool.proxies = {"http": mock_server_thread.base_url}
+        result = run(h, h.get_by_scope("http://userinfo.invalid/mock_google_user_info", "<access_token>"))
+        assert result["email"] == "jaco@gmail.com"
+        assert h.pool.created == 0
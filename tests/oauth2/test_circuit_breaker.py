@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from flask_jwt_router.oauth2._circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from flask_jwt_router.oauth2._exceptions import CircuitOpenError, ProviderUnavailableError
+
+
+class TestCircuitBreaker:
+
+    def _breaker(self, **kwargs):
+        now = [0.0]
+        breaker = CircuitBreaker(timer=lambda: now[0], **kwargs)
+        return breaker, now
+
+    @staticmethod
+    def _fail():
+        raise ProviderUnavailableError("<url>", 503)
+
+    def test_opens_after_consecutive_failures(self):
+        breaker, _ = self._breaker(failure_threshold=3)
+        calls = []
+
+        def fail():
+            calls.append(1)
+            self._fail()
+
+        for _ in range(3):
+            with pytest.raises(ProviderUnavailableError):
+                breaker.call(fail)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(fail)
+        assert len(calls) == 3
+
+    def test_success_resets_failures(self):
+        breaker, _ = self._breaker(failure_threshold=2)
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(self._fail)
+        assert breaker.call(lambda: "ok") == "ok"
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(self._fail)
+        assert breaker.state == CLOSED
+
+    def test_trial_call_closes(self):
+        breaker, now = self._breaker(failure_threshold=1, reset_timeout=30)
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(self._fail)
+        now[0] = 29
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+        now[0] = 30
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == CLOSED
+
+    def test_trial_call_reopens(self):
+        breaker, now = self._breaker(failure_threshold=1, reset_timeout=30)
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(self._fail)
+        now[0] = 30
+
+        def trial():
+            # Concurrent calls fail fast during the trial call
+            assert breaker.state == HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                breaker.call(lambda: "ok")
+            self._fail()
+
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(trial)
+        assert breaker.state == OPEN
+        now[0] = 59
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+
+    def test_other_errors_do_not_count(self):
+        breaker, _ = self._breaker(failure_threshold=1)
+        with pytest.raises(ValueError):
+            breaker.call(lambda: int("x"))
+        assert breaker.state == CLOSED
+
+    def test_disabled(self):
+        breaker, _ = self._breaker(failure_threshold=0)
+        for _ in range(10):
+            with pytest.raises(ProviderUnavailableError):
+                breaker.call(self._fail)
+        assert breaker.state == CLOSED
+
+    def test_call_async(self):
+        breaker, now = self._breaker(failure_threshold=2, reset_timeout=30)
+
+        async def fail():
+            self._fail()
+
+        async def ok():
+            return "ok"
+
+        for _ in range(2):
+            with pytest.raises(ProviderUnavailableError):
+                asyncio.run(breaker.call_async(fail))
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(breaker.call_async(ok))
+        now[0] = 30
+        assert asyncio.run(breaker.call_async(ok)) == "ok"
+        assert breaker.state == CLOSED
+
+    def test_cancelled_trial_call_reopens(self):
+        breaker, now = self._breaker(failure_threshold=1, reset_timeout=30)
+        with pytest.raises(ProviderUnavailableError):
+            breaker.call(self._fail)
+        now[0] = 30
+
+        async def main():
+            trial = asyncio.ensure_future(breaker.call_async(asyncio.sleep, 5))
+            await asyncio.sleep(0)
+            assert breaker.state == HALF_OPEN
+            trial.cancel()
+            await asyncio.gather(trial, return_exceptions=True)
+
+        asyncio.run(main())
+        assert breaker.state == OPEN
+        # The reset timeout has already passed, so the next call is the trial call
+        assert breaker.call(lambda: "ok") == "ok"
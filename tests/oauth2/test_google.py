@@ -1,12 +1,27 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Barrier
 from typing import Dict
+import time
+
+import jwt
 import pytest
 
-from flask_jwt_router.oauth2._exceptions import RequestAttributeError, ClientExchangeCodeError
+from flask_jwt_router.oauth2._exceptions import (
+    RequestAttributeError,
+    ClientExchangeCodeError,
+    CircuitOpenError,
+    ProviderUnavailableError,
+)
 from flask_jwt_router.oauth2.google import Google, _FlaskRequestType
 from flask_jwt_router.oauth2.http_requests import HttpRequests
 from flask_jwt_router.oauth2._urls import GOOGLE_OAUTH_URL
 from flask_jwt_router import GoogleTestUtil
-from tests.fixtures.oauth_fixtures import TEST_OAUTH_URL, http_requests
+from tests.fixtures.oauth_fixtures import TEST_OAUTH_URL, http_requests, mock_server_thread, mock_server_urls
+from tests.fixtures.key_fixtures import generate_private_key, to_jwk, write_jwks
+from tests.mock_server import mock_server
+from tests.mock_server.mock_server import user_info_calls, certs_calls
 from tests.fixtures.model_fixtures import MockAOuthModel
 
 mock_exchange_response = {
@@ -160,3 +175,339 @@ class TestGoogle:
         assert g.test_metadata["test@email.com"]["email"] == "test@email.com"
         g.tear_down(scope="application")
         assert g.test_metadata == {}
+
+
+class TestUserInfoCache:
+
+    mock_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "users",
+        "email_field": "email",
+        "expires_in": 3600,
+    }
+
+    def _timed(self, g, token, number):
+        start = time.perf_counter()
+        for _ in range(number):
+            result = g.authorize(token)
+        return result, (time.perf_counter() - start) / number
+
+    def test_no_cache_by_default(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options)
+        assert g.userinfo_cache is None
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert len(user_info_calls) == 2
+
+    def test_cache_hits(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=300)
+        assert g.userinfo_cache.ttl == 300
+
+        result, uncached = self._timed(g, "<access_token>", 1)
+        assert result["email"] == "jaco@gmail.com"
+        result, cached = self._timed(g, "<access_token>", 20)
+        assert result["email"] == "jaco@gmail.com"
+
+        assert len(user_info_calls) == 1
+        assert g.userinfo_cache.hits == 20
+        assert g.userinfo_cache.misses == 1
+        assert cached * 10 < uncached
+
+    def test_ttl_capped_by_expires_in(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**{**self.mock_options, "expires_in": 60}, cache_ttl=300)
+        assert g.userinfo_cache.ttl == 60
+
+    def test_negative_cache(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=300, negative_cache_ttl=10)
+        assert g.authorize("<revoked_token>") is None
+        assert g.authorize("<revoked_token>") is None
+        assert len(user_info_calls) == 1
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert len(user_info_calls) == 2
+
+    def test_negative_cache_expires(self, mock_server_urls):
+        now = [0.0]
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=300, negative_cache_ttl=10)
+        g.userinfo_cache.timer = lambda: now[0]
+        assert g.authorize("<revoked_token>") is None
+        now[0] = 11
+        assert g.authorize("<revoked_token>") is None
+        assert len(user_info_calls) == 2
+
+    @pytest.mark.parametrize("cache_ttl", [0, 300])
+    def test_concurrent_calls_are_coalesced(self, mock_server_urls, cache_ttl):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=cache_ttl)
+        barrier = Barrier(20)
+
+        def authorize(_):
+            barrier.wait(5)
+            return g.authorize("<access_token>")
+
+        with ThreadPoolExecutor(20) as executor:
+            results = list(executor.map(authorize, range(20)))
+
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        assert len(user_info_calls) == 1
+        assert g.in_flight.shared == 19
+
+    def test_cache_is_bounded(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=300, cache_size=2)
+        for n in range(5):
+            g.authorize(f"<token_{n}>")
+        assert len(g.userinfo_cache) == 2
+
+
+class TestGoogleIdToken:
+
+    mock_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "users",
+        "email_field": "email",
+        "expires_in": 3600,
+        "id_token": True,
+    }
+
+    @pytest.fixture
+    def signing_key(self, monkeypatch):
+        private_key = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [to_jwk("RS256", private_key.public_key(), "google-1")])
+        return private_key
+
+    def _id_token(self, private_key, kid="google-1", **claims):
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": "<CLIENT_ID>",
+            "sub": "1234567890",
+            "email": "jaco@gmail.com",
+            "email_verified": True,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+            **claims,
+        }
+        return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+    def test_authorize(self, mock_server_urls, signing_key):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options)
+        token = self._id_token(signing_key)
+        for _ in range(10):
+            assert g.authorize(token)["email"] == "jaco@gmail.com"
+        assert len(certs_calls) == 1
+        assert len(user_info_calls) == 0
+
+    def test_local_jwks_file(self, tmp_path, http_requests):
+        private_key = generate_private_key("RS256")
+        jwks_file = write_jwks(tmp_path, [to_jwk("RS256", private_key.public_key(), "google-1")])
+        g = Google(http_requests())
+        g.init(**self.mock_options, jwks_uri=jwks_file)
+        assert g.authorize(self._id_token(private_key))["email"] == "jaco@gmail.com"
+
+    @pytest.mark.parametrize("claims", [
+        {"aud": "<ANOTHER_CLIENT_ID>"},
+        {"iss": "https://evil.example.com"},
+        {"exp": datetime.utcnow() - timedelta(minutes=1)},
+        {"email_verified": False},
+        {"email_verified": None},
+    ])
+    def test_invalid_claims(self, mock_server_urls, signing_key, claims):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options)
+        assert g.authorize(self._id_token(signing_key, **claims)) is None
+
+    def test_invalid_signature(self, mock_server_urls, signing_key):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options)
+        assert g.authorize(self._id_token(generate_private_key("RS256"))) is None
+        assert g.authorize(self._id_token(signing_key, kid="unknown")) is None
+        assert g.authorize("<access_token>") is None
+
+
+class TestProviderOutage:
+
+    mock_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "users",
+        "email_field": "email",
+        "expires_in": 3600,
+    }
+
+    def _google(self, urls, now, **options):
+        g = Google(HttpRequests(urls))
+        g.init(**self.mock_options, **options)
+        g.circuit_breaker.timer = lambda: now[0]
+        if g.userinfo_cache is not None:
+            g.userinfo_cache.timer = lambda: now[0]
+        return g
+
+    @staticmethod
+    def _wait_for_revalidation(g):
+        while g._revalidating:
+            time.sleep(0.01)
+
+    def test_unavailable_raises(self, mock_server_urls, monkeypatch):
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        g = self._google(mock_server_urls, [0.0])
+        with pytest.raises(ProviderUnavailableError):
+            g.authorize("<access_token>")
+        # Rejected tokens still return None
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", False)
+        assert g.authorize("<revoked_token>") is None
+
+    def test_circuit_breaker_fails_fast(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        g = self._google(mock_server_urls, now, circuit_failures=3, circuit_reset_timeout=30)
+        for _ in range(3):
+            with pytest.raises(ProviderUnavailableError):
+                g.authorize("<access_token>")
+        for _ in range(10):
+            with pytest.raises(CircuitOpenError):
+                g.authorize("<access_token>")
+        assert len(user_info_calls) == 3
+
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", False)
+        now[0] = 30
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert len(user_info_calls) == 4
+
+    def test_timeouts(self, mock_server_urls):
+        g = self._google(mock_server_urls, [0.0], connect_timeout=1, read_timeout=2)
+        assert g.http.pool.connect_timeout == 1
+        assert g.http.pool.read_timeout == 2
+
+    def test_stale_while_revalidate(self, mock_server_urls):
+        now = [0.0]
+        g = self._google(mock_server_urls, now, cache_ttl=300, stale_ttl=600)
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        now[0] = 301
+        # The expired response is served & refreshed in the background
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        self._wait_for_revalidation(g)
+        assert len(user_info_calls) == 2
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert len(user_info_calls) == 2
+
+    def test_stale_during_outage(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        g = self._google(mock_server_urls, now, cache_ttl=300, stale_ttl=600)
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        now[0] = 400
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        self._wait_for_revalidation(g)
+        now[0] = 899
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        self._wait_for_revalidation(g)
+        # The grace period has ended
+        now[0] = 900
+        with pytest.raises(ProviderUnavailableError):
+            g.authorize("<access_token>")
+
+    def test_revoked_during_revalidation(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        g = self._google(mock_server_urls, now, cache_ttl=300, stale_ttl=600)
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        monkeypatch.setattr(mock_server, "VALID_ACCESS_TOKENS", set())
+        now[0] = 301
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        self._wait_for_revalidation(g)
+        assert g.authorize("<access_token>") is None
+
+    def test_no_stale_without_stale_ttl(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        g = self._google(mock_server_urls, now, cache_ttl=300)
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        now[0] = 300
+        with pytest.raises(ProviderUnavailableError):
+            g.authorize("<access_token>")
+
+
+class TestAuthorizeAsync:
+
+    mock_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "users",
+        "email_field": "email",
+        "expires_in": 3600,
+    }
+
+    @staticmethod
+    def _run(g, awaitable):
+        async def main():
+            try:
+                return await awaitable()
+            finally:
+                await g.http.async_requests.pool.aclose()
+        return asyncio.run(main())
+
+    @pytest.mark.parametrize("cache_ttl", [0, 300])
+    def test_concurrent_calls_are_coalesced(self, mock_server_urls, cache_ttl):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=cache_ttl)
+        results = self._run(g, lambda: asyncio.gather(*(g.authorize_async("<access_token>") for _ in range(20))))
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        assert len(user_info_calls) == 1
+        assert g.async_in_flight.shared == 19
+
+    def test_different_tokens_are_concurrent(self, mock_server_urls, monkeypatch):
+        tokens = [f"<access_token_{n}>" for n in range(10)]
+        monkeypatch.setattr(mock_server, "VALID_ACCESS_TOKENS", set(tokens))
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options)
+        start = time.perf_counter()
+        results = self._run(g, lambda: asyncio.gather(*(g.authorize_async(t) for t in tokens)))
+        elapsed = time.perf_counter() - start
+        assert all(r["email"] == "jaco@gmail.com" for r in results)
+        assert len(user_info_calls) == 10
+        # The 10 calls of USER_INFO_LATENCY wait for the mock server at the same time
+        assert elapsed < mock_server.USER_INFO_LATENCY * 5
+
+    def test_shares_cache_with_authorize(self, mock_server_urls):
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, cache_ttl=300)
+        assert self._run(g, lambda: g.authorize_async("<access_token>"))["email"] == "jaco@gmail.com"
+        assert g.authorize("<access_token>")["email"] == "jaco@gmail.com"
+        assert self._run(g, lambda: g.authorize_async("<revoked_token>")) is None
+        assert g.authorize("<revoked_token>") is None
+        assert len(user_info_calls) == 2
+
+    def test_circuit_breaker(self, mock_server_urls, monkeypatch):
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, circuit_failures=2)
+        for _ in range(2):
+            with pytest.raises(ProviderUnavailableError):
+                self._run(g, lambda: g.authorize_async("<access_token>"))
+        with pytest.raises(CircuitOpenError):
+            self._run(g, lambda: g.authorize_async("<access_token>"))
+        assert len(user_info_calls) == 2
+
+    def test_id_token(self, mock_server_urls, monkeypatch):
+        private_key = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [to_jwk("RS256", private_key.public_key(), "google-1")])
+        g = Google(HttpRequests(mock_server_urls))
+        g.init(**self.mock_options, id_token=True)
+        token = jwt.encode({
+            "iss": "https://accounts.google.com",
+            "aud": "<CLIENT_ID>",
+            "email": "jaco@gmail.com",
+            "email_verified": True,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+        }, private_key, algorithm="RS256", headers={"kid": "google-1"})
+        assert self._run(g, lambda: g.authorize_async(token))["email"] == "jaco@gmail.com"
+        assert user_info_calls == []
@@ -0,0 +1,82 @@
+import pytest
+
+from flask_jwt_router.oauth2._jwks import JWKSCache, max_age
+from flask_jwt_router.oauth2.http_requests import HttpRequests
+from tests.mock_server import mock_server
+from tests.mock_server.mock_server import certs_calls
+from tests.fixtures.key_fixtures import generate_private_key, to_jwk, write_jwks
+from tests.fixtures.oauth_fixtures import mock_server_thread, mock_server_urls
+
+
+@pytest.mark.parametrize("headers, expected", [
+    (None, None),
+    ({}, None),
+    ({"Cache-Control": "public, max-age=21600, must-revalidate"}, 21600),
+    ({"Cache-Control": "public, max-age=21600", "Age": "600"}, 21000),
+    ({"Cache-Control": "max-age=60", "Age": "120"}, 0),
+    ({"Cache-Control": "no-store"}, 0),
+])
+def test_max_age(headers, expected):
+    assert max_age(headers) == expected
+
+
+class TestJWKSCache:
+
+    def test_local_file(self, tmp_path):
+        private_key = generate_private_key("RS256")
+        jwks_file = write_jwks(tmp_path, [to_jwk("RS256", private_key.public_key(), "2021-07")])
+        jwks = JWKSCache(None, jwks_file)
+        assert jwks.get_key("2021-07") is not None
+        assert jwks.get_key("2021-07") is not None
+        assert jwks.kids == ["2021-07"]
+        assert jwks.refreshes == 1
+
+    def test_cache_control(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        private_key = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [to_jwk("RS256", private_key.public_key(), "a")])
+        jwks = JWKSCache(HttpRequests(mock_server_urls), mock_server_urls["certs"], timer=lambda: now[0])
+        for _ in range(10):
+            assert jwks.get_key("a") is not None
+        assert len(certs_calls) == 1
+        now[0] = 21599
+        assert jwks.get_key("a") is not None
+        assert len(certs_calls) == 1
+        now[0] = 21600
+        assert jwks.get_key("a") is not None
+        assert len(certs_calls) == 2
+
+    def test_unknown_kid_refreshes(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        current = generate_private_key("RS256")
+        rotated = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [to_jwk("RS256", current.public_key(), "a")])
+        jwks = JWKSCache(HttpRequests(mock_server_urls), mock_server_urls["certs"], timer=lambda: now[0])
+        assert jwks.get_key("a") is not None
+
+        # Google rotates its keys
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [
+            to_jwk("RS256", current.public_key(), "a"),
+            to_jwk("RS256", rotated.public_key(), "b"),
+        ])
+        # Refreshes are rate limited
+        assert jwks.get_key("b") is None
+        assert len(certs_calls) == 1
+        now[0] = 60
+        assert jwks.get_key("b") is not None
+        assert len(certs_calls) == 2
+        # Unknown kids do not refresh again until min_refresh_interval has passed
+        for _ in range(10):
+            assert jwks.get_key("unknown") is None
+        assert len(certs_calls) == 2
+
+    def test_failed_fetch_keeps_keys(self, mock_server_urls, monkeypatch):
+        now = [0.0]
+        private_key = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_jwks, "keys", [to_jwk("RS256", private_key.public_key(), "a")])
+        jwks = JWKSCache(HttpRequests(mock_server_urls), mock_server_urls["certs"], timer=lambda: now[0])
+        assert jwks.get_key("a") is not None
+        jwks.jwks_uri = mock_server_urls["certs"] + "/missing"
+        now[0] = 21600
+        assert jwks.get_key("a") is not None
+        assert jwks.refreshes == 1
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict
+
+import jwt
+import pytest
+from flask import Flask
+
+from flask_jwt_router import JwtRoutes, OIDC
+from flask_jwt_router.oauth2.google import _FlaskRequestType
+from flask_jwt_router.oauth2.http_requests import HttpRequests
+from flask_jwt_router.oauth2.oidc import DiscoveryError
+from flask_jwt_router.oauth2._exceptions import StrategyOptionsError
+from tests.fixtures.key_fixtures import generate_private_key, to_jwk
+from tests.fixtures.model_fixtures import MockAOuthModel
+from tests.fixtures.oauth_fixtures import mock_server_thread, mock_idp_issuer
+from tests.mock_server import mock_server
+from tests.mock_server.mock_server import oidc_calls
+
+
+class _MockFlaskRequest(_FlaskRequestType):
+
+    base_url = "http://localhost:3000/login"
+
+    @staticmethod
+    def get_json() -> Dict:
+        return {"code": "<CODE>"}
+
+
+class TestOIDC:
+
+    @pytest.fixture
+    def signing_key(self, monkeypatch):
+        private_key = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_oidc_jwks, "keys", [to_jwk("RS256", private_key.public_key(), "idp-1")])
+        return private_key
+
+    def _oidc(self, issuer, **options):
+        oidc = OIDC(HttpRequests(OIDC.urls))
+        oidc.init(**{
+            "issuer": issuer,
+            "client_id": "<CLIENT_ID>",
+            "client_secret": "<CLIENT_SECRET>",
+            "redirect_uri": "http://localhost:3000",
+            "tablename": "oauth_tablename",
+            "email_field": "email",
+            **options,
+        })
+        return oidc
+
+    def _token(self, private_key, issuer, kid="idp-1", **claims):
+        payload = {
+            "iss": issuer,
+            "aud": "<CLIENT_ID>",
+            "sub": "1234567890",
+            "email": "jaco@gmail.com",
+            "email_verified": True,
+            "exp": datetime.utcnow() + timedelta(hours=1),
+            **claims,
+        }
+        payload = {k: v for k, v in payload.items() if v is not None}
+        return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+    def test_id_token(self, mock_idp_issuer, signing_key):
+        oidc = self._oidc(mock_idp_issuer)
+        token = self._token(signing_key, mock_idp_issuer)
+        for _ in range(10):
+            assert oidc.authorize(token)["email"] == "jaco@gmail.com"
+        # The discovery document & JWKS are each read once
+        assert oidc_calls == ["/oidc/.well-known/openid-configuration", "/oidc/jwks"]
+        assert oidc.http.get_url("token") == f"{mock_idp_issuer}/token"
+
+    def test_access_token(self, mock_idp_issuer, signing_key):
+        oidc = self._oidc(mock_idp_issuer, audience="https://api.example.com", email_claim="upn")
+        token = self._token(signing_key, mock_idp_issuer, aud="https://api.example.com", upn="jaco@gmail.com")
+        assert oidc.authorize(token)["email"] == "jaco@gmail.com"
+
+    def test_opaque_access_token(self, mock_idp_issuer):
+        oidc = self._oidc(mock_idp_issuer)
+        assert oidc.authorize("<opaque_access_token>")["email"] == "jaco@gmail.com"
+        assert oidc.authorize("<revoked_access_token>") is None
+        assert oidc_calls.count("/oidc/userinfo") == 2
+
+    def test_access_token_without_email(self, mock_idp_issuer, signing_key):
+        oidc = self._oidc(mock_idp_issuer)
+        token = self._token(signing_key, mock_idp_issuer, email=None)
+        assert oidc.authorize(token) is None
+        assert oidc_calls.count("/oidc/userinfo") == 1
+
+    @pytest.mark.parametrize("claims", [
+        {"aud": "<ANOTHER_CLIENT_ID>"},
+        {"iss": "https://evil.example.com"},
+        {"exp": datetime.utcnow() - timedelta(minutes=1)},
+        {"email_verified": False},
+        {"email_verified": "false"},
+        {"email_verified": None},
+    ])
+    def test_invalid_claims(self, mock_idp_issuer, signing_key, claims):
+        oidc = self._oidc(mock_idp_issuer)
+        assert oidc.authorize(self._token(signing_key, mock_idp_issuer, **claims)) is None
+
+    def test_email_verified_not_required(self, mock_idp_issuer, signing_key):
+        oidc = self._oidc(mock_idp_issuer, require_email_verified=False)
+        token = self._token(signing_key, mock_idp_issuer, email_verified=None)
+        assert oidc.authorize(token)["email"] == "jaco@gmail.com"
+        assert oidc.authorize(self._token(signing_key, mock_idp_issuer, email_verified=False)) is None
+
+    def test_base_oauth_options(self, mock_idp_issuer):
+        oidc = OIDC(HttpRequests(OIDC.urls))
+        options = {
+            "client_id": "<CLIENT_ID>",
+            "client_secret": "<CLIENT_SECRET>",
+            "redirect_uri": "http://localhost:3000",
+            "expires_in": 3600,
+            "email_field": "email",
+            "tablename": "oauth_tablename",
+        }
+        with pytest.raises(StrategyOptionsError):
+            oidc.init(**options)
+        oidc.init(**options, issuer=mock_idp_issuer)
+        assert (oidc.expires_in, oidc.algorithm) == (3600, "RS256")
+
+    def test_unknown_kid_refreshes_jwks(self, mock_idp_issuer, signing_key, monkeypatch):
+        oidc = self._oidc(mock_idp_issuer, min_jwks_refresh_interval=0)
+        assert oidc.authorize(self._token(signing_key, mock_idp_issuer))["email"] == "jaco@gmail.com"
+        rotated = generate_private_key("RS256")
+        monkeypatch.setitem(mock_server.mock_oidc_jwks, "keys", [to_jwk("RS256", rotated.public_key(), "idp-2")])
+        assert oidc.authorize(self._token(rotated, mock_idp_issuer, kid="idp-2"))["email"] == "jaco@gmail.com"
+        assert oidc_calls.count("/oidc/jwks") == 2
+        assert oidc_calls.count("/oidc/.well-known/openid-configuration") == 1
+
+    def test_issuer_mismatch(self, mock_idp_issuer):
+        oidc = self._oidc(mock_idp_issuer, discovery_url=f"{mock_idp_issuer}/.well-known/openid-configuration")
+        oidc.issuer = "https://idp.example.com"
+        with pytest.raises(DiscoveryError):
+            oidc.authorize("<opaque_access_token>")
+
+    def test_oauth_login(self, mock_idp_issuer):
+        oidc = self._oidc(mock_idp_issuer)
+        result = oidc.oauth_login(_MockFlaskRequest())
+        assert result["access_token"] == "<opaque_access_token>"
+        assert result["id_token"] == "<id_token>"
+
+    def test_authorize_async(self, mock_idp_issuer, signing_key):
+        oidc = self._oidc(mock_idp_issuer)
+        token = self._token(signing_key, mock_idp_issuer)
+
+        async def main():
+            try:
+                return (
+                    await oidc.authorize_async(token),
+                    await asyncio.gather(*(oidc.authorize_async("<opaque_access_token>") for _ in range(5))),
+                    await oidc.authorize_async("<revoked_access_token>"),
+                )
+            finally:
+                await oidc.http.async_requests.pool.aclose()
+
+        claims, userinfo, revoked = asyncio.run(main())
+        assert claims["email"] == "jaco@gmail.com"
+        assert all(u["email"] == "jaco@gmail.com" for u in userinfo)
+        assert revoked is None
+        assert oidc_calls.count("/oidc/userinfo") == 2
+        assert oidc.async_in_flight.shared == 4
+
+    def test_routing(self, mock_idp_issuer, signing_key, MockAOuthModel):
+        from flask import g
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        JwtRoutes(
+            app,
+            entity_models=[MockAOuthModel],
+            strategies=[OIDC],
+            strategy_options={"OIDC": {
+                "issuer": mock_idp_issuer,
+                "client_id": "<CLIENT_ID>",
+                "tablename": "oauth_tablename",
+                "email_field": "email",
+            }},
+            entity_loaders={MockAOuthModel: lambda key, value: f"{key}={value}"},
+        )
+
+        @app.route("/oidc")
+        def oidc():
+            return {"entity": g.oauth_tablename}
+
+        client = app.test_client()
+        token = self._token(signing_key, mock_idp_issuer)
+        rv = client.get("/oidc", headers={"X-OIDC-Token": f"Bearer {token}"})
+        assert rv.get_json() == {"entity": "email=jaco@gmail.com"}
+        rv = client.get("/oidc", headers={"X-OIDC-Token": f"Bearer {self._token(generate_private_key('RS256'), mock_idp_issuer)}"})
+        assert rv.status_code == 401
@@ -0,0 +1,107 @@
+from threading import Thread
+
+import pytest
+
+from flask_jwt_router._cache import LRUCache, TTLCache
+
+
+class TestLRUCache:
+
+    def test_get_set(self):
+        cache = LRUCache(2)
+        assert cache.get("a") is None
+        assert cache.get("a", False) is False
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert "a" in cache
+        assert len(cache) == 1
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_delete_clear(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("a")
+        assert "a" not in cache
+        cache.set("b", 2)
+        cache.get("b")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.hits == 0
+        assert cache.misses == 0
+
+    def test_zero_maxsize(self):
+        cache = LRUCache(0)
+        cache.set("a", 1)
+        assert len(cache) == 0
+
+
+class MockTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+
+    def test_expires(self):
+        timer = MockTimer()
+        cache = TTLCache(2, ttl=10, timer=timer)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=5)
+        timer.now = 5
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        timer.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+    @pytest.mark.parametrize("policy,evicted", [("lru", "b"), ("fifo", "a")])
+    def test_policy(self, policy, evicted):
+        cache = TTLCache(2, policy=policy)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert evicted not in cache
+        assert "c" in cache
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            TTLCache(2, policy="random")
+
+    def test_threads(self):
+        cache = TTLCache(64)
+        errors = []
+
+        def worker(n):
+            for i in range(500):
+                key = (n + i) % 100
+                cache.set(key, key)
+                value = cache.get(key)
+                if value is not None and value != key:
+                    errors.append(value)
+
+        threads = [Thread(target=worker, args=(n,)) for n in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(cache) <= 64
@@ -0,0 +1,43 @@
+import pytest
+from types import MappingProxyType
+
+from flask_jwt_router._claims import Claims
+
+
+class TestClaims:
+
+    decoded_token = {"table_name": "teachers", "teacher_id": 7, "exp": 1627000000, "role": "admin"}
+
+    def test_claims(self):
+        claims = Claims(self.decoded_token, "teacher_id")
+        assert claims.entity_id == 7
+        assert claims.entity_key == "teacher_id"
+        assert claims.table_name == "teachers"
+        assert claims.exp == 1627000000
+        assert claims["role"] == "admin"
+        assert claims.get("scope") is None
+        assert dict(claims) == self.decoded_token
+
+    def test_claims_are_immutable(self):
+        decoded_token = dict(self.decoded_token)
+        claims = Claims(decoded_token, "teacher_id")
+        decoded_token["role"] = "user"
+        assert claims["role"] == "admin"
+        with pytest.raises(TypeError):
+            claims["role"] = "user"
+        with pytest.raises(AttributeError):
+            claims.entity_key = "id"
+        with pytest.raises(AttributeError):
+            claims.other = 1
+
+    def test_claims_wraps_mapping_proxy(self):
+        proxy = MappingProxyType(self.decoded_token)
+        assert Claims(proxy, "teacher_id")._claims is proxy
+
+    def test_get_claim(self):
+        claims = Claims(self.decoded_token, "teacher_id")
+        assert claims.get_claim("role", str) == "admin"
+        assert claims.get_claim("teacher_id", int) == 7
+        assert claims.get_claim("tenant_id", int, default=0) == 0
+        with pytest.raises(TypeError):
+            claims.get_claim("role", int)
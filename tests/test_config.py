@@ -1,6 +1,8 @@
+import pytest
 from flask_jwt_router._jwt_routes import JwtRoutes
 from flask_jwt_router._config import Config
-from tests.fixtures.model_fixtures import MockEntityModel
+from flask_jwt_router._entity import EntityModelError
+from tests.fixtures.model_fixtures import MockEntityModel, MockEntityModelThree
 
 
 class TestConfig:
@@ -59,3 +61,33 @@ class TestConfig:
 
         assert config.entity_models == [MockEntityModel]
 
+    def test_compile_routes(self):
+        config = Config()
+        config.init_config({**self.config, "JWT_ROUTER_API_NAME": "/api/v1"})
+
+        assert config.prefix_api_name(self.WHITE_LIST_ROUTES) == [("GET", "/api/v1/test")]
+        assert config.route_table.whitelist.match("GET", "/api/v1/test")
+        assert not config.route_table.whitelist.match("GET", "/test")
+        assert config.route_table.ignored.match("GET", "/ignore")
+        assert not config.route_table.ignored.match("GET", "/api/v1/ignore")
+
+        config.whitelist_routes = [("GET", "/health")]
+        assert not config.route_table.whitelist.match("GET", "/api/v1/health")
+        config.compile_routes()
+        assert config.route_table.whitelist.match("GET", "/api/v1/health")
+        assert not config.route_table.whitelist.match("GET", "/api/v1/test")
+
+    def test_entity_index(self, MockEntityModel, MockEntityModelThree):
+        config = Config()
+        config.init_config(self.config, entity_models=[MockEntityModel, MockEntityModelThree])
+
+        assert config.entity_index == {
+            "test_entities": (MockEntityModel, "id"),
+            "test_3_entities": (MockEntityModelThree, "teacher_id"),
+        }
+
+        class NoTableName:
+            id = 1
+
+        with pytest.raises(EntityModelError):
+            config.entity_models = [MockEntityModel, NoTableName]
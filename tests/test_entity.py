@@ -11,6 +11,8 @@
 
 
 """
+import asyncio
+
 import pytest
 import jwt
 from flask import jsonify
@@ -144,3 +146,253 @@ class TestEntity:
 
         assert decoded_token_two["table_name"] == "teachers"
 
+
+
+@pytest.fixture
+def session_model():
+    from sqlalchemy import create_engine, Column, Integer, String
+    from sqlalchemy.ext.declarative import declarative_base
+    from sqlalchemy.orm import scoped_session, sessionmaker
+
+    engine = create_engine("sqlite://")
+    session = scoped_session(sessionmaker(bind=engine))
+    Base = declarative_base()
+
+    class CachedUserModel(Base):
+        __tablename__ = "cached_users"
+        query = session.query_property()
+        id = Column(Integer, primary_key=True)
+        name = Column(String(10))
+
+    Base.metadata.create_all(engine)
+    session.add(CachedUserModel(id=1, name="joe"))
+    session.commit()
+    yield session, CachedUserModel
+    session.remove()
+
+
+class TestEntityCache:
+    """
+        Entity cache & SQLAlchemy invalidation hooks
+    """
+    app_config = {
+        "SECRET_KEY": "__TEST_SECRET__",
+        "JWT_ROUTER_ENTITY_CACHE": True,
+    }
+
+    def test_entity_cache(self, session_model):
+        from flask_jwt_router._cache import TTLCache
+        session, model = session_model
+        config = Config()
+        config.init_config(self.app_config, entity_models=[model])
+        cache = TTLCache(16, 60)
+        entity = Entity(config, cache)
+        entity.register_invalidation_hooks()
+        entity.register_invalidation_hooks()
+        decoded_token = {"table_name": "cached_users", "id": 1}
+
+        first = entity.get_entity_from_token_or_tablename(decoded_token)
+        entity.tablename = None
+        second = entity.get_entity_from_token_or_tablename(decoded_token)
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        first.name = "jaco"
+        session.commit()
+        assert ("cached_users", "id", 1) not in cache
+
+        entity.tablename = None
+        third = entity.get_entity_from_token_or_tablename(decoded_token)
+        assert third.name == "jaco"
+        assert cache.misses == 2
+
+        session.delete(third)
+        session.commit()
+        assert len(cache) == 0
+
+    def test_cached_entity_after_commit(self, session_model):
+        from flask_jwt_router._cache import TTLCache
+        session, model = session_model
+        config = Config()
+        config.init_config(self.app_config, entity_models=[model])
+        entity = Entity(config, TTLCache(16, 60))
+        decoded_token = {"table_name": "cached_users", "id": 1}
+
+        # The first request loads the entity, commits & removes its session
+        first = entity.get_entity_from_token_or_tablename(decoded_token)
+        session.commit()
+        session.remove()
+
+        entity.reset()
+        second = entity.get_entity_from_token_or_tablename(decoded_token)
+        assert second is not first
+        assert second.name == "joe"
+        # The entity belongs to the session of the request that read it from the cache
+        assert second in session
+        second.name = "jaco"
+        session.commit()
+        assert model.query.get(1).name == "jaco"
+
+    def test_shared_cache_invalidation(self, session_model):
+        from flask_jwt_router._cache import TTLCache
+        session, model = session_model
+        config = Config()
+        config.init_config(self.app_config, entity_models=[model])
+        cache = TTLCache(16, 60)
+        # Another process sharing the cache loaded the entity by its primary key & email field
+        loader = Entity(config, cache)
+        user = loader.get_entity_from_token_or_tablename({"table_name": "cached_users", "id": 1})
+        loader.reset()
+        loader.oauth_entity_key = "name"
+        assert loader.get_entity_from_token_or_tablename(tablename="cached_users", email_value="joe") is user
+        assert len(cache) == 2
+
+        entity = Entity(config, cache)
+        entity.register_lookup_attr("cached_users", "name")
+        entity.register_invalidation_hooks()
+        user.name = "jaco"
+        session.commit()
+        assert len(cache) == 0
+
+        class PlainUser:
+            # Not a SQLAlchemy model
+            __tablename__ = "cached_users"
+            id = 1
+            name = "jaco"
+
+        cache.set(("cached_users", "name", "jaco"), user)
+        entity.invalidate(PlainUser())
+        assert len(cache) == 0
+
+    def test_no_entity_cache(self, MockEntityModel, mock_decoded_token):
+        config = Config()
+        config.init_config({"SECRET_KEY": "__TEST_SECRET__"}, entity_models=[MockEntityModel])
+        entity = Entity(config)
+        entity.register_invalidation_hooks()
+        assert entity.get_entity_from_token_or_tablename(mock_decoded_token) == [(1, 'joe')]
+        assert entity.cache is None
+
+
+class TestLazyEntity:
+    """
+        Lazy entity proxies
+    """
+
+    def _count_queries(self, monkeypatch):
+        calls = []
+        get_from_model = Entity._get_from_model
+
+        def counted(self, *args):
+            calls.append(args)
+            return get_from_model(self, *args)
+        monkeypatch.setattr(Entity, "_get_from_model", counted)
+        return calls
+
+    def test_get_lazy_entity(self, session_model, monkeypatch):
+        _, model = session_model
+        config = Config()
+        config.init_config({"SECRET_KEY": "__TEST_SECRET__"}, entity_models=[model])
+        entity = Entity(config)
+        calls = self._count_queries(monkeypatch)
+
+        user = entity.get_lazy_entity({"table_name": "cached_users", "id": 1})
+        assert len(calls) == 0
+        assert user.name == "joe"
+        assert isinstance(user, model)
+        assert user.id == 1
+        assert len(calls) == 1
+
+        entity.tablename = None
+        assert entity.get_lazy_entity({"table_name": "cached_users"}) is None
+
+    def test_lazy_entity_request(self, session_model, monkeypatch):
+        from flask import Flask, g
+        from flask_jwt_router import JwtRoutes
+        _, model = session_model
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_LAZY_ENTITY"] = True
+        jwt_routes = JwtRoutes(app, entity_models=[model])
+
+        @app.route("/authenticated")
+        def authenticated():
+            return "ok"
+
+        @app.route("/name")
+        def name():
+            return g.cached_users.name
+
+        with app.test_request_context():
+            token = jwt_routes.create_token(entity_id=1, table_name="cached_users")
+        headers = {"Authorization": f"Bearer {token}"}
+        calls = self._count_queries(monkeypatch)
+        client = app.test_client()
+
+        assert client.get("/authenticated", headers=headers).status_code == 200
+        assert len(calls) == 0
+        assert client.get("/name", headers=headers).data == b"joe"
+        assert len(calls) == 1
+        assert client.get("/authenticated", headers={"Authorization": "Bearer bad"}).status_code == 401
+
+
+class TestEntityLoaders:
+    """
+        Registered entity loaders
+    """
+
+    def test_register_loader(self, MockEntityModel, mock_decoded_token):
+        config = Config()
+        config.init_config({"SECRET_KEY": "__TEST_SECRET__"}, entity_models=[MockEntityModel])
+        entity = Entity(config)
+        assert entity.get_entity_from_token_or_tablename(mock_decoded_token) == [(1, 'joe')]
+        assert not hasattr(MockEntityModel, "__get_entity__")
+
+        calls = []
+
+        def load(entity_key, entity_value):
+            calls.append((entity_key, entity_value))
+            return "custom"
+        entity.register_loader(MockEntityModel, load)
+        entity.tablename = None
+        assert entity.get_entity_from_token_or_tablename(mock_decoded_token) == "custom"
+        assert calls == [("id", mock_decoded_token["id"])]
+
+    def test_async_loader(self, MockEntityModel, mock_decoded_token):
+        from flask_jwt_router._cache import TTLCache
+        config = Config()
+        config.init_config({"SECRET_KEY": "__TEST_SECRET__"}, entity_models=[MockEntityModel])
+        calls = []
+
+        async def load(entity_key, entity_value):
+            calls.append((entity_key, entity_value))
+            await asyncio.sleep(0)
+            return "async"
+
+        entity = Entity(config, TTLCache(8, 60), {MockEntityModel: load})
+
+        async def main():
+            return [await entity.get_entity_from_token_or_tablename_async(mock_decoded_token) for _ in range(3)]
+
+        assert asyncio.run(main()) == ["async"] * 3
+        assert calls == [("id", mock_decoded_token["id"])]
+
+    def test_register_entity_loader(self, session_model):
+        from flask import Flask, g
+        from flask_jwt_router import JwtRoutes
+        _, model = session_model
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(app, entity_models=[model], entity_loaders={model: lambda k, v: f"{k}={v}"})
+
+        @app.route("/entity")
+        def entity():
+            return g.cached_users
+
+        with app.test_request_context():
+            token = jwt_routes.create_token(entity_id=1, table_name="cached_users")
+        headers = {"Authorization": f"Bearer {token}"}
+        client = app.test_client()
+        assert client.get("/entity", headers=headers).data == b"id=1"
+
+        jwt_routes.register_entity_loader(model, lambda k, v: "registered")
+        assert client.get("/entity", headers=headers).data == b"registered"
@@ -161,3 +161,249 @@ class TestJwtRoutes:
         jwt.init_app(self.app, google_oauth=self.oauth_options, strategies=[GoogleTestUtil])
         strategy = jwt.get_strategy("GoogleTestUtil")
         assert isinstance(strategy, GoogleTestUtil)
+
+    def test_instances_do_not_share_state(self):
+        one = JwtRoutes()
+        two = JwtRoutes()
+        assert one.routing is not two.routing
+        assert one.strategy_dict is not two.strategy_dict
+
+
+class TestConcurrentRequests:
+
+    def test_each_request_sees_its_own_entity(self):
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+        from flask import g
+        from sqlalchemy import Column, Integer
+        from sqlalchemy.ext.declarative import declarative_base
+        import jwt as pyjwt
+
+        Base = declarative_base()
+
+        class UserModel(Base):
+            __tablename__ = "users"
+            id = Column(Integer, primary_key=True)
+
+        class TeacherModel(Base):
+            __tablename__ = "teachers"
+            teacher_id = Column(Integer, primary_key=True)
+
+        def loader(tablename):
+            def load(entity_key, entity_value):
+                # Give other threads the chance to overwrite shared state
+                time.sleep(0.001)
+                return SimpleNamespace(tablename=tablename, entity_key=entity_key, id=entity_value)
+            return load
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(app, entity_models=[UserModel, TeacherModel], entity_loaders={
+            UserModel: loader("users"),
+            TeacherModel: loader("teachers"),
+        })
+
+        @app.route("/me")
+        def me():
+            entity = g.get("users") or g.get("teachers")
+            time.sleep(0.001)
+            return {
+                "tablename": entity.tablename,
+                "entity_key": entity.entity_key,
+                "id": entity.id,
+                "token": jwt_routes.update_token(entity_id=entity.id),
+            }
+
+        tablenames = ["users", "teachers"]
+        with app.test_request_context():
+            tokens = [
+                jwt_routes.create_token(entity_id=i, table_name=tablenames[i % 2])
+                for i in range(200)
+            ]
+
+        def request(i):
+            rv = app.test_client().get("/me", headers={"Authorization": f"Bearer {tokens[i]}"})
+            return i, rv.get_json()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(request, range(200)))
+
+        for i, data in results:
+            tablename = tablenames[i % 2]
+            entity_key = "id" if tablename == "users" else "teacher_id"
+            assert data["tablename"] == tablename
+            assert data["entity_key"] == entity_key
+            assert data["id"] == i
+            decoded = pyjwt.decode(data["token"], "__TEST_SECRET__", algorithms=["HS256"])
+            assert decoded["table_name"] == tablename
+            assert decoded[entity_key] == i
+
+
+class TestCustomClaims:
+
+    def test_custom_claims(self, MockEntityModel):
+        import jwt as pyjwt
+        from flask import g
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(app, entity_models=[MockEntityModel])
+        jwt_routes.register_claims_builder(MockEntityModel, lambda entity_id: {"role": "user", "tenant_id": entity_id * 10})
+
+        @app.route("/claims")
+        def claims():
+            return {
+                "role": g.claims.get_claim("role", str),
+                "tenant_id": g.claims.get_claim("tenant_id", int),
+                "token": jwt_routes.update_token(entity_id=1, claims={"plan": "pro"}),
+            }
+
+        with app.test_request_context():
+            token = jwt_routes.create_token(entity_id=1, table_name="test_entities", claims={"role": "admin"})
+            for reserved in ("exp", "aud", "nbf", "iat", "iss", "jti", "table_name", "id"):
+                with pytest.raises(ValueError):
+                    jwt_routes.create_token(entity_id=1, table_name="test_entities", claims={reserved: 0})
+        decoded = pyjwt.decode(token, "__TEST_SECRET__", algorithms=["HS256"])
+        assert (decoded["role"], decoded["tenant_id"], decoded["id"]) == ("admin", 10, 1)
+
+        rv = app.test_client().get("/claims", headers={"Authorization": f"Bearer {token}"})
+        data = rv.get_json()
+        assert (data["role"], data["tenant_id"]) == ("admin", 10)
+        decoded = pyjwt.decode(data["token"], "__TEST_SECRET__", algorithms=["HS256"])
+        assert (decoded["role"], decoded["plan"], decoded["table_name"]) == ("user", "pro", "test_entities")
+
+
+class TestScopedMiddleware:
+
+    def _app(self, **kwargs):
+        from flask import Blueprint
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+        @api.route("/users")
+        def users():
+            return "users"
+
+        @app.route("/admin/users")
+        def admin_users():
+            return "admin"
+
+        @app.route("/health")
+        def health():
+            return "ok"
+
+        blueprints = [api if b == "api_bp" else b for b in kwargs.pop("blueprints", [])]
+        jwt_routes = JwtRoutes(app, blueprints=blueprints, **kwargs)
+        app.register_blueprint(api)
+        return app, jwt_routes
+
+    def test_blueprints(self):
+        app, jwt_routes = self._app(blueprints=["api_bp"])
+        client = app.test_client()
+        assert client.get("/api/v1/users").status_code == 401
+        assert client.get("/admin/users").status_code == 200
+        assert client.get("/health").status_code == 200
+        assert jwt_routes.routing.classification_cache_info()["misses"] == 1
+
+    def test_url_prefixes(self):
+        app, _ = self._app(blueprints=["api"], url_prefixes=["/admin/"])
+        client = app.test_client()
+        assert client.get("/api/v1/users").status_code == 401
+        assert client.get("/admin/users").status_code == 401
+        assert client.get("/health").status_code == 200
+
+    def test_whole_app(self):
+        app, _ = self._app()
+        assert app.test_client().get("/health").status_code == 401
+
+
+class TestStrategies:
+
+    google_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "oauth_tablename",
+        "email_field": "email",
+        "expires_in": 3600,
+    }
+
+    @staticmethod
+    def _provider(header):
+        from flask_jwt_router.oauth2._base import BaseOAuth
+
+        class Provider(BaseOAuth):
+            header_name = header
+            urls = {"user_info.email": "https://provider.example.com/userinfo"}
+            authorized = []
+
+            def __init__(self, http):
+                self.http = http
+
+            def init(self, *, tablename, email_field, **kwargs):
+                self.tablename = tablename
+                self.email_field = email_field
+
+            def oauth_login(self, request):
+                return {}
+
+            def authorize(self, token):
+                self.authorized.append(token)
+                return {"email": token}
+
+        return Provider
+
+    def test_each_strategy_has_its_own_options(self, MockAOuthModel):
+        from flask import g
+        from flask_jwt_router.oauth2.google import Google
+
+        Provider = self._provider("X-Provider-Token")
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(
+            app,
+            entity_models=[MockAOuthModel],
+            google_oauth=self.google_options,
+            strategies=[Google, Provider],
+            strategy_options={"Provider": {"tablename": "oauth_tablename", "email_field": "user_email"}},
+            entity_loaders={MockAOuthModel: lambda key, value: f"{key}={value}"},
+        )
+        provider = jwt_routes.get_strategy("Provider")
+        google = jwt_routes.get_strategy("Google")
+        assert provider.http.urls == Provider.urls
+        assert google.http.urls["user_info.email"] == "https://www.googleapis.com/oauth2/v2/userinfo"
+        assert google.client_id == "<CLIENT_ID>"
+        assert jwt_routes.routing.strategy_index == {"X-Auth-Token": google, "X-Provider-Token": provider}
+        # Cached OAuth entities are invalidated by each strategy's email field
+        assert {"user_email", google.email_field} <= jwt_routes.entity.lookup_attrs["oauth_tablename"]
+
+        @app.route("/oauth")
+        def oauth():
+            return {"entity": g.oauth_tablename}
+
+        rv = app.test_client().get("/oauth", headers={"X-Provider-Token": "Bearer jaco@gmail.com"})
+        assert rv.get_json() == {"entity": "user_email=jaco@gmail.com"}
+        assert provider.authorized == ["jaco@gmail.com"]
+
+        # Unregistered headers are not read
+        assert app.test_client().get("/oauth", headers={"X-Other-Token": "Bearer jaco@gmail.com"}).status_code == 401
+        assert app.test_client().get("/oauth", headers={"X-Provider-Token": "jaco@gmail.com"}).status_code == 401
+
+    def test_missing_options(self):
+        from flask_jwt_router.oauth2._exceptions import StrategyOptionsError
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        with pytest.raises(StrategyOptionsError):
+            JwtRoutes(app, strategies=[self._provider("X-Provider-Token")])
+
+    def test_duplicate_header_names(self):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        First = self._provider("X-Provider-Token")
+        Second = type("Second", (self._provider("X-Provider-Token"),), {})
+        options = {"tablename": "users", "email_field": "email"}
+        with pytest.raises(ValueError):
+            JwtRoutes(app, strategies=[First, Second], strategy_options={"Provider": options, "Second": options})
@@ -0,0 +1,165 @@
+import jwt
+import pytest
+from flask import Flask
+
+from flask_jwt_router._config import Config, SecretKeyError
+from flask_jwt_router._keys import KeyLoadError, SigningKeyError
+from flask_jwt_router._authentication import Authentication
+from flask_jwt_router._routing import Routing
+from flask_jwt_router import JwtRoutes
+from tests.fixtures.key_fixtures import (
+    pem_keys,
+    generate_private_key,
+    to_jwk,
+    write_jwks,
+)
+
+
+def _routing(config):
+    routing = Routing()
+    routing.init(Flask(__name__), config, None, {})
+    return routing
+
+
+class TestKeys:
+
+    @pytest.mark.parametrize("algorithm", ["RS256", "PS256", "ES256", "EdDSA"])
+    def test_pem_keys(self, pem_keys, algorithm):
+        private_file, public_file = pem_keys(algorithm)
+        config = Config()
+        config.init_config({
+            "JWT_ROUTER_ALGORITHM": algorithm,
+            "JWT_ROUTER_PRIVATE_KEY_FILE": private_file,
+        })
+        assert config.algorithm == algorithm
+        assert not isinstance(config.keyring.signing_key()[1], (str, bytes))
+        token = Authentication().encode_token(config, 1, 1, "users")
+        assert jwt.get_unverified_header(token)["alg"] == algorithm
+
+        # A verifying service only holds the public key
+        verify_config = Config()
+        verify_config.init_config({
+            "JWT_ROUTER_ALGORITHM": algorithm,
+            "JWT_ROUTER_PUBLIC_KEY_FILE": public_file,
+        })
+        assert _routing(verify_config)._decode_token(token)["table_name"] == "users"
+        with pytest.raises(SigningKeyError):
+            Authentication().encode_token(verify_config, 1, 1, "users")
+
+    def test_hmac_requires_secret_key(self, pem_keys):
+        with pytest.raises(SecretKeyError):
+            Config().init_config({})
+        config = Config()
+        config.init_config({"SECRET_KEY": "__TEST_SECRET__"})
+        assert config.keyring.kids == [None]
+        assert config.keyring.signing_key() == (None, b"__TEST_SECRET__")
+
+    def test_jwks_file(self, tmp_path):
+        private_key = generate_private_key("RS256")
+        private_jwks = write_jwks(tmp_path, [to_jwk("RS256", private_key)], "private.json")
+        public_jwks = write_jwks(tmp_path, [to_jwk("RS256", private_key.public_key())], "public.json")
+
+        config = Config()
+        config.init_config({"JWT_ROUTER_ALGORITHM": "RS256", "JWT_ROUTER_JWKS_FILE": private_jwks})
+        token = Authentication().encode_token(config, 1, 1, "users")
+
+        verify_config = Config()
+        verify_config.init_config({"JWT_ROUTER_ALGORITHM": "RS256", "JWT_ROUTER_JWKS_FILE": public_jwks})
+        with pytest.raises(SigningKeyError):
+            verify_config.keyring.signing_key()
+        assert _routing(verify_config)._decode_token(token)["id"] == 1
+
+    def test_key_errors(self, pem_keys, tmp_path):
+        private_file, _ = pem_keys("ES256")
+        with pytest.raises(KeyLoadError):
+            Config().init_config({"JWT_ROUTER_ALGORITHM": "RS256"})
+        with pytest.raises(KeyLoadError):
+            Config().init_config({"JWT_ROUTER_ALGORITHM": "RS256", "JWT_ROUTER_PRIVATE_KEY_FILE": private_file})
+        with pytest.raises(KeyLoadError):
+            Config().init_config({"JWT_ROUTER_ALGORITHM": "RS256", "JWT_ROUTER_PUBLIC_KEY_FILE": "missing.pem"})
+        with pytest.raises(KeyLoadError):
+            Config().init_config({"JWT_ROUTER_ALGORITHM": "none", "SECRET_KEY": "__TEST_SECRET__"})
+
+
+class TestKeyring:
+
+    app_config = {
+        "SECRET_KEY": "__TEST_SECRET__",
+        "JWT_ROUTER_KEYS": {
+            "2021-06": "__PREVIOUS_SECRET__",
+            "2021-07": "__CURRENT_SECRET__",
+        },
+        "JWT_ROUTER_SIGNING_KID": "2021-07",
+    }
+
+    def test_kid_header(self, monkeypatch):
+        config = Config()
+        config.init_config(self.app_config)
+        routing = _routing(config)
+        token = Authentication().encode_token(config, 1, 1, "users")
+        assert jwt.get_unverified_header(token)["kid"] == "2021-07"
+
+        # Only the key matching the kid is tried
+        keys = []
+        decode = jwt.decode
+
+        def counted_decode(token, key, **kwargs):
+            keys.append(key)
+            return decode(token, key, **kwargs)
+        monkeypatch.setattr("flask_jwt_router._routing.jwt.decode", counted_decode)
+        assert routing._decode_token(token)["id"] == 1
+        assert keys == [b"__CURRENT_SECRET__"]
+
+        previous = jwt.encode({"id": 2}, "__PREVIOUS_SECRET__", algorithm="HS256", headers={"kid": "2021-06"})
+        legacy = jwt.encode({"id": 3}, "__TEST_SECRET__", algorithm="HS256")
+        unknown = jwt.encode({"id": 4}, "__PREVIOUS_SECRET__", algorithm="HS256", headers={"kid": "unknown"})
+        assert routing._decode_token(previous)["id"] == 2
+        assert routing._decode_token(legacy)["id"] == 3
+        with pytest.raises(jwt.InvalidTokenError):
+            routing._decode_token(unknown)
+
+    def test_rotate_at_runtime(self):
+        app = Flask(__name__)
+        app.config.update(self.app_config)
+        app.config["JWT_ROUTER_TOKEN_CACHE"] = True
+        jwt_routes = JwtRoutes(app)
+        routing = jwt_routes.routing
+        old_token = Authentication().encode_token(jwt_routes.config, 1, 1, "users")
+
+        jwt_routes.add_key("2021-08", "__NEXT_SECRET__")
+        token = Authentication().encode_token(jwt_routes.config, 1, 1, "users")
+        assert jwt.get_unverified_header(token)["kid"] == "2021-07"
+        jwt_routes.use_signing_key("2021-08")
+        new_token = Authentication().encode_token(jwt_routes.config, 1, 1, "users")
+        assert jwt.get_unverified_header(new_token)["kid"] == "2021-08"
+        assert routing._decode_token(old_token)["id"] == 1
+        assert routing._decode_token(new_token)["id"] == 1
+
+        jwt_routes.retire_key("2021-07")
+        assert len(routing.token_cache) == 0
+        with pytest.raises(jwt.InvalidTokenError):
+            routing._decode_token(old_token)
+        assert routing._decode_token(new_token)["id"] == 1
+
+        jwt_routes.retire_key("2021-08")
+        with pytest.raises(SigningKeyError):
+            Authentication().encode_token(jwt_routes.config, 1, 1, "users")
+        jwt_routes.reload_keys()
+        assert jwt_routes.config.keyring.signing_kid == "2021-07"
+
+    def test_jwks_rotation(self, tmp_path):
+        current = generate_private_key("RS256")
+        previous = generate_private_key("RS256")
+        jwks_file = write_jwks(tmp_path, [
+            to_jwk("RS256", previous.public_key(), "2021-06"),
+            to_jwk("RS256", current, "2021-07"),
+        ])
+        config = Config()
+        config.init_config({"JWT_ROUTER_ALGORITHM": "RS256", "JWT_ROUTER_JWKS_FILE": jwks_file})
+        assert sorted(config.keyring.kids) == ["2021-06", "2021-07"]
+        assert config.keyring.signing_kid == "2021-07"
+        with pytest.raises(KeyLoadError):
+            config.keyring.use_signing_key("2021-06")
+
+        token = jwt.encode({"id": 1}, previous, algorithm="RS256", headers={"kid": "2021-06"})
+        assert _routing(config)._decode_token(token)["id"] == 1
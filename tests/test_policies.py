@@ -0,0 +1,125 @@
+import pytest
+import jwt
+from flask import Flask
+
+from flask_jwt_router import JwtRoutes
+from flask_jwt_router._policies import compile_policy, compile_policies, requires, unmatched_policies
+from tests.fixtures.model_fixtures import MockEntityModel
+
+
+class TestPolicies:
+
+    def test_compile_policy(self):
+        admin = compile_policy(roles=["admin", "manager"])
+        assert admin({"roles": ["manager"]})
+        assert not admin({"roles": ["user"]})
+        assert not admin({})
+
+        write = compile_policy(scopes=["users:read", "users:write"], scopes_claim="scp")
+        assert write({"scp": "users:read users:write openid"})
+        assert write({"scp": ["users:write", "users:read"]})
+        assert not write({"scp": "users:read"})
+
+        both = compile_policy(roles="admin", scopes=["users:write"])
+        assert both({"roles": "admin", "scope": "users:write"})
+        assert not both({"roles": "admin"})
+
+        assert compile_policy()({})
+
+    def test_compile_policies(self):
+        app = Flask(__name__)
+
+        @app.route("/users/<int:user_id>", methods=["GET", "DELETE"])
+        @requires(roles=["admin"])
+        def user(user_id):
+            return ""
+
+        policies = compile_policies(app, [("GET", "/reports", {"scopes": ["reports:read"]})])
+        assert set(policies) >= {("/users/<int:user_id>", "GET"), ("/users/<int:user_id>", "DELETE"), ("/reports", "GET")}
+        assert not policies[("/users/<int:user_id>", "DELETE")]({"roles": ["user"]})
+        assert policies[("/reports", "GET")]({"scope": "reports:read"})
+
+    def test_unmatched_policies(self, caplog):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_POLICIES"] = [
+            ("GET", "/reports", {"scopes": ["reports:read"]}),
+            ("GET", "/reprots", {"scopes": ["reports:read"]}),
+            ("DELETE", "/reports", {"roles": ["admin"]}),
+        ]
+        jwt_routes = JwtRoutes(app)
+
+        @app.route("/reports")
+        def reports():
+            return "reports"
+
+        assert unmatched_policies(app, app.config["JWT_ROUTER_POLICIES"]) == [
+            ("GET", "/reprots"),
+            ("DELETE", "/reports"),
+        ]
+        jwt_routes.routing.compile_policies()
+        warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+        assert warnings == [
+            "JWT_ROUTER_POLICIES entry (GET, /reprots) matches no url rule",
+            "JWT_ROUTER_POLICIES entry (DELETE, /reports) matches no url rule",
+        ]
+
+    def test_requires(self, MockEntityModel):
+        loaded = []
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_POLICIES"] = [("GET", "/reports", {"scopes": ["reports:read"]})]
+        jwt_routes = JwtRoutes(app, entity_models=[MockEntityModel], entity_loaders={
+            MockEntityModel: lambda key, value: loaded.append(value) or value,
+        })
+
+        @app.route("/admin")
+        @jwt_routes.requires(roles=["admin"])
+        def admin():
+            return "admin"
+
+        @app.route("/reports")
+        def reports():
+            return "reports"
+
+        def get(path, **claims):
+            token = jwt.encode({"table_name": "test_entities", "id": 1, **claims}, "__TEST_SECRET__", algorithm="HS256")
+            return app.test_client().get(path, headers={"Authorization": f"Bearer {token}"}).status_code
+
+        assert get("/admin", roles=["user"]) == 403
+        assert get("/reports", scope="users:read") == 403
+        assert loaded == []
+        assert get("/admin", roles=["admin"]) == 200
+        assert get("/reports", scope="reports:read users:read") == 200
+        assert loaded == [1, 1]
+
+
+class TestEndpointAccess:
+
+    def test_public_protected(self):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["WHITE_LIST_ROUTES"] = [("GET", "/whitelisted")]
+        jwt_routes = JwtRoutes(app)
+
+        @app.route("/register", methods=["POST"])
+        @jwt_routes.public
+        def register():
+            return "register"
+
+        @app.route("/whitelisted")
+        @jwt_routes.protected
+        def whitelisted():
+            return "whitelisted"
+
+        @app.route("/private")
+        def private():
+            return "private"
+
+        client = app.test_client()
+        assert client.post("/register").status_code == 200
+        assert client.get("/whitelisted").status_code == 401
+        assert client.options("/whitelisted").status_code == 200
+        assert client.get("/private").status_code == 401
+        assert jwt_routes.routing.endpoint_access == {"register": "public", "whitelisted": "protected"}
+        assert jwt_routes.routing.classification_cache_info()["size"] == 1
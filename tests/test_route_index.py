@@ -0,0 +1,69 @@
+import pytest
+
+from flask_jwt_router._route_index import RouteIndex
+
+
+class TestRouteIndex:
+
+    routes = [
+        ("GET", "/api/v1/test"),
+        ("POST", "/api/v1/test_entity"),
+        ("PUT", "/api/v1/apples/sub/<int:user_id>"),
+        ("GET", "/api/v1/<string:name>/profile"),
+    ]
+
+    def test_len(self):
+        assert len(RouteIndex()) == 0
+        assert not RouteIndex()
+        assert len(RouteIndex(self.routes)) == 4
+
+    @pytest.mark.parametrize(
+        "method,path,expected", [
+            ("GET", "/api/v1/test", True),
+            ("POST", "/api/v1/test", False),
+            ("GET", "/api/v1/test/sub_two", False),
+            ("POST", "/api/v1/test_entity", True),
+            ("PUT", "/api/v1/apples/sub/1", True),
+            ("PUT", "/api/v1/apples/sub/<int:user_id>", True),
+            ("PUT", "/api/v1/pears/sub/1", False),
+            ("GET", "/api/v1/apples/sub/1", False),
+            ("GET", "/api/v1/joe/profile", True),
+            ("GET", "/api/v1/joe/settings", False),
+            ("DELETE", "/api/v1/test", False),
+        ]
+    )
+    def test_match(self, method, path, expected):
+        index = RouteIndex(self.routes)
+        assert index.match(method, path) is expected
+
+    def test_match_overlapping_segments(self):
+        index = RouteIndex([
+            ("GET", "/users/<int:user_id>/posts"),
+            ("GET", "/users/me/<string:tab>"),
+        ])
+        assert index.match("GET", "/users/me/settings")
+        assert index.match("GET", "/users/me/posts")
+        assert index.match("GET", "/users/2/posts")
+        assert not index.match("GET", "/users/2/likes")
+
+    @pytest.mark.parametrize(
+        "rule,expected", [
+            ("/api/v1/test", True),
+            ("/api/other", False),
+            ("/api/v1/apples/sub/<int:user_id>", False),
+            ("/api/v1/<string:name>/profile", True),
+            ("/api/v1/<string:name>/settings", False),
+            ("/api/v1/joe/profile", True),
+            ("/api/v1/<string:name>", None),
+            ("/api/v1/items/<int:item_id>", None),
+            ("/api/v1/files/<path:name>", None),
+        ]
+    )
+    def test_match_rule(self, rule, expected):
+        index = RouteIndex([
+            ("GET", "/api/v1/test"),
+            ("GET", "/api/v1/<string:name>/profile"),
+            ("GET", "/api/v1/items/5"),
+        ])
+        assert index.match_rule("GET", rule) is expected
+        assert index.match_rule("POST", rule) is False
@@ -9,7 +9,10 @@
     "IGNORED_ROUTES" = [("GET", "/")]
     "JWT_ROUTER_API_NAME" = "/api/v1"
 """
+import asyncio
+import importlib.util
 from flask import Flask
+from werkzeug.exceptions import Forbidden, ServiceUnavailable, Unauthorized
 import flask
 from typing import Any
 import pytest
@@ -19,12 +22,14 @@ from flask_jwt_router._routing import Routing
 from flask_jwt_router._config import Config
 from flask_jwt_router._entity import Entity
 from flask_jwt_router.oauth2.google import Google
+from flask_jwt_router.oauth2._base import BaseOAuth
 from flask_jwt_router import GoogleTestUtil
 from tests.fixtures.token_fixture import mock_token, mock_access_token
 from tests.fixtures.model_fixtures import TestMockEntity, MockAOuthModel
 from tests.fixtures.app_fixtures import jwt_router_client, test_client_static
 from tests.fixtures.main_fixture import request_client,  jwt_routes
-from tests.fixtures.oauth_fixtures import http_requests, oauth_urls, google_oauth_user
+from tests.mock_server import mock_server
+from tests.fixtures.oauth_fixtures import http_requests, oauth_urls, google_oauth_user, mock_server_thread, mock_server_urls
 
 
 class MockArgs:
@@ -88,7 +93,7 @@ class TestRouting:
         google = Google(http_requests(oauth_urls))
         google.init(**config.google_oauth)
         routing = Routing()
-        routing.init(app, config, entity, google)
+        routing.init(app, config, entity, {"Google": google})
 
         with ctx:
             # token from args
@@ -234,3 +239,523 @@ class TestRouting:
         assert "200" in str(rv.status)
         assert email == rv.get_json()["email"]
         assert google.test_metadata[email] == test_metadata
+
+
+class TestRouteExists:
+
+    def _create_app(self, reuse_url_rule=True):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_REUSE_URL_RULE"] = reuse_url_rule
+
+        @app.route("/slash/", methods=["GET"])
+        def slash():
+            return "/slash/"
+
+        @app.route("/public", methods=["GET"])
+        def public():
+            return "/public"
+        app.config["WHITE_LIST_ROUTES"] = [("GET", "/public")]
+        return app
+
+    @pytest.mark.parametrize("reuse_url_rule", [True, False])
+    def test_does_route_exist(self, reuse_url_rule):
+        from flask_jwt_router import JwtRoutes
+        app = self._create_app(reuse_url_rule)
+        jwt_routes = JwtRoutes(app)
+        client = app.test_client()
+
+        assert "200" in str(client.get("/public").status)
+        assert "401" in str(client.get("/slash/").status)
+        assert "404" in str(client.get("/missing").status)
+        assert "405" in str(client.post("/public").status)
+        # Flask resolves to a redirect which is matched again & cached
+        assert "308" in str(client.get("/slash").status)
+        assert "308" in str(client.get("/slash").status)
+
+        route_cache = jwt_routes.routing.route_cache
+        if reuse_url_rule:
+            assert len(route_cache) == 1
+            assert route_cache.hits == 1
+            assert route_cache.misses == 1
+        else:
+            assert len(route_cache) == 0
+
+
+class TestClassificationCache:
+
+    def _create_app(self):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["WHITE_LIST_ROUTES"] = [
+            ("GET", "/public"),
+            ("GET", "/users/<int:user_id>"),
+            ("GET", "/items/5"),
+        ]
+
+        @app.route("/public", methods=["GET"])
+        def public():
+            return "/public"
+
+        @app.route("/protected", methods=["GET"])
+        def protected():
+            return "/protected"
+
+        @app.route("/users/<int:user_id>", methods=["GET"])
+        def users(user_id):
+            return "/users"
+
+        @app.route("/items/<int:item_id>", methods=["GET"])
+        def items(item_id):
+            return "/items"
+        return app
+
+    def test_classification_cache(self):
+        from flask_jwt_router import JwtRoutes
+        app = self._create_app()
+        jwt_routes = JwtRoutes(app)
+        client = app.test_client()
+
+        for _ in range(3):
+            assert "200" in str(client.get("/public").status)
+            assert "401" in str(client.get("/protected").status)
+            assert "200" in str(client.get("/users/1").status)
+            assert "200" in str(client.get("/users/2").status)
+        assert jwt_routes.routing.classification_cache_info() == {"hits": 9, "misses": 3, "size": 3}
+
+        # Only /items/5 is white listed so the url rule is classified from the path
+        assert "200" in str(client.get("/items/5").status)
+        assert "401" in str(client.get("/items/6").status)
+        classifications = jwt_routes.config.route_table.classifications
+        assert classifications.get(("/items/<int:item_id>", "GET")) == "per_path"
+
+    def test_warm_classification_cache(self):
+        from flask_jwt_router import JwtRoutes
+        app = self._create_app()
+        jwt_routes = JwtRoutes(app)
+        jwt_routes.routing.warm_classification_cache()
+        classifications = jwt_routes.config.route_table.classifications
+        assert classifications.get(("/public", "GET")) == "public"
+        assert classifications.get(("/protected", "GET")) == "protected"
+        assert classifications.get(("/users/<int:user_id>", "GET")) == "public"
+        assert classifications.get(("/static/<path:filename>", "GET")) == "static"
+
+        client = app.test_client()
+        assert "401" in str(client.get("/protected").status)
+        assert jwt_routes.routing.classification_cache_info()["misses"] == 0
+
+    def test_classification_counters_are_thread_safe(self):
+        from threading import Thread
+        from flask_jwt_router._route_index import ClassificationCache
+        cache = ClassificationCache()
+        cache.set(("/public", "GET"), "public")
+
+        def worker():
+            for _ in range(1000):
+                cache.get(("/public", "GET"))
+                cache.get(("/protected", "GET"))
+
+        threads = [Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert cache.info() == {"hits": 8000, "misses": 8000, "size": 1}
+
+
+class TestTokenCache:
+
+    app_config = {
+        "SECRET_KEY": "__TEST_SECRET__",
+        "JWT_ROUTER_TOKEN_CACHE": True,
+        "JWT_ROUTER_TOKEN_CACHE_SIZE": 2,
+    }
+
+    def _routing(self, app_config):
+        config = Config()
+        config.init_config(app_config)
+        routing = Routing()
+        routing.init(Flask(__name__), config, None, {})
+        return routing
+
+    def _token(self, entity_id, **kwargs):
+        from datetime import datetime, timedelta
+        return jwt.encode({
+            "table_name": "test_entities",
+            "id": entity_id,
+            "exp": datetime.utcnow() + timedelta(**kwargs),
+        }, "__TEST_SECRET__", algorithm="HS256")
+
+    def _count_decodes(self, monkeypatch):
+        calls = []
+        decode = jwt.decode
+
+        def counted_decode(*args, **kwargs):
+            calls.append(args[0])
+            return decode(*args, **kwargs)
+        monkeypatch.setattr("flask_jwt_router._routing.jwt.decode", counted_decode)
+        return calls
+
+    def test_token_cache_disabled(self, monkeypatch):
+        routing = self._routing({"SECRET_KEY": "__TEST_SECRET__"})
+        calls = self._count_decodes(monkeypatch)
+        token = self._token(1, days=1)
+        routing._decode_token(token)
+        routing._decode_token(token)
+        assert routing.token_cache is None
+        assert len(calls) == 2
+
+    def test_token_cache(self, monkeypatch):
+        routing = self._routing(self.app_config)
+        calls = self._count_decodes(monkeypatch)
+        token = self._token(1, days=1)
+        assert routing._decode_token(token)["id"] == 1
+        assert routing._decode_token(token)["id"] == 1
+        assert len(calls) == 1
+        assert routing.token_cache.hits == 1
+
+        with pytest.raises(jwt.InvalidTokenError):
+            routing._decode_token(token[:-2])
+        assert len(routing.token_cache) == 1
+
+    def test_token_cache_ttl_capped_by_exp(self, monkeypatch):
+        routing = self._routing(self.app_config)
+        token = self._token(1, seconds=5)
+        routing._decode_token(token)
+        _, (expires_at, _) = next(iter(routing.token_cache._data.items()))
+        assert expires_at - routing.token_cache.timer() <= 5
+
+        expired = self._token(1, seconds=-5)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            routing._decode_token(expired)
+
+    def test_token_cache_threads(self, monkeypatch):
+        from threading import Thread
+        routing = self._routing({**self.app_config, "JWT_ROUTER_TOKEN_CACHE_SIZE": 8})
+        tokens = {n: self._token(n, days=1) for n in range(4)}
+        errors = []
+
+        def worker():
+            for _ in range(200):
+                for n, token in tokens.items():
+                    if routing._decode_token(token)["id"] != n:
+                        errors.append(n)
+
+        threads = [Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(routing.token_cache) == 4
+
+
+class TestClaimsOnly:
+
+    def test_claims_only(self, TestMockEntity):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        loaded = []
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_CLAIMS_ONLY"] = True
+        jwt_routes = JwtRoutes(app, entity_models=[TestMockEntity], entity_loaders={
+            TestMockEntity: lambda key, value: loaded.append(value),
+        })
+
+        @app.route("/claims")
+        def claims():
+            assert not hasattr(g, "test_entities")
+            return {
+                "entity_id": g.claims.entity_id,
+                "table_name": g.claims.table_name,
+                "role": g.claims.get("role"),
+                "token": jwt_routes.update_token(entity_id=g.claims.entity_id),
+            }
+
+        token = jwt.encode({"table_name": "test_entities", "id": 5, "role": "admin"}, "__TEST_SECRET__", algorithm="HS256")
+        client = app.test_client()
+        rv = client.get("/claims", headers={"Authorization": f"Bearer {token}"})
+        assert rv.status_code == 200
+        data = rv.get_json()
+        assert (data["entity_id"], data["table_name"], data["role"]) == (5, "test_entities", "admin")
+        assert jwt.decode(data["token"], "__TEST_SECRET__", algorithms=["HS256"])["id"] == 5
+        assert loaded == []
+
+        assert client.get("/claims", headers={"Authorization": "Bearer bad"}).status_code == 401
+
+    def test_claims_only_without_entity_models(self):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["ENTITY_KEY"] = "user_id"
+        app.config["JWT_ROUTER_CLAIMS_ONLY"] = True
+        JwtRoutes(app)
+
+        @app.route("/claims")
+        def claims():
+            return {"entity_id": g.claims.entity_id}
+
+        token = jwt.encode({"table_name": "users", "user_id": 3}, "__TEST_SECRET__", algorithm="HS256")
+        rv = app.test_client().get("/claims", headers={"Authorization": f"Bearer {token}"})
+        assert rv.get_json() == {"entity_id": 3}
+
+
+class TestProviderUnavailable:
+
+    oauth_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "oauth_users",
+        "email_field": "email",
+        "expires_in": 3600,
+        "connect_timeout": 0.1,
+        "circuit_failures": 1,
+    }
+
+    def test_provider_unavailable(self, MockAOuthModel):
+        from flask_jwt_router import JwtRoutes
+        from flask_jwt_router.oauth2.google import Google
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(app, entity_models=[MockAOuthModel], google_oauth=self.oauth_options, strategies=[Google])
+        # Nothing is listening on port 1
+        jwt_routes.get_strategy("Google").http.urls = {"user_info.email": "http://localhost:1/userinfo"}
+
+        @app.route("/oauth")
+        def oauth():
+            return {}
+
+        client = app.test_client()
+        # The token may be valid, so the client is not signed out with a 401
+        assert client.get("/oauth", headers={"X-Auth-Token": "Bearer <access_token>"}).status_code == 503
+        # The circuit breaker is open
+        assert client.get("/oauth", headers={"X-Auth-Token": "Bearer <access_token>"}).status_code == 503
+        assert jwt_routes.get_strategy("Google").circuit_breaker.state == "open"
+
+
+class TestAsyncMiddleware:
+
+    oauth_options = {
+        "client_id": "<CLIENT_ID>",
+        "client_secret": "<CLIENT_SECRET>",
+        "redirect_uri": "http://localhost:3000",
+        "tablename": "oauth_tablename",
+        "email_field": "email",
+        "expires_in": 3600,
+    }
+
+    @staticmethod
+    def _app(**config):
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_ASYNC"] = True
+        app.config.update(config)
+
+        @app.route("/async")
+        def view():
+            return {}
+
+        return app
+
+    def test_registers_async_middleware(self, TestMockEntity):
+        from flask_jwt_router import JwtRoutes
+
+        jwt_routes = JwtRoutes(self._app(), entity_models=[TestMockEntity])
+        assert jwt_routes.app.before_request_funcs[None] == [jwt_routes.routing.before_middleware_async]
+
+    def test_async_entity_loader(self, TestMockEntity):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        async def load(key, value):
+            await asyncio.sleep(0)
+            return f"{key}={value}"
+
+        app = self._app()
+        jwt_routes = JwtRoutes(app, entity_models=[TestMockEntity], entity_loaders={TestMockEntity: load})
+        token = jwt.encode({"table_name": "test_entities", "id": 5}, "__TEST_SECRET__", algorithm="HS256")
+        with app.test_request_context("/async", headers={"Authorization": f"Bearer {token}"}):
+            asyncio.run(jwt_routes.routing.before_middleware_async())
+            assert g.test_entities == "id=5"
+            assert g.claims.entity_id == 5
+        with app.test_request_context("/async", headers={"Authorization": "Bearer bad"}):
+            with pytest.raises(Unauthorized):
+                asyncio.run(jwt_routes.routing.before_middleware_async())
+
+    def test_sync_middleware_rejects_async_entity_loader(self, TestMockEntity):
+        from flask_jwt_router import JwtRoutes
+        from flask_jwt_router._entity import AsyncEntityLoaderError
+
+        async def load(key, value):
+            return f"{key}={value}"
+
+        app = self._app(JWT_ROUTER_ASYNC=False)
+        jwt_routes = JwtRoutes(app, entity_models=[TestMockEntity], entity_loaders={TestMockEntity: load})
+        token = jwt.encode({"table_name": "test_entities", "id": 5}, "__TEST_SECRET__", algorithm="HS256")
+        with app.test_request_context("/async", headers={"Authorization": f"Bearer {token}"}):
+            with pytest.raises(AsyncEntityLoaderError):
+                jwt_routes.routing.before_middleware()
+
+    def test_oauth(self, MockAOuthModel, mock_server_urls, monkeypatch):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        monkeypatch.setattr(Google, "urls", mock_server_urls)
+        app = self._app()
+        jwt_routes = JwtRoutes(
+            app,
+            entity_models=[MockAOuthModel],
+            google_oauth=self.oauth_options,
+            strategies=[Google],
+            entity_loaders={MockAOuthModel: lambda key, value: f"{key}={value}"},
+        )
+        routing = jwt_routes.routing
+
+        async def authorize(token):
+            try:
+                with app.test_request_context("/async", headers={"X-Auth-Token": f"Bearer {token}"}):
+                    await routing.before_middleware_async()
+                    return g.oauth_tablename
+            finally:
+                await jwt_routes.get_strategy("Google").http.async_requests.pool.aclose()
+
+        assert asyncio.run(authorize("<access_token>")) == "email=jaco@gmail.com"
+        with pytest.raises(Unauthorized):
+            asyncio.run(authorize("<revoked_token>"))
+        monkeypatch.setattr(mock_server, "USER_INFO_UNAVAILABLE", True)
+        with pytest.raises(ServiceUnavailable):
+            asyncio.run(authorize("<access_token>"))
+
+    @pytest.mark.skipif(importlib.util.find_spec("asgiref") is None, reason="Flask's async support needs asgiref")
+    def test_client(self, TestMockEntity):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        async def load(key, value):
+            return f"{key}={value}"
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        app.config["JWT_ROUTER_ASYNC"] = True
+        JwtRoutes(app, entity_models=[TestMockEntity], entity_loaders={TestMockEntity: load})
+
+        @app.route("/async")
+        async def view():
+            return {"entity": g.test_entities}
+
+        token = jwt.encode({"table_name": "test_entities", "id": 5}, "__TEST_SECRET__", algorithm="HS256")
+        client = app.test_client()
+        assert client.get("/async", headers={"Authorization": f"Bearer {token}"}).get_json() == {"entity": "id=5"}
+        assert client.get("/async").status_code == 401
+
+    @pytest.mark.skipif(importlib.util.find_spec("asgiref") is None, reason="Flask's async support needs asgiref")
+    def test_client_closes_oauth_connections(self, MockAOuthModel, mock_server_urls, monkeypatch):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+        from flask_jwt_router.oauth2.async_http_requests import AsyncConnectionPool
+
+        connections = []
+        connect = AsyncConnectionPool._connect
+
+        async def recording_connect(self, key):
+            conn = await connect(self, key)
+            connections.append(conn[1])
+            return conn
+        monkeypatch.setattr(AsyncConnectionPool, "_connect", recording_connect)
+        monkeypatch.setattr(Google, "urls", mock_server_urls)
+        app = self._app()
+        jwt_routes = JwtRoutes(
+            app,
+            entity_models=[MockAOuthModel],
+            google_oauth=self.oauth_options,
+            strategies=[Google],
+            entity_loaders={MockAOuthModel: lambda key, value: f"{key}={value}"},
+        )
+
+        @app.route("/oauth")
+        async def oauth():
+            return {"entity": g.oauth_tablename}
+
+        client = app.test_client()
+        for _ in range(5):
+            rv = client.get("/oauth", headers={"X-Auth-Token": "Bearer <access_token>"})
+            assert rv.get_json() == {"entity": "email=jaco@gmail.com"}
+        # Flask runs each request on its own event loop, the connections are closed with the loop
+        assert len(connections) == 5
+        assert all(writer.is_closing() for writer in connections)
+        assert len(jwt_routes.get_strategy("Google").http.async_requests.pool._pools) == 0
+
+
+class RolesStrategy(BaseOAuth):
+    """
+    Authorizes any token, the token is a comma separated list of the user's roles
+    """
+    header_name = "X-Roles-Token"
+
+    def __init__(self, http):
+        self.http = http
+
+    def init(self, *, tablename, email_field) -> None:
+        self.tablename = tablename
+        self.email_field = email_field
+
+    def oauth_login(self, request):
+        return {}
+
+    def authorize(self, token: str):
+        return {"email": "jaco@gmail.com", "roles": token.split(",")}
+
+
+class TestOAuthPolicies:
+
+    def _app(self, MockAOuthModel):
+        from flask import g
+        from flask_jwt_router import JwtRoutes
+
+        app = Flask(__name__)
+        app.config["SECRET_KEY"] = "__TEST_SECRET__"
+        jwt_routes = JwtRoutes(
+            app,
+            entity_models=[MockAOuthModel],
+            strategies=[RolesStrategy],
+            strategy_options={"RolesStrategy": {"tablename": "oauth_tablename", "email_field": "email"}},
+            entity_loaders={MockAOuthModel: lambda key, value: f"{key}={value}"},
+        )
+
+        @app.route("/admin")
+        @jwt_routes.requires(roles=["admin"])
+        def admin():
+            return {"entity": g.oauth_tablename}
+
+        @app.route("/account")
+        def account():
+            return {"entity": g.oauth_tablename}
+
+        return app, jwt_routes
+
+    def test_policies(self, MockAOuthModel):
+        app, _ = self._app(MockAOuthModel)
+        client = app.test_client()
+        assert client.get("/admin", headers={"X-Roles-Token": "Bearer user"}).status_code == 403
+        assert client.get("/admin").status_code == 401
+        rv = client.get("/admin", headers={"X-Roles-Token": "Bearer user,admin"})
+        assert rv.get_json() == {"entity": "email=jaco@gmail.com"}
+        assert client.get("/account", headers={"X-Roles-Token": "Bearer user"}).status_code == 200
+
+    def test_policies_async(self, MockAOuthModel):
+        from flask import g
+
+        app, jwt_routes = self._app(MockAOuthModel)
+        with app.test_request_context("/admin", headers={"X-Roles-Token": "Bearer user"}):
+            with pytest.raises(Forbidden):
+                asyncio.run(jwt_routes.routing.before_middleware_async())
+            assert not hasattr(g, "oauth_tablename")
+        with app.test_request_context("/admin", headers={"X-Roles-Token": "Bearer admin"}):
+            asyncio.run(jwt_routes.routing.before_middleware_async())
+            assert g.oauth_tablename == "email=jaco@gmail.com"
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event, Thread
+
+import pytest
+
+from flask_jwt_router._singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_result(self):
+        flight = SingleFlight()
+        release = Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return {"email": "jaco@gmail.com"}
+
+        with ThreadPoolExecutor(8) as executor:
+            futures = [executor.submit(flight.do, "token", fn) for _ in range(8)]
+            while flight.shared < 7:
+                pass
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert len(flight) == 0
+
+    def test_sequential_calls_are_not_cached(self):
+        flight = SingleFlight()
+        assert flight.do("token", lambda: 1) == 1
+        assert flight.do("token", lambda: 2) == 2
+        assert flight.shared == 0
+
+    def test_keys_do_not_share(self):
+        flight = SingleFlight()
+        barrier = Barrier(2)
+
+        def fn(value):
+            barrier.wait(5)
+            return value
+
+        with ThreadPoolExecutor(2) as executor:
+            results = list(executor.map(lambda k: flight.do(k, fn, k), ["a", "b"]))
+        assert results == ["a", "b"]
+
+    def test_error_is_shared(self):
+        flight = SingleFlight()
+        release = Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError("upstream")
+
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(flight.do, "token", fn) for _ in range(4)]
+            while flight.shared < 3:
+                pass
+            release.set()
+            for f in futures:
+                with pytest.raises(ValueError):
+                    f.result()
+        assert len(flight) == 0
+
+
+class TestAsyncSingleFlight:
+
+    def test_concurrent_calls_share_result(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"email": "jaco@gmail.com"}
+
+        async def main():
+            return await asyncio.gather(*(flight.do("token", fn) for _ in range(8)))
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.shared == 7
+        assert len(flight) == 0
+
+    def test_error_is_shared(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        async def main():
+            return await asyncio.gather(*(flight.do("token", fn) for _ in range(4)), return_exceptions=True)
+
+        results = asyncio.run(main())
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(flight) == 0
+
+    def test_cancelled_caller_does_not_cancel_the_call(self):
+        flight = AsyncSingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("token", fn))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("token", fn))
+            await asyncio.sleep(0)
+            follower.cancel()
+            return await leader, follower.cancelled()
+
+        assert asyncio.run(main()) == ("ok", True)
+
+    def test_cancelled_leader_does_not_cancel_the_call(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do("token", fn))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("token", fn))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, leader.cancelled(), len(flight)
+
+        assert asyncio.run(main()) == ("ok", True, 0)
+        assert len(calls) == 1
+
+    def test_calls_on_other_loops_share_result(self):
+        flight = AsyncSingleFlight()
+        calls = []
+        started = Event()
+        results = []
+
+        async def fn():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        def call():
+            # Each thread runs its own event loop, like Flask's async views
+            results.append(asyncio.run(flight.do("token", fn)))
+
+        leader = Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+        assert results == ["ok", "ok"]
+        assert len(calls) == 1
+        assert flight.shared == 1
+        assert len(flight) == 0
+
+    def test_call_cancelled_with_its_loop_is_retried(self):
+        flight = AsyncSingleFlight()
+        calls = []
+        results = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        deadline = time.monotonic() + 5
+
+        async def leader():
+            asyncio.ensure_future(flight.do("token", fn))
+            while not flight.shared and time.monotonic() < deadline:
+                await asyncio.sleep(0.001)
+            # asyncio.run cancels the call's task as it shuts down the loop
+
+        def follower():
+            while not len(flight) and time.monotonic() < deadline:
+                time.sleep(0.001)
+            results.append(asyncio.run(flight.do("token", fn)))
+
+        thread = Thread(target=follower)
+        thread.start()
+        asyncio.run(leader())
+        thread.join()
+        assert results == ["ok"]
+        assert len(calls) == 2
+        assert len(flight) == 0